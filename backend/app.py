@@ -1,11 +1,18 @@
 import os
-from flask import Flask, send_from_directory
+import time
+from flask import Flask, request, g, abort
 from flask_cors import CORS
 from routes.interview import interview_bp
 from routes.resume import resume_bp
 from routes.research import research_bp
-from config.settings import UPLOAD_DIR, OUTPUT_DIR
+from config.settings import UPLOAD_DIR, OUTPUT_DIR, WHISPER_WARMUP, PRELOAD_MODELS, PORT, FLASK_DEBUG, PROFILE_HEADER
 from routes.gemini import gemini_bp
+from routes.screening import screening_bp
+from routes.jobs import jobs_bp
+from routes.health import health_bp
+from utils.jobs import jobs
+from utils import metrics
+from utils.static_assets import StaticAssets
 
 app = Flask(__name__, static_folder="../frontend", template_folder="../frontend")
 CORS(app)
@@ -17,18 +24,75 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
+def warm_models():
+    """
+    Start loading whisper replicas in the background (WHISPER_WARMUP) instead
+    of on the first upload. Call it in the serving process: gunicorn's
+    post_fork, or __main__ below. With PRELOAD_MODELS, wsgi.py loads them in
+    the master before forking instead.
+    """
+    if WHISPER_WARMUP and not PRELOAD_MODELS:
+        from models.whisper.load_model import get_pool
+        get_pool().warm_up(background=True)
+
 # register blueprints for all frontend features
 app.register_blueprint(interview_bp, url_prefix="/api/interview")
 app.register_blueprint(resume_bp, url_prefix="/api/resume")
 app.register_blueprint(research_bp, url_prefix="/api/research")
+app.register_blueprint(screening_bp, url_prefix="/api/screening")
+app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
+app.register_blueprint(health_bp)
+
+http_requests = metrics.registry.counter(
+    "http_requests_total", "Requests handled.", ("method", "endpoint", "status"))
+http_seconds = metrics.registry.histogram(
+    "http_request_duration_seconds", "Time to produce a response (streams: until the first byte).",
+    ("method", "endpoint"))
+http_in_flight = metrics.registry.gauge("http_requests_in_flight", "Requests being handled.")
+
+@app.before_request
+def _start_timer():
+    g.started = time.perf_counter()
+    http_in_flight.inc()
+    # opt-in stage breakdown, returned as a Server-Timing header
+    if request.headers.get(PROFILE_HEADER):
+        g.profile_token = metrics.start_profile()
+
+@app.after_request
+def _record_request(response):
+    elapsed = time.perf_counter() - g.started
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    http_requests.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+    http_seconds.observe(elapsed, method=request.method, endpoint=endpoint)
+    token = g.pop("profile_token", None)
+    if token is not None:
+        response.headers["Server-Timing"] = metrics.server_timing(metrics.stop_profile(token), total=elapsed)
+    return response
+
+@app.teardown_request
+def _end_request(exc):
+    http_in_flight.dec()
+    token = g.pop("profile_token", None)
+    if token is not None:
+        metrics.stop_profile(token)
+
+# frontend files (one level above backend), fingerprinted and precompressed once at
+# startup; with PRELOAD_MODELS the table is built in the master and shared by workers
+static_assets = StaticAssets(app.static_folder, reload=FLASK_DEBUG)
 
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 def frontend(path):
-    # serve frontend files (assumes frontend files are one level above backend)
-    if path != "" and os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
-    return send_from_directory(app.static_folder, "index.html")
+    response = static_assets.serve(path, request)
+    if response is None:
+        abort(404)
+    return response
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=7860, debug=True)
+    # development server; use gunicorn -c gunicorn.conf.py wsgi:app in production.
+    # The reloader is off unless FLASK_DEBUG=1 so Whisper isn't loaded twice.
+    # All @task functions are registered by the route imports above, so
+    # persisted jobs can be picked up again.
+    jobs.start()
+    warm_models()
+    app.run(host="0.0.0.0", port=PORT, debug=FLASK_DEBUG, use_reloader=FLASK_DEBUG)
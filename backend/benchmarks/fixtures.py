@@ -0,0 +1,136 @@
+"""Deterministic synthetic inputs: resume/JD text, PDFs, DOCX files and audio."""
+import math
+import os
+import random
+import shutil
+import struct
+import subprocess
+import wave
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "go", "rust", "c++", "c#", "sql", "postgresql",
+    "mysql", "mongodb", "redis", "kafka", "docker", "kubernetes", "terraform", "aws", "google cloud",
+    "azure", "react", "node.js", "django", "flask", "fastapi", "spring", "graphql", "rest", "grpc",
+    "machine learning", "deep learning", "pytorch", "tensorflow", "scikit-learn", "pandas", "numpy",
+    "spark", "airflow", "ci-cd", "jenkins", "git", "linux", "microservices", "observability",
+]
+FILLER = [
+    "built", "designed", "led", "shipped", "improved", "reduced", "latency", "throughput", "team",
+    "platform", "service", "pipeline", "customers", "reliability", "migration", "architecture",
+    "data", "product", "stakeholders", "delivered", "scalable", "systems", "performance", "across",
+    "engineering", "owned", "mentored", "launched", "automated", "testing", "deployment", "metrics",
+]
+
+
+def make_text(n_words: int, seed: int = 0, skill_ratio: float = 0.2) -> str:
+    rng = random.Random(seed)
+    words = []
+    for i in range(n_words):
+        words.append(rng.choice(SKILLS) if rng.random() < skill_ratio else rng.choice(FILLER))
+        if i % 14 == 13:
+            words[-1] += "."
+    return " ".join(words)
+
+
+def make_jd(n_words: int = 400, seed: int = 1) -> str:
+    return "Senior Software Engineer. Requirements: " + make_text(n_words, seed, skill_ratio=0.35)
+
+
+def make_resume(n_words: int = 600, seed: int = 2) -> str:
+    lines = ["Jane Doe", "Software Engineer", "Experience"]
+    text = make_text(n_words, seed).split(". ")
+    lines.extend(f"- {s}." for s in text)
+    return "\n".join(lines)
+
+
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 45, seed: int = 3) -> str:
+    """A plain PDF with `pages` pages of Helvetica text lines, no dependencies."""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for _ in range(pages):
+        lines = [make_text(12, rng.randrange(1 << 30)) for _ in range(lines_per_page)]
+        body = "BT /F1 10 Tf 14 TL 50 790 Td\n" + "".join(f"({_pdf_escape(l)}) Tj T*\n" for l in lines) + "ET"
+        data = body.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+def write_docx(path: str, pages: int, paragraphs_per_page: int = 12, seed: int = 4) -> str:
+    import docx
+
+    doc = docx.Document()
+    for i in range(pages * paragraphs_per_page):
+        doc.add_paragraph(make_text(40, seed + i))
+    doc.save(path)
+    return path
+
+
+def write_wav(path: str, seconds: float, sample_rate: int = 16000, seed: int = 5) -> str:
+    """
+    16-bit mono WAV of syllable-like tone bursts separated by pauses, so
+    VAD and decoding see something closer to speech than a constant tone.
+    """
+    rng = random.Random(seed)
+    n = int(seconds * sample_rate)
+    samples = []
+    t = 0
+    while t < n:
+        burst = int(rng.uniform(0.12, 0.35) * sample_rate)
+        pause = int(rng.uniform(0.05, 0.4) * sample_rate)
+        freq = rng.uniform(120, 320)
+        for i in range(min(burst, n - t)):
+            env = math.sin(math.pi * i / burst)
+            samples.append(int(9000 * env * math.sin(2 * math.pi * freq * i / sample_rate)))
+        t += burst
+        samples.extend([0] * min(pause, max(0, n - t)))
+        t += pause
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    return path
+
+
+def write_audio(path: str, seconds: float) -> str:
+    """Audio in the format given by path's extension; non-WAV needs ffmpeg."""
+    if path.endswith(".wav"):
+        return write_wav(path, seconds)
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError("ffmpeg not found")
+    wav = path + ".src.wav"
+    write_wav(wav, seconds)
+    try:
+        subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", wav, path], check=True)
+    finally:
+        os.remove(wav)
+    return path
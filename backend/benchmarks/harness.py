@@ -0,0 +1,63 @@
+"""Timing helpers shared by the suites."""
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values: list, q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = (len(s) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _summary(name: str, latencies: list, wall: float, **meta) -> dict:
+    ms = [t * 1000 for t in latencies]
+    return {
+        "name": name,
+        "n": len(ms),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+        "throughput_per_s": round(len(ms) / wall, 2) if wall else 0.0,
+        **meta,
+    }
+
+
+def bench(name: str, fn, iterations: int = 20, warmup: int = 2, **meta) -> dict:
+    """Call fn(i) sequentially and summarize per-call latency."""
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t)
+    return _summary(name, latencies, time.perf_counter() - start, concurrency=1, **meta)
+
+
+def bench_concurrent(name: str, fn, requests: int, concurrency: int, **meta) -> dict:
+    """Call fn(i) for i in range(requests) from `concurrency` threads; throughput is requests / wall time."""
+    def timed(i):
+        t = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - t
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(requests)))
+    return _summary(name, latencies, time.perf_counter() - start, concurrency=concurrency, **meta)
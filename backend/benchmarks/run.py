@@ -0,0 +1,161 @@
+"""
+Run the benchmark suites and save the results as JSON.
+
+    cd backend
+    python -m benchmarks.run                      # all suites
+    python -m benchmarks.run -s parse -s routes --quick
+    python -m benchmarks.run --compare old.json new.json
+
+Each suite runs in its own child process so its peak RSS is its own.
+Results go to benchmarks/results/<timestamp>_<commit>.json.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# defaults for suite processes; anything already set in the environment wins
+CHILD_ENV = {
+    "LLM_BACKEND": "fake",
+    "WHISPER_MODEL": "tiny",
+    "WHISPER_DEVICE": "cpu",
+    "LLM_CACHE_DISK": "0",
+    "TRANSCRIPT_CACHE_DISK": "0",
+    "PARSE_CACHE_DISK": "0",
+    "JOB_DB": "",
+    "SESSION_DB": "",
+}
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _run_child(suite: str, quick: bool, out_path: str):
+    """Entry point inside the child process."""
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks.harness import peak_rss_mb
+    from benchmarks.suites import SUITES, Skip
+
+    try:
+        report = {"cases": SUITES[suite](quick=quick)}
+    except Skip as e:
+        report = {"skipped": str(e)}
+    report["peak_rss_mb"] = peak_rss_mb()
+    with open(out_path, "w") as f:
+        json.dump(report, f)
+
+
+def run_suite(suite: str, quick: bool) -> dict:
+    env = {**CHILD_ENV, **os.environ}
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        out_path = tmp.name
+    try:
+        cmd = [sys.executable, "-m", "benchmarks.run", "--child", suite, "--child-out", out_path]
+        if quick:
+            cmd.append("--quick")
+        proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=env)
+        if proc.returncode != 0:
+            return {"error": f"suite exited with status {proc.returncode}"}
+        with open(out_path) as f:
+            return json.load(f)
+    finally:
+        os.remove(out_path)
+
+
+def print_report(results: dict):
+    for suite, report in results["suites"].items():
+        print(f"\n== {suite} ==")
+        if "skipped" in report or "error" in report:
+            print("  " + (report.get("skipped") or report.get("error")))
+            continue
+        print(f"  peak RSS {report['peak_rss_mb']} MB")
+        print(f"  {'case':<52} {'p50 ms':>10} {'p95 ms':>10} {'req/s':>9} {'conc':>5}")
+        for c in report["cases"]:
+            print(f"  {c['name'][:52]:<52} {c.get('p50_ms', 0):>10.2f} {c.get('p95_ms', 0):>10.2f} "
+                  f"{c.get('throughput_per_s', 0):>9.1f} {c.get('concurrency', 1):>5}")
+
+
+def compare(old_path: str, new_path: str):
+    """Print p50/p95/throughput changes between two result files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old.get('commit', '?')[:10]} -> {new.get('commit', '?')[:10]}")
+    for suite, report in new["suites"].items():
+        before = {c["name"]: c for c in old["suites"].get(suite, {}).get("cases", [])}
+        print(f"\n== {suite} ==")
+        for c in report.get("cases", []):
+            o = before.get(c["name"])
+            if o is None or not o.get("p50_ms"):
+                print(f"  {c['name'][:52]:<52} (new)")
+                continue
+            parts = []
+            for key, unit in (("p50_ms", "ms"), ("p95_ms", "ms"), ("throughput_per_s", "req/s")):
+                if o.get(key):
+                    change = (c[key] - o[key]) / o[key] * 100
+                    parts.append(f"{key.split('_')[0]} {o[key]:.2f} -> {c[key]:.2f} {unit} ({change:+.1f}%)")
+            print(f"  {c['name'][:52]:<52} " + "  ".join(parts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--suite", action="append", help="suite to run (repeatable; default all)")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs and fewer iterations")
+    parser.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON results")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return _run_child(args.child, args.quick, args.child_out)
+    if args.compare:
+        return compare(*args.compare)
+
+    sys.path.insert(0, BACKEND_DIR)
+    from benchmarks.suites import SUITES
+
+    names = args.suite or list(SUITES)
+    unknown = set(names) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}; choose from {', '.join(SUITES)}")
+
+    results = {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "quick": args.quick,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "env": {k: os.environ.get(k, v) for k, v in CHILD_ENV.items()},
+        "suites": {},
+    }
+    for name in names:
+        print(f"running {name}...", flush=True)
+        results["suites"][name] = run_suite(name, args.quick)
+
+    os.makedirs(args.out, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(args.out, f"{stamp}_{(results['commit'] or 'nogit')[:10]}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print_report(results)
+    print(f"\nsaved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Local stand-ins for Gemini and the web, so benchmarks need no network or API key."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from models.llm import FakeBackend
+
+SCHEMA_MARKER = "Respond with only JSON matching this JSON schema:\n"
+
+EVALUATION_TEXT = (
+    "Feedback Summary: Clear structure, could go deeper on trade-offs.\n"
+    "Professionalism: 8\nPreparation: 6\nCommunication: 7\n"
+    "Strengths:\n- concise\n- concrete example\n"
+    "Areas for Improvement:\n- quantify impact\n"
+    "Overall Impression: solid mid-level answer\n"
+    "Predicted Score: 7\n"
+    "Follow-up Technical Question: How would you shard this service?"
+)
+
+
+def sample(schema: dict):
+    """A small value that validates against `schema` (see models/structured.validate)."""
+    t = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if t == "object":
+        return {k: sample(v) for k, v in schema.get("properties", {}).items()}
+    if t == "array":
+        return [sample(schema.get("items", {"type": "string"})) for _ in range(3)]
+    if t == "integer":
+        return max(schema.get("minimum", 0), min(7, schema.get("maximum", 7)))
+    if t == "number":
+        return 1.0
+    if t == "boolean":
+        return True
+    return "benchmark text"
+
+
+def _respond(prompt: str) -> str:
+    if SCHEMA_MARKER in prompt:
+        schema = json.loads(prompt.split(SCHEMA_MARKER, 1)[1])
+        return json.dumps(sample(schema))
+    if "Evaluate the following interview answer" in prompt:
+        return EVALUATION_TEXT
+    if "---CHANGE SUMMARY---" in prompt:
+        return "Optimized resume text\n" * 40 + "---CHANGE SUMMARY---\n- added keywords\n- modified bullets"
+    return "What is the hardest bug you have fixed recently?"
+
+
+def fake_llm(latency: float = 0.05) -> FakeBackend:
+    """
+    FakeBackend answering each prompt kind the routes send: schema-valid
+    JSON for structured calls, labeled feedback text, delimiter output.
+    `latency` models the network/model time of a real call.
+    """
+    return FakeBackend(response=_respond, latency=latency)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: str, content_type: str):
+        time.sleep(self.server.latency)
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        base = f"http://127.0.0.1:{self.server.server_port}"
+        if self.path.startswith("/search"):
+            self._send(json.dumps({"organic_results": [{"snippet": "Stub Corp builds developer tools."}]}),
+                       "application/json")
+        elif self.path.startswith("/html"):
+            self._send(f'<html><body><a class="result__a" href="{base}/site">Stub Corp</a></body></html>',
+                       "text/html")
+        else:
+            head = '<html><head><meta name="description" content="Stub Corp homepage."></head>'
+            self._send(head + "<body>" + "x" * 200000 + "</body></html>", "text/html")
+
+
+class StubWeb:
+    """
+    Threaded local HTTP server mimicking SerpAPI (/search), DuckDuckGo's HTML
+    results (/html/) and a company homepage (/site). Use as a context manager.
+    """
+
+    def __init__(self, latency: float = 0.02):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.latency = latency
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,268 @@
+"""
+Benchmark suites. Each takes `quick` (smaller sizes, fewer iterations) and
+returns a list of result dicts from benchmarks.harness. A suite raises
+Skip when something it needs (whisper, ffmpeg) isn't installed.
+"""
+import importlib.util
+import io
+import os
+import shutil
+import tempfile
+import uuid
+
+from benchmarks import fixtures
+from benchmarks.harness import bench, bench_concurrent
+
+
+class Skip(Exception):
+    pass
+
+
+def suite_transcribe(quick: bool = False) -> list:
+    if importlib.util.find_spec("whisper") is None:
+        raise Skip("whisper is not installed")
+    from models.whisper.load_model import get_pool
+    from models.whisper.cache import transcript_cache
+    from models.whisper.transcribe import transcribe_file
+
+    results = []
+    pool = get_pool()
+    results.append(bench("whisper model load", lambda i: pool.warm_up(replicas=1, background=False), 1,
+                         warmup=0, model=pool.model_name))
+
+    formats = ["wav"] + (["mp3", "webm"] if shutil.which("ffmpeg") else [])
+    lengths = [2, 5] if quick else [2, 5, 15, 30]
+    iterations = 3 if quick else 8
+    tmp = tempfile.mkdtemp(prefix="bench-audio-")
+    try:
+        for fmt in formats:
+            for seconds in lengths:
+                path = fixtures.write_audio(os.path.join(tmp, f"clip_{seconds}s.{fmt}"), seconds)
+
+                def cold(i, path=path):
+                    transcript_cache.memory.clear()
+                    transcribe_file(path)
+                results.append(bench(f"transcribe_file {fmt} {seconds}s", cold, iterations, warmup=1,
+                                     model=pool.model_name, audio_seconds=seconds))
+
+        path = fixtures.write_wav(os.path.join(tmp, "cached.wav"), 5)
+        results.append(bench("transcribe_file wav 5s (cache hit)", lambda i: transcribe_file(path),
+                             iterations * 5, model=pool.model_name))
+
+        clips = [fixtures.write_wav(os.path.join(tmp, f"c{i}.wav"), 5, seed=i) for i in range(8)]
+
+        def concurrent(i):
+            transcript_cache.memory.clear()
+            transcribe_file(clips[i % len(clips)])
+        for workers in (4, 8):
+            results.append(bench_concurrent(f"transcribe_file wav 5s x{workers} threads", concurrent,
+                                            requests=workers * (2 if quick else 4), concurrency=workers,
+                                            model=pool.model_name))
+
+        # the upload route end to end: multipart parse, in-memory decode, whisper
+        from app import app
+        client = app.test_client()
+        wav = open(fixtures.write_wav(os.path.join(tmp, "upload.wav"), 5), "rb").read()
+
+        def upload(i):
+            transcript_cache.memory.clear()
+            r = client.post("/api/interview/upload_audio",
+                            data={"audio": (io.BytesIO(wav), "answer.wav")})
+            assert r.status_code == 200, r.get_data(as_text=True)
+        results.append(bench("POST /api/interview/upload_audio 5s wav", upload, iterations, warmup=1,
+                             model=pool.model_name))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def suite_parse(quick: bool = False) -> list:
+    from utils import pdf_parser
+    from utils.pdf_parser import extract_text_from_file
+
+    results = []
+    pages = [1, 5, 20] if quick else [1, 5, 20, 50]
+    iterations = 3 if quick else 10
+    tmp = tempfile.mkdtemp(prefix="bench-parse-")
+    try:
+        for kind, write in (("pdf", fixtures.write_pdf), ("docx", fixtures.write_docx)):
+            for n in pages:
+                path = write(os.path.join(tmp, f"resume_{n}.{kind}"), n)
+
+                def cold(i, path=path):
+                    pdf_parser._cache.memory.clear()
+                    extract_text_from_file(path)
+                results.append(bench(f"extract_text_from_file {kind} {n}p", cold, iterations, warmup=1,
+                                     pages=n, bytes=os.path.getsize(path)))
+            results.append(bench(f"extract_text_from_file {kind} {pages[-1]}p (cache hit)",
+                                 lambda i, path=path: extract_text_from_file(path), iterations * 5,
+                                 pages=pages[-1]))
+
+        docs = [fixtures.write_pdf(os.path.join(tmp, f"batch_{i}.pdf"), 2, seed=i) for i in range(16)]
+
+        def batch(i):
+            pdf_parser._cache.memory.clear()
+            extract_text_from_file(docs[i % len(docs)])
+        results.append(bench_concurrent("extract_text_from_file pdf 2p x8 threads", batch,
+                                        requests=16 if quick else 64, concurrency=8))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def suite_keywords(quick: bool = False) -> list:
+    from utils.keyword_matcher import (
+        KeywordMatcher, extract_keywords_from_jd, score_resumes_against_jd, score_resume_against_jds,
+    )
+
+    results = []
+    iterations = 5 if quick else 20
+    for jd_words, resume_words in ((400, 600), (5000, 10000)):
+        jd = fixtures.make_jd(jd_words)
+        resume = fixtures.make_resume(resume_words)
+        results.append(bench(f"compile JD {jd_words}w",
+                             lambda i, jd=jd: KeywordMatcher(extract_keywords_from_jd(jd)), iterations))
+        matcher = KeywordMatcher(extract_keywords_from_jd(jd))
+        results.append(bench(f"match resume {resume_words}w vs JD {jd_words}w",
+                             lambda i, resume=resume: matcher.score(resume), iterations))
+
+    jd = fixtures.make_jd(800)
+    n = 100 if quick else 500
+    resumes = [fixtures.make_resume(800, seed=i) for i in range(n)]
+    results.append(bench(f"score {n} resumes vs one JD", lambda i: score_resumes_against_jd(resumes, jd),
+                         3 if quick else 5, warmup=1, resumes=n))
+    jds = [fixtures.make_jd(400, seed=i) for i in range(n // 2)]
+    resume = fixtures.make_resume(1500)
+    results.append(bench(f"score one resume vs {len(jds)} JDs", lambda i: score_resume_against_jds(resume, jds),
+                         3 if quick else 5, warmup=1, jds=len(jds)))
+    return results
+
+
+def suite_relevance(quick: bool = False) -> list:
+    from utils.relevance import RelevanceIndex
+
+    results = []
+    n = 2000 if quick else 20000
+    resumes = [fixtures.make_resume(300, seed=i) for i in range(n)]
+    jds = [fixtures.make_jd(200, seed=i) for i in range(200)]
+    tmp = tempfile.mkdtemp(prefix="bench-relevance-")
+    try:
+        for label, path in (("memory", None), ("mmap", tmp)):
+            index = RelevanceIndex(path)
+
+            def build(i, index=index):
+                for start in range(0, n, 1000):
+                    index.add_many([(f"r{i}", resumes[i], "resume") for i in range(start, min(start + 1000, n))])
+                index.add_many([(f"j{i}", jd, "jd") for i, jd in enumerate(jds)])
+            # one timed build; its throughput is documents indexed per second
+            row = bench(f"index {n} resumes ({label})", build, 1, warmup=0, documents=n + len(jds))
+            row["throughput_per_s"] = round(row["documents"] / (row["p50_ms"] / 1000), 2)
+            results.append({**row, **index.stats()})
+            results.append(bench(f"top 10 resumes for a JD of {n} ({label})",
+                                 lambda i, index=index: index.top_k(jds[i % len(jds)], 10), 20, documents=n))
+            results.append(bench(f"top 10 JDs for a resume ({label})",
+                                 lambda i, index=index: index.top_k(resumes[i], 10, kind="jd"), 20))
+            results.append(bench(f"add one resume to {n} ({label})",
+                                 lambda i, index=index: index.add(f"new{i}", resumes[i], "resume"), 20))
+        results.append(bench("reopen mmap index", lambda i: RelevanceIndex(tmp), 3, warmup=0, documents=n))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def suite_routes(quick: bool = False) -> list:
+    """End-to-end requests through the Flask test client with a fake LLM and stub web."""
+    from models.gemini import set_backend
+    from utils import storage, web_scraper
+    from benchmarks.stubs import StubWeb, fake_llm
+
+    latency = 0.05
+    set_backend(fake_llm(latency))
+    from app import app
+
+    results = []
+    iterations = 5 if quick else 20
+    requests = 16 if quick else 64
+    tmp = tempfile.mkdtemp(prefix="bench-routes-")
+    # uploads and optimized resumes go to a throwaway store
+    storage._store = storage.BlobStore(os.path.join(tmp, "store"), gc_interval=0)
+    try:
+        with StubWeb() as web:
+            web_scraper._fetcher = web_scraper.ResearchFetcher(
+                serpapi_key="bench", serpapi_url=f"{web.url}/search", ddg_url=f"{web.url}/html/")
+            client = app.test_client()
+
+            def post_json(url, body):
+                r = client.post(url, json=body)
+                assert r.status_code == 200, (url, r.status_code, r.get_data(as_text=True)[:200])
+                return r
+
+            def question(i):
+                post_json("/api/gemini/generate", {"prompt": f"Generate interview question #{i}"})
+
+            session = client.post("/api/interview/start_interview").get_json()["session_id"]
+
+            def evaluate(i):
+                post_json("/api/gemini/generate", {
+                    "prompt": f"Evaluate the following interview answer for a dev (mid):\nanswer {i}",
+                    "session_id": session, "answer": f"answer {i}",
+                })
+
+            def research(tag=None):
+                # a fresh tag per benchmark so companies aren't already cached
+                tag = tag or uuid.uuid4().hex[:6]
+                return lambda i: post_json("/api/research/company_role",
+                                           {"company": f"Stub {tag} {i}", "role": "Backend Engineer"})
+
+            resume_txt = fixtures.make_resume(600).encode()
+            resume_pdf = open(fixtures.write_pdf(os.path.join(tmp, "resume.pdf"), 2), "rb").read()
+
+            def optimize(data, name):
+                def call(i, tag=uuid.uuid4().hex[:6]):
+                    r = client.post("/api/resume/optimize", data={
+                        "job_description": fixtures.make_jd(300, seed=i) + f" {tag}{i}",
+                        "resume": (io.BytesIO(data), name),
+                    })
+                    assert r.status_code == 200, r.get_data(as_text=True)[:200]
+                return call
+
+            meta = {"llm_latency_ms": latency * 1000}
+            index_html = client.get("/").get_data(as_text=True)
+            app_js = "/" + index_html.split('<script src="', 1)[1].split('"', 1)[0]
+            results.append(bench("GET / (gzip)", lambda i: client.get("/", headers={"Accept-Encoding": "gzip"}),
+                                 iterations * 20))
+            etag = client.get(app_js, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+            results.append(bench("GET app.js (If-None-Match, 304)", lambda i: client.get(
+                app_js, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}), iterations * 20))
+            results.append(bench("POST /api/gemini/generate question", question, iterations, **meta))
+            results.append(bench("POST /api/gemini/generate evaluation", evaluate, iterations, **meta))
+            results.append(bench("POST /api/interview/end_interview (session)",
+                                 lambda i: post_json("/api/interview/end_interview", {"session_id": session}),
+                                 1, warmup=0, turns=iterations + 2))
+            results.append(bench("POST /api/research/company_role", research(), iterations, **meta))
+            cached = research("cached")
+            results.append(bench("POST /api/research/company_role (cached)",
+                                 lambda i: cached(0), iterations, **meta))
+            results.append(bench("POST /api/resume/optimize txt", optimize(resume_txt, "resume.txt"),
+                                 iterations, **meta))
+            results.append(bench("POST /api/resume/optimize pdf", optimize(resume_pdf, "resume.pdf"),
+                                 iterations, **meta))
+            for workers in (8, 32):
+                results.append(bench_concurrent(f"POST /api/gemini/generate evaluation x{workers}", evaluate,
+                                                requests, workers, **meta))
+                results.append(bench_concurrent(f"POST /api/resume/optimize txt x{workers}",
+                                                optimize(resume_txt, "resume.txt"), requests, workers, **meta))
+                results.append(bench_concurrent(f"POST /api/research/company_role x{workers}", research(),
+                                                requests, workers, **meta))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+SUITES = {
+    "transcribe": suite_transcribe,
+    "parse": suite_parse,
+    "keywords": suite_keywords,
+    "relevance": suite_relevance,
+    "routes": suite_routes,
+}
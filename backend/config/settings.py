@@ -19,6 +19,96 @@ for d in (UPLOAD_DIR, UPLOAD_AUDIO_DIR, UPLOAD_RESUME_DIR, OUTPUT_DIR, OUTPUT_RE
 
 # Whisper config
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")  # tiny, base, small, medium, large
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "")  # cpu, cuda; empty lets whisper pick
+WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", "1"))  # model replicas per process
+WHISPER_WARMUP = os.getenv("WHISPER_WARMUP", "0") == "1"  # load in background at startup
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "8"))  # clips per batched decode
+WHISPER_BATCH_WAIT_MS = int(os.getenv("WHISPER_BATCH_WAIT_MS", "50"))  # how long to wait for a batch to fill
+WHISPER_QUEUE_SIZE = int(os.getenv("WHISPER_QUEUE_SIZE", "64"))  # pending clips before returning 503
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "256"))  # in-memory transcripts
+TRANSCRIPT_CACHE_DISK = os.getenv("TRANSCRIPT_CACHE_DISK", "0") == "1"  # also keep them under OUTPUT_DIR
+TRANSCRIPT_CACHE_DIR = os.path.join(OUTPUT_DIR, "transcripts")
+SAVE_AUDIO_UPLOADS = os.getenv("SAVE_AUDIO_UPLOADS", "0") == "1"  # keep raw answer audio in the upload store
+
+# live answer streaming (/api/interview/stream)
+STREAM_VAD_THRESHOLD = float(os.getenv("STREAM_VAD_THRESHOLD", "0.01"))  # frame RMS counted as speech
+STREAM_SILENCE_MS = int(os.getenv("STREAM_SILENCE_MS", "600"))  # pause that ends a segment
+STREAM_PARTIAL_STEP_MS = int(os.getenv("STREAM_PARTIAL_STEP_MS", "2000"))  # new audio between partial transcripts
+STREAM_SESSION_TTL = int(os.getenv("STREAM_SESSION_TTL", "600"))  # seconds before an idle stream is dropped
+STREAM_MAX_OPEN = int(os.getenv("STREAM_MAX_OPEN", "32"))  # open streams per process before returning 503
+
+# interview sessions (utils/sessions.py)
+SESSION_TTL = float(os.getenv("SESSION_TTL", "7200"))  # seconds an idle interview session is kept
+SESSION_MAX = int(os.getenv("SESSION_MAX", "1000"))  # sessions held in memory per process
+SESSION_DB = os.getenv("SESSION_DB", "")  # SQLite path; empty keeps sessions in memory only
+
+# content-addressed upload store (utils/storage.py)
+STORE_DIR = os.getenv("STORE_DIR", os.path.join(UPLOAD_DIR, "store"))  # uploads and optimized resumes
+STORE_MAX_BYTES = int(os.getenv("STORE_MAX_BYTES", str(2 * 1024 ** 3)))  # unreferenced blobs are evicted past this
+STORE_MAX_AGE = float(os.getenv("STORE_MAX_AGE", str(7 * 86400)))  # seconds an unreferenced blob is kept
+STORE_GC_INTERVAL = float(os.getenv("STORE_GC_INTERVAL", "600"))  # seconds between GC passes; 0 disables
+
+# resume parsing (utils/pdf_parser.py)
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "50"))
+PARSE_PARALLEL_MIN_PAGES = int(os.getenv("PARSE_PARALLEL_MIN_PAGES", "8"))  # smaller PDFs parse in-process
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "256"))  # parsed resumes kept in memory
+PARSE_CACHE_DISK = os.getenv("PARSE_CACHE_DISK", "0") == "1"
+PARSE_CACHE_DIR = os.path.join(OUTPUT_DIR, "parsed")
+
+# relevance index (utils/relevance.py)
+RELEVANCE_FEATURES = int(os.getenv("RELEVANCE_FEATURES", str(1 << 18)))  # hashed term space, power of two
+RELEVANCE_DISK = os.getenv("RELEVANCE_DISK", "0") == "1"  # memory-mapped files under OUTPUT_DIR, shared by workers
+RELEVANCE_DIR = os.path.join(OUTPUT_DIR, "relevance")
+RELEVANCE_MAX_DOCS = int(os.getenv("RELEVANCE_MAX_DOCS", "100000"))  # oldest documents are evicted past this
+
+# bulk screening (/api/screening)
+SCREEN_WORKERS = int(os.getenv("SCREEN_WORKERS", str(os.cpu_count() or 1)))  # parser processes
+SCREEN_MAX_FILES = int(os.getenv("SCREEN_MAX_FILES", "1000"))  # resumes per job
+SCREEN_MAX_BYTES = int(os.getenv("SCREEN_MAX_BYTES", str(512 * 1024 * 1024)))  # uncompressed bytes per job
+SCREEN_MAX_JOBS = int(os.getenv("SCREEN_MAX_JOBS", "50"))  # finished jobs kept for polling
+
+# background jobs (utils/jobs.py)
+JOB_CPU_WORKERS = int(os.getenv("JOB_CPU_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))  # transcription/parsing
+JOB_IO_WORKERS = int(os.getenv("JOB_IO_WORKERS", "16"))  # LLM calls/scraping
+JOB_CPU_EXECUTOR = os.getenv("JOB_CPU_EXECUTOR", "thread")  # thread, process
+JOB_DB = os.getenv("JOB_DB", "")  # SQLite path; empty keeps jobs in memory only
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))  # seconds finished jobs stay pollable
+
+# LLM client (models/gemini.py)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # gemini, fake
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # in-flight calls per process
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))  # seconds per call, retries included
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))  # retries on 429/5xx
+LLM_BACKOFF = float(os.getenv("LLM_BACKOFF", "0.5"))  # first retry delay, doubled each time
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))  # cached research/resume responses
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))  # seconds
+LLM_CACHE_DISK = os.getenv("LLM_CACHE_DISK", "0") == "1"  # persist the cache in SQLite
+LLM_CACHE_DB = os.path.join(OUTPUT_DIR, "llm_cache.sqlite3")
+
+# serving (gunicorn.conf.py, /readyz)
+PORT = int(os.getenv("PORT", "7860"))
+# live streams and screening jobs live in one process's memory: more than one
+# worker also needs JOB_DB and SESSION_DB, and see the README before raising it
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))  # server processes
+WEB_THREADS = int(os.getenv("WEB_THREADS", "16"))  # request threads per process
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "0") == "1"  # load whisper before forking workers
+FLASK_DEBUG = os.getenv("FLASK_DEBUG", "0") == "1"
+PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")  # request header that turns on Server-Timing output
+
+# prompt budgets (utils/prompt_budget.py), in estimated tokens
+PROMPT_CHARS_PER_TOKEN = int(os.getenv("PROMPT_CHARS_PER_TOKEN", "4"))  # estimate used instead of a tokenizer
+PROMPT_RESUME_TOKENS = int(os.getenv("PROMPT_RESUME_TOKENS", "6000"))  # resume text in optimize prompts (~24k chars)
+PROMPT_JD_TOKENS = int(os.getenv("PROMPT_JD_TOKENS", "1500"))  # job description in optimize prompts
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "1500"))  # scraped overview, answer transcripts
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "8000"))  # any client-supplied prompt
 
 # SerpAPI (optional) for research agent
 SERPAPI_KEY = os.getenv("SERPAPI_KEY", "")
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search")
+DUCKDUCKGO_URL = os.getenv("DUCKDUCKGO_URL", "https://duckduckgo.com/html/")
+RESEARCH_DEADLINE = float(os.getenv("RESEARCH_DEADLINE", "8"))  # seconds for the whole overview lookup
+RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", "21600"))  # per-company overview cache
+RESEARCH_MAX_PAGE_BYTES = int(os.getenv("RESEARCH_MAX_PAGE_BYTES", "262144"))  # cap on fetched pages
@@ -0,0 +1,47 @@
+# Production server config: gunicorn -c gunicorn.conf.py wsgi:app
+# Sizes come from the same env vars as config/settings.py.
+import sys
+
+from config.settings import PORT, WEB_WORKERS, WEB_THREADS, JOB_DB, SESSION_DB
+
+bind = f"0.0.0.0:{PORT}"
+workers = WEB_WORKERS
+threads = WEB_THREADS
+worker_class = "gthread"
+
+# import the app (and, with PRELOAD_MODELS=1, the Whisper weights) once in
+# the master so workers share that memory copy-on-write
+preload_app = True
+
+# transcription and LLM calls can legitimately take a while
+timeout = 180
+graceful_timeout = 30
+keepalive = 5
+
+# recycle workers now and then to bound memory growth
+max_requests = 2000
+max_requests_jitter = 200
+
+
+def on_starting(server):
+    # with several workers, per-process state is only seen by the worker that created it
+    if server.cfg.workers <= 1:
+        return
+    missing = [name for name, value in (("JOB_DB", JOB_DB), ("SESSION_DB", SESSION_DB)) if not value]
+    if missing:
+        server.log.error("%d workers need %s set so jobs and interview sessions are shared; "
+                         "set them or run one worker (WEB_WORKERS=1)", server.cfg.workers, " and ".join(missing))
+        sys.exit(1)
+    server.log.warning("%d workers: live answer streams (/api/interview/stream) and screening jobs "
+                       "(/api/screening/jobs) stay in the worker that created them, so their follow-up "
+                       "requests must reach the same worker", server.cfg.workers)
+
+
+def post_fork(server, worker):
+    # background job threads are started per worker; only the first worker
+    # re-queues jobs persisted in JOB_DB so they don't run twice
+    from utils.jobs import jobs
+    jobs.start(recover=worker.age == 1)
+    # a warm-up thread started in the master would not survive the fork
+    from app import warm_models
+    warm_models()
@@ -1,16 +1,123 @@
 import os
-import google.generativeai as genai
+import threading
 
-# Load API key from env
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    raise ValueError("GEMINI_API_KEY not found. Please set it as an environment variable.")
+from config.settings import GEMINI_MODEL, LLM_BACKEND
+from models.llm import LLMBackend, LLMClient, FakeBackend
+from models.response_cache import response_cache, prompt_key
+from utils.metrics import span
 
-genai.configure(api_key=API_KEY)
 
-# Use flash for speed & free quota
-model = genai.GenerativeModel("gemini-1.5-flash")
+class GeminiBackend(LLMBackend):
+    """Google Gemini via google-generativeai, configured on first use."""
 
-def generate_response(prompt):
-    response = model.generate_content(prompt)
-    return response.text
+    name = "gemini"
+
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._genai = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    # Load API key from env
+                    api_key = os.getenv("GEMINI_API_KEY")
+                    if not api_key:
+                        raise ValueError("GEMINI_API_KEY not found. Please set it as an environment variable.")
+                    genai.configure(api_key=api_key)
+                    self._genai = genai
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt, config, timeout):
+        model = self._get_model()
+        response = model.generate_content(
+            prompt,
+            generation_config=self._genai.GenerationConfig(**config) if config else None,
+            request_options={"timeout": timeout},
+        )
+        return response.text
+
+    def stream(self, prompt, config, timeout):
+        model = self._get_model()
+        response = model.generate_content(
+            prompt,
+            generation_config=self._genai.GenerationConfig(**config) if config else None,
+            request_options={"timeout": timeout},
+            stream=True,
+        )
+        for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+def _make_backend() -> LLMBackend:
+    if LLM_BACKEND == "fake":
+        return FakeBackend()
+    # Use flash for speed & free quota
+    return GeminiBackend()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient(_make_backend())
+    return _client
+
+
+def set_backend(backend: LLMBackend) -> LLMClient:
+    """Swap the backend used by generate_response (e.g. a FakeBackend in benchmarks)."""
+    global _client
+    with _client_lock:
+        _client = LLMClient(backend)
+    return _client
+
+
+def generate_response(prompt, timeout: float = None, **config):
+    """
+    Blocking generation through the shared client.
+    Keyword arguments such as max_tokens or temperature go to the model.
+    """
+    with span("llm"):
+        return get_client().generate(prompt, timeout=timeout, **config)
+
+
+def stream_response(prompt, timeout: float = None, **config):
+    """Yield the response text in chunks as the model produces it."""
+    with span("llm_stream"):
+        yield from get_client().stream(prompt, timeout=timeout, **config)
+
+
+async def agenerate_response(prompt, timeout: float = None, **config):
+    return await get_client().agenerate(prompt, timeout=timeout, **config)
+
+
+def _model_id(client: LLMClient) -> str:
+    return f"{client.backend.name}:{getattr(client.backend, 'model_name', '')}"
+
+
+def generate_cached(prompt, timeout: float = None, **config):
+    """
+    generate_response for deterministic prompts: identical prompts (after
+    whitespace normalization) with the same model and config are answered
+    from the response cache, and concurrent duplicates share one call.
+    """
+    client = get_client()
+    key = prompt_key(prompt, _model_id(client), config)
+    with span("llm_cached"):
+        return response_cache.get_or_generate(key, lambda: client.generate(prompt, timeout=timeout, **config))
+
+
+def forget_cached(prompt, **config):
+    """Evict a generate_cached response so the next identical call goes to the model."""
+    response_cache.pop(prompt_key(prompt, _model_id(get_client()), config))
@@ -0,0 +1,192 @@
+import asyncio
+import random
+import threading
+import time
+
+from config.settings import LLM_MAX_CONCURRENCY, LLM_TIMEOUT, LLM_MAX_RETRIES, LLM_BACKOFF
+
+
+class LLMError(Exception):
+    """Raised when an LLM call fails after all retries."""
+
+
+class LLMTimeoutError(LLMError, TimeoutError):
+    """Raised when a call can't finish within its deadline."""
+
+
+# generation options we accept, mapped to the backend's own names
+_CONFIG_ALIASES = {"max_tokens": "max_output_tokens"}
+
+
+def normalize_config(config: dict) -> dict:
+    return {_CONFIG_ALIASES.get(k, k): v for k, v in config.items() if v is not None}
+
+
+def is_retryable(e: Exception) -> bool:
+    """429s, 5xx and transport timeouts are worth retrying; anything else isn't."""
+    if isinstance(e, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(e, "code", None)
+    if not isinstance(code, int):
+        code = getattr(e, "status_code", None)
+    return isinstance(code, int) and (code == 429 or code >= 500)
+
+
+class LLMBackend:
+    """
+    Interface for text generation backends.
+    `config` holds generation options (max_output_tokens, temperature, ...).
+    """
+
+    name = "base"
+
+    def generate(self, prompt: str, config: dict, timeout: float) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, config: dict, timeout: float):
+        """Yield text chunks as they are generated. Defaults to one chunk."""
+        yield self.generate(prompt, config, timeout)
+
+
+class FakeBackend(LLMBackend):
+    """
+    Local stand-in for tests and benchmarks. Returns `response` (a string or a
+    callable taking the prompt) after `latency` seconds. The first
+    `fail_times` calls raise an error with HTTP status `fail_code`.
+    """
+
+    name = "fake"
+
+    def __init__(self, response=None, latency: float = 0.0, fail_times: int = 0, fail_code: int = 503):
+        self.response = response
+        self.latency = latency
+        self.fail_times = fail_times
+        self.fail_code = fail_code
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _text(self, prompt: str) -> str:
+        if callable(self.response):
+            return self.response(prompt)
+        if self.response is not None:
+            return self.response
+        return f"[fake response to {len(prompt)} chars]"
+
+    def generate(self, prompt, config, timeout):
+        with self._lock:
+            self.calls += 1
+            fail = self.calls <= self.fail_times
+        if self.latency:
+            if self.latency > timeout:
+                time.sleep(timeout)
+                raise TimeoutError("fake backend timed out")
+            time.sleep(self.latency)
+        if fail:
+            err = LLMError(f"fake backend error {self.fail_code}")
+            err.code = self.fail_code
+            raise err
+        return self._text(prompt)
+
+    def stream(self, prompt, config, timeout):
+        text = self.generate(prompt, config, timeout)
+        for i in range(0, len(text), 16):
+            yield text[i:i + 16]
+
+
+class LLMClient:
+    """
+    Wraps a backend with a concurrency cap, per-call deadlines and
+    exponential-backoff retries. Safe to share between threads.
+    """
+
+    def __init__(self, backend: LLMBackend, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 timeout: float = LLM_TIMEOUT, max_retries: int = LLM_MAX_RETRIES,
+                 backoff: float = LLM_BACKOFF):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self, deadline: float):
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise LLMTimeoutError("timed out waiting for an LLM slot")
+        with self._lock:
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def generate(self, prompt: str, timeout: float = None, **config) -> str:
+        """
+        Generate text for `prompt`. `timeout` is the deadline for the whole
+        call including queueing and retries; extra keyword arguments
+        (max_tokens, temperature, ...) are passed to the backend.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        config = normalize_config(config)
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMTimeoutError("LLM call exceeded its deadline")
+            self._acquire(deadline)
+            try:
+                return self.backend.generate(prompt, config, max(0.1, deadline - time.monotonic()))
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                err = e
+            finally:
+                self._release()
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            if time.monotonic() + delay >= deadline:
+                raise LLMTimeoutError("no time left to retry") from err
+            time.sleep(delay)
+            attempt += 1
+
+    def stream(self, prompt: str, timeout: float = None, **config):
+        """
+        Yield text chunks from the backend as they arrive. Retries only
+        happen before the first chunk; the slot is held until the stream ends.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        config = normalize_config(config)
+        attempt = 0
+        while True:
+            self._acquire(deadline)
+            started = False
+            try:
+                for chunk in self.backend.stream(prompt, config, max(0.1, deadline - time.monotonic())):
+                    if time.monotonic() > deadline:
+                        raise LLMTimeoutError("LLM stream exceeded its deadline")
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                err = e
+            finally:
+                self._release()
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            if time.monotonic() + delay >= deadline:
+                raise LLMTimeoutError("no time left to retry") from err
+            time.sleep(delay)
+            attempt += 1
+
+    async def agenerate(self, prompt: str, timeout: float = None, **config) -> str:
+        """Async version of generate(); runs the blocking call in a worker thread."""
+        return await asyncio.to_thread(self.generate, prompt, timeout, **config)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+        }
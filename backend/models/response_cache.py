@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from config.settings import LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_DISK, LLM_CACHE_DB
+from utils.cache import LRUCache
+
+_WS = re.compile(r"\s+")
+
+
+def prompt_key(prompt: str, model: str, config: dict) -> str:
+    """Hash of the whitespace-normalized prompt, model name and generation config."""
+    h = hashlib.sha256()
+    h.update(model.encode())
+    h.update(json.dumps(config or {}, sort_keys=True, default=str).encode())
+    h.update(_WS.sub(" ", prompt).strip().encode())
+    return h.hexdigest()
+
+
+class _SQLiteTier:
+    def __init__(self, path: str):
+        self.path = path
+        self._pid = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db().execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+            )
+            self._db().commit()
+
+    def _db(self):
+        # sqlite connections must not cross fork(); reconnect in each process
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db().execute(
+                "SELECT value, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl if ttl else None),
+            )
+            # expired rows are cheap to drop while we hold the lock
+            self._db().execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+            self._db().commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._db().execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db().commit()
+
+
+class ResponseCache:
+    """
+    Cache for deterministic LLM prompts: TTL+LRU in memory, an optional
+    SQLite tier that survives restarts, and single-flight so concurrent
+    identical prompts share one upstream call.
+    """
+
+    def __init__(self, maxsize: int = LLM_CACHE_SIZE, ttl: float = LLM_CACHE_TTL,
+                 db_path: str = LLM_CACHE_DB if LLM_CACHE_DISK else None):
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize, ttl=ttl)
+        self.disk = _SQLiteTier(db_path) if db_path else None
+        self.disk_hits = 0
+        self.shared = 0  # callers that waited on another caller's request
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: str):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value, self.ttl)
+
+    def pop(self, key: str):
+        """Drop a cached response, e.g. one that turned out to be unusable."""
+        self.memory.pop(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def get_or_generate(self, key: str, generate):
+        """Return the cached value for `key`, or call generate() exactly once for it."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is None:
+                # a leader may have stored the value and left between our miss and the lock
+                value = self.memory.get(key)
+                if value is not None:
+                    return value
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[key] = fut
+            else:
+                self.shared += 1
+        if not leader:
+            return fut.result()
+        try:
+            value = generate()
+            self.set(key, value)
+            fut.set_result(value)
+            return value
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        s = self.memory.stats()
+        s.update({"disk_hits": self.disk_hits, "shared": self.shared, "disk": self.disk is not None})
+        return s
+
+
+response_cache = ResponseCache()
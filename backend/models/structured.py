@@ -0,0 +1,162 @@
+import json
+import logging
+import threading
+
+from models.llm import LLMError
+from models.gemini import generate_cached, generate_response, forget_cached
+
+log = logging.getLogger(__name__)
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+# the subset of schema keywords Gemini's response_schema understands
+_MODEL_KEYS = {"type", "format", "description", "nullable", "enum", "items", "properties", "required"}
+_decoder = json.JSONDecoder()
+
+
+class StructuredOutputError(LLMError):
+    """Raised when a response still doesn't match its schema after the repair call."""
+
+    def __init__(self, message: str, raw: str = ""):
+        super().__init__(message)
+        self.raw = raw
+
+
+def validate(value, schema: dict, path: str = "$") -> list:
+    """
+    Check `value` against a small JSON-schema subset (type, properties,
+    required, items, enum, minimum, maximum). Returns a list of problems.
+    """
+    t = schema.get("type")
+    if value is None and schema.get("nullable"):
+        return []
+    if t:
+        ok = isinstance(value, _TYPES[t]) and not (t in ("integer", "number") and isinstance(value, bool))
+        if not ok:
+            return [f"{path}: expected {t}, got {type(value).__name__}"]
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} not one of {schema['enum']}")
+    if "minimum" in schema and value < schema["minimum"]:
+        errors.append(f"{path}: {value} is below {schema['minimum']}")
+    if "maximum" in schema and value > schema["maximum"]:
+        errors.append(f"{path}: {value} is above {schema['maximum']}")
+    if t == "object":
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}: missing {key!r}")
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate(value[key], sub, f"{path}.{key}"))
+    elif t == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def parse_json(text: str, opener: str = None):
+    """
+    Decode the first JSON value starting with `opener` ("{" or "[", either
+    by default) in `text`. Markdown fences and chatter around it are skipped.
+    """
+    starts = [i for i in (text.find(c) for c in (opener or "{[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON value found")
+    value, _ = _decoder.raw_decode(text, min(starts))
+    return value
+
+
+def parse(text: str, schema: dict):
+    """parse_json + validate; raises ValueError describing what is wrong."""
+    try:
+        value = parse_json(text, {"object": "{", "array": "["}.get(schema.get("type")))
+    except ValueError as e:
+        raise ValueError(f"invalid JSON: {e}")
+    errors = validate(value, schema)
+    if errors:
+        raise ValueError("; ".join(errors[:10]))
+    return value
+
+
+def model_schema(schema: dict) -> dict:
+    """Strip keywords the model API rejects (minimum, maximum, ...)."""
+    out = {k: v for k, v in schema.items() if k in _MODEL_KEYS}
+    if "properties" in out:
+        out["properties"] = {k: model_schema(v) for k, v in out["properties"].items()}
+    if "items" in out:
+        out["items"] = model_schema(out["items"])
+    return out
+
+
+class _Counters:
+    """Per-route call / parse-failure counts, so wasted LLM calls show up in /metrics."""
+
+    FIELDS = ("calls", "parsed", "parse_failures", "repaired", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def inc(self, route: str, field: str):
+        with self._lock:
+            counts = self._routes.setdefault(route, dict.fromkeys(self.FIELDS, 0))
+            counts[field] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {route: dict(c) for route, c in self._routes.items()}
+
+
+counters = _Counters()
+
+
+def generate_structured(prompt: str, schema: dict, route: str, timeout: float = None, cached: bool = True):
+    """
+    Ask the model for JSON matching `schema` and return the decoded value.
+    If the reply doesn't parse or validate, one repair call is made that
+    sends only the bad output and the problem, not the original prompt.
+    Raises StructuredOutputError if the repaired output is still invalid.
+    """
+    generate = generate_cached if cached else generate_response
+    config = {"response_mime_type": "application/json", "response_schema": model_schema(schema)}
+    schema_text = json.dumps(schema)
+    full_prompt = f"{prompt}\n\nRespond with only JSON matching this JSON schema:\n{schema_text}"
+
+    counters.inc(route, "calls")
+    raw = generate(full_prompt, timeout=timeout, **config)
+    try:
+        value = parse(raw, schema)
+        counters.inc(route, "parsed")
+        return value
+    except ValueError as e:
+        counters.inc(route, "parse_failures")
+        problem = str(e)
+        log.warning("%s: structured output rejected (%s), repairing", route, problem)
+
+    repair_prompt = (
+        "The JSON below does not match the required schema.\n"
+        f"Problem: {problem}\n\nSchema:\n{schema_text}\n\nJSON:\n{raw}\n\n"
+        "Return only the corrected JSON, keeping all content that is already valid."
+    )
+    fixed = generate(repair_prompt, timeout=timeout, **config)
+    try:
+        value = parse(fixed, schema)
+        counters.inc(route, "repaired")
+        return value
+    except ValueError as e:
+        counters.inc(route, "failed")
+        if cached:
+            # don't keep serving the same unusable replies from the cache
+            forget_cached(full_prompt, **config)
+            forget_cached(repair_prompt, **config)
+        raise StructuredOutputError(f"{route}: {e}", raw=raw)
+
+
+def structured_stats() -> dict:
+    return counters.snapshot()
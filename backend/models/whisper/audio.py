@@ -0,0 +1,214 @@
+import io
+import subprocess
+import tempfile
+import threading
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000  # what whisper expects
+CHUNK_SIZE = 64 * 1024
+
+
+def _pcm16_to_float(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+
+def _try_wav(data: bytes, sr: int):
+    """
+    Decode in-process if this is already a PCM16 mono WAV at the target rate,
+    which is the common case for browser recordings resampled client side.
+    """
+    if not data.startswith(b"RIFF"):
+        return None
+    try:
+        with wave.open(io.BytesIO(data)) as w:
+            if w.getsampwidth() != 2 or w.getnchannels() != 1 or w.getframerate() != sr:
+                return None
+            return _pcm16_to_float(w.readframes(w.getnframes()))
+    except (wave.Error, EOFError):
+        return None
+
+
+def _ffmpeg(input_arg: str, sr: int):
+    return [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+        "-i", input_arg,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "-",
+    ]
+
+
+def _is_mp4(head: bytes) -> bool:
+    # ISO base media (mp4/m4a/mov): an "ftyp" box first. The moov atom may sit
+    # at the end of the file, which ffmpeg can only reach on seekable input.
+    return head[4:8] == b"ftyp"
+
+
+def _run_ffmpeg(input_arg: str, sr: int, feed=None) -> bytes:
+    """
+    Run ffmpeg and return its PCM output. `feed`, if given, is called in a
+    thread with the process to write stdin; stderr is drained in another so
+    neither pipe can fill up and stall the decoder.
+    """
+    proc = subprocess.Popen(
+        _ffmpeg(input_arg, sr),
+        stdin=subprocess.PIPE if feed else subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    stderr, feed_error = [], []
+
+    def _drain():
+        stderr.append(proc.stderr.read())
+
+    def _feed():
+        try:
+            feed(proc)
+        except Exception as e:
+            feed_error.append(e)
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    threads = [threading.Thread(target=_drain, daemon=True)]
+    if feed:
+        threads.append(threading.Thread(target=_feed, daemon=True))
+    for t in threads:
+        t.start()
+    pcm = proc.stdout.read()
+    proc.wait()
+    for t in threads:
+        t.join()
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio: {b''.join(stderr).decode(errors='ignore')}")
+    if feed_error:
+        raise RuntimeError(f"Failed to read audio input: {feed_error[0]}") from feed_error[0]
+    return pcm
+
+
+def decode_audio(source, sr: int = SAMPLE_RATE, tee=None) -> np.ndarray:
+    """
+    Decode audio to a mono float32 array at `sr` Hz, in memory where possible.
+
+    `source` may be a path, raw bytes, or a readable stream (e.g. a werkzeug
+    upload). Streams are piped into a single ffmpeg process as they are read,
+    except mp4/m4a, which is spooled to a temp file first because it may not
+    demux from a pipe. If `tee` is a writable file, raw bytes/stream input is
+    copied into it too.
+    """
+    if isinstance(source, str):
+        # already on disk, so there is nothing to tee
+        with open(source, "rb") as f:
+            if f.read(4) == b"RIFF":
+                f.seek(0)
+                audio = _try_wav(f.read(), sr)
+                if audio is not None:
+                    return audio
+        return _pcm16_to_float(_run_ffmpeg(source, sr))
+
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+        if tee is not None:
+            tee.write(data)
+            tee = None
+        audio = _try_wav(data, sr)
+        if audio is not None:
+            return audio
+        source = io.BytesIO(data)
+
+    head = source.read(CHUNK_SIZE)
+    if tee is not None:
+        tee.write(head)
+
+    def _chunks():
+        yield head
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            if tee is not None:
+                tee.write(chunk)
+            yield chunk
+
+    if _is_mp4(head):
+        with tempfile.NamedTemporaryFile(suffix=".m4a") as spool:
+            for chunk in _chunks():
+                spool.write(chunk)
+            spool.flush()
+            return _pcm16_to_float(_run_ffmpeg(spool.name, sr))
+
+    def _feed(proc):
+        for chunk in _chunks():
+            proc.stdin.write(chunk)
+
+    return _pcm16_to_float(_run_ffmpeg("pipe:0", sr, feed=_feed))
+
+
+class StreamDecoder:
+    """
+    One ffmpeg process per live stream: container chunks (e.g. MediaRecorder
+    webm/ogg) are written to its stdin as they arrive and the PCM it has
+    produced so far is collected by a reader thread, so each chunk costs
+    only its own decoding. read() hands over (and forgets) the decoded audio.
+    """
+
+    def __init__(self, sr: int = SAMPLE_RATE):
+        cmd = _ffmpeg("pipe:0", sr)
+        # start decoding as soon as the container header is in, not after 5 s of probing
+        # (not -fflags nobuffer: it loses the first opus frame)
+        cmd[cmd.index("-i"):cmd.index("-i")] = ["-probesize", "32768", "-analyzeduration", "0"]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE)
+        self._pcm = bytearray()
+        self._stderr = []
+        self._cond = threading.Condition()
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+        threading.Thread(target=lambda: self._stderr.append(self._proc.stderr.read()), daemon=True).start()
+
+    def _read_stdout(self):
+        out = self._proc.stdout
+        while True:
+            chunk = out.read1(CHUNK_SIZE)
+            if not chunk:
+                break
+            with self._cond:
+                self._pcm.extend(chunk)
+                self._cond.notify_all()
+        with self._cond:
+            self._cond.notify_all()
+
+    def feed(self, data: bytes):
+        try:
+            self._proc.stdin.write(data)
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self._proc.wait()
+            raise RuntimeError(f"Failed to decode audio: {b''.join(self._stderr).decode(errors='ignore')}")
+
+    def read(self, wait: float = 0.0) -> np.ndarray:
+        """Decoded audio not yet read; waits up to `wait` seconds for some to appear."""
+        with self._cond:
+            if wait and len(self._pcm) < 2 and self._reader.is_alive():
+                self._cond.wait(wait)
+            n = len(self._pcm) - len(self._pcm) % 2
+            data = bytes(self._pcm[:n])
+            del self._pcm[:n]
+        return _pcm16_to_float(data)
+
+    def close(self) -> np.ndarray:
+        """Flush the decoder and return the remaining audio."""
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        self._reader.join()
+        self._proc.wait()
+        return self.read()
+
+    def kill(self):
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
@@ -0,0 +1,30 @@
+import hashlib
+
+from config.settings import (
+    WHISPER_MODEL,
+    TRANSCRIPT_CACHE_SIZE,
+    TRANSCRIPT_CACHE_DISK,
+    TRANSCRIPT_CACHE_DIR,
+)
+from utils.cache import TieredCache
+
+
+def audio_key(audio, language: str, model_name: str = WHISPER_MODEL) -> str:
+    """Content hash of decoded PCM plus everything that changes the transcript."""
+    h = hashlib.sha256()
+    h.update(f"{model_name}|{language}|".encode())
+    h.update(audio.tobytes())
+    return h.hexdigest()
+
+
+def file_key(digest: str, language: str, model_name: str = WHISPER_MODEL) -> str:
+    """Key for a stored upload's transcript by its file hash, which skips the decode too."""
+    return f"file-{digest}-{model_name}-{language}"
+
+
+# Content-addressed transcript cache: retried uploads of the same audio skip
+# Whisper entirely. The JSON-file tier under OUTPUT_DIR is optional.
+transcript_cache = TieredCache(
+    TRANSCRIPT_CACHE_SIZE,
+    disk_dir=TRANSCRIPT_CACHE_DIR if TRANSCRIPT_CACHE_DISK else None,
+)
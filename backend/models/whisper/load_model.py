@@ -1,4 +1,11 @@
+import copy
 import ctypes
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from config.settings import WHISPER_MODEL, WHISPER_DEVICE, WHISPER_POOL_SIZE
 
 # Monkey-patch ctypes.CDLL to avoid TypeError when name is None
 _original_cdll_init = ctypes.CDLL.__init__
@@ -8,19 +15,198 @@ def _patched_cdll_init(self, name, *args, **kwargs):
     return _original_cdll_init(self, name, *args, **kwargs)
 ctypes.CDLL.__init__ = _patched_cdll_init
 
-try:
-    import whisper
-except OSError as e:
-    whisper = None
+_whisper = None
+_import_lock = threading.Lock()
+
+
+def _import_whisper():
+    """
+    Import whisper (and torch) on first use so that workers which never
+    transcribe don't pay for it at startup.
+    """
+    global _whisper
+    with _import_lock:
+        if _whisper is None:
+            try:
+                import whisper
+            except OSError:
+                whisper = None
+            _whisper = whisper or False
+    return _whisper or None
+
+
+class WhisperModelPool:
+    """
+    Pool of Whisper model replicas.
+
+    Replicas are loaded lazily on first checkout (or by warm_up) up to `size`.
+    Each replica is used by one caller at a time, since whisper installs
+    per-call kv-cache hooks on the model and is not safe to share.
+
+    Fork-aware: a child process keeps the replicas that were idle at fork
+    (shared copy-on-write) and forgets loads and checkouts that belonged to
+    the parent's threads.
+    """
+
+    def __init__(self, model_name: str = WHISPER_MODEL, size: int = WHISPER_POOL_SIZE):
+        self.model_name = model_name
+        self.size = max(1, int(size))
+        self._idle = queue.LifoQueue()
+        self._loaded = 0
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._first = None
+        self._warm_thread = None
+
+    def _after_fork(self):
+        # threads don't survive fork: a half-finished warm-up or a checked-out
+        # replica would otherwise stay counted in _loaded forever
+        idle = list(self._idle.queue)
+        self._idle = queue.LifoQueue()
+        for m in idle:
+            self._idle.put(m)
+        self._loaded = len(idle)
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._warm_thread = None
+
+    def _load_replica(self):
+        whisper = _import_whisper()
+        if whisper is None:
+            raise RuntimeError("whisper is not available in this environment")
+        with self._load_lock:
+            if self._first is None:
+                print("[whisper] Loading Whisper model:", self.model_name)
+                if self.size > 1:
+                    # split cores between replicas instead of oversubscribing
+                    import torch
+                    torch.set_num_threads(max(1, (os.cpu_count() or 1) // self.size))
+                self._first = whisper.load_model(self.model_name, device=WHISPER_DEVICE or None)
+                return self._first
+            # later replicas are copied from the first instead of re-read from disk
+            return copy.deepcopy(self._first)
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._loaded < self.size:
+                self._loaded += 1
+                return True
+            return False
+
+    def _new_replica(self):
+        try:
+            return self._load_replica()
+        except Exception:
+            with self._lock:
+                self._loaded -= 1
+            raise
+
+    def checkout(self, timeout: float = None):
+        """
+        Borrow a model replica, loading one if the pool isn't full yet.
+        Raises TimeoutError if none becomes free within `timeout` seconds.
+        """
+        try:
+            m = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve_slot():
+                m = self._new_replica()
+            else:
+                try:
+                    m = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError("no Whisper model available")
+        with self._lock:
+            self._in_use += 1
+        return m
+
+    def checkin(self, m):
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(m)
+
+    @contextmanager
+    def model(self, timeout: float = None):
+        m = self.checkout(timeout=timeout)
+        try:
+            yield m
+        finally:
+            self.checkin(m)
+
+    def warm_up(self, replicas: int = None, background: bool = True):
+        """
+        Load `replicas` models (default: the full pool) ahead of the first
+        request. With background=True this returns immediately.
+        """
+        target = self.size if replicas is None else min(int(replicas), self.size)
+
+        def _run():
+            while True:
+                with self._lock:
+                    if self._loaded >= target:
+                        return
+                if not self._reserve_slot():
+                    return
+                try:
+                    self._idle.put(self._new_replica())
+                except Exception as e:
+                    print("[whisper] warm-up failed:", e)
+                    return
+
+        if not background:
+            _run()
+            return None
+        if self._warm_thread is None or not self._warm_thread.is_alive():
+            self._warm_thread = threading.Thread(target=_run, name="whisper-warmup", daemon=True)
+            self._warm_thread.start()
+        return self._warm_thread
+
+    def is_warm(self) -> bool:
+        return self._first is not None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "size": self.size,
+                "loaded": self._loaded,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WhisperModelPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WhisperModelPool()
+    return _pool
+
+
+def _after_fork():
+    if _pool is not None:
+        _pool._after_fork()
+
 
-from config.settings import WHISPER_MODEL
+os.register_at_fork(after_in_child=_after_fork)
 
-if whisper:
-    print("[whisper] Loading Whisper model:", WHISPER_MODEL)
-    _model = whisper.load_model(WHISPER_MODEL)
-else:
-    _model = None
 
 def get_model():
-    return _model
-    return _model
+    """
+    Return the first loaded replica (loading it if needed), or None if whisper
+    is unavailable. Prefer get_pool().model() for concurrent use.
+    """
+    pool = get_pool()
+    if pool._first is None:
+        try:
+            pool.checkin(pool.checkout())
+        except RuntimeError:
+            return None
+    return pool._first
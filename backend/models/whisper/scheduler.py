@@ -0,0 +1,176 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from config.settings import (
+    WHISPER_BATCH_SIZE,
+    WHISPER_BATCH_WAIT_MS,
+    WHISPER_QUEUE_SIZE,
+)
+from .load_model import get_pool, _import_whisper
+
+
+class QueueFullError(Exception):
+    """Raised when the transcription queue can't take more work."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("transcription queue is full")
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = ("audio", "language", "future")
+
+    def __init__(self, audio, language, future):
+        self.audio = audio
+        self.language = language
+        self.future = future
+
+
+class TranscriptionScheduler:
+    """
+    Collects clips that arrive within `max_wait_ms` of each other and runs
+    them through Whisper as one padded mel batch (one encoder pass, batched
+    decode). Clips longer than Whisper's 30s window fall back to
+    model.transcribe() since they need the sliding-window decoder.
+
+    One worker thread runs per model replica in the pool.
+    """
+
+    def __init__(self, pool=None, max_batch_size: int = WHISPER_BATCH_SIZE,
+                 max_wait_ms: int = WHISPER_BATCH_WAIT_MS, max_queue: int = WHISPER_QUEUE_SIZE):
+        self.pool = pool or get_pool()
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0, int(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._workers = []
+        self._lock = threading.Lock()
+        self._batch_seconds = 1.0  # moving estimate used for Retry-After
+
+    def submit(self, audio, language: str = "en") -> Future:
+        """
+        Queue a clip (file path or 16 kHz float32 array) and return a Future
+        resolving to whisper's result dict. Raises QueueFullError when full.
+        """
+        self._ensure_workers()
+        fut = Future()
+        try:
+            self._queue.put_nowait(_Job(audio, language, fut))
+        except queue.Full:
+            raise QueueFullError(retry_after=self._retry_after())
+        return fut
+
+    def transcribe(self, audio, language: str = "en", timeout: float = None) -> dict:
+        return self.submit(audio, language).result(timeout=timeout)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _retry_after(self) -> int:
+        batches = self._queue.qsize() / (self.max_batch_size * max(1, len(self._workers)))
+        return max(1, int(batches * self._batch_seconds + 0.5))
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.pool.size):
+                t = threading.Thread(target=self._worker, name=f"whisper-batch-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = [j for j in self._collect() if j.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.monotonic()
+            try:
+                with self.pool.model() as model:
+                    self._run_batch(model, batch)
+            except Exception as e:
+                for j in batch:
+                    if not j.future.done():
+                        j.future.set_exception(e)
+            elapsed = time.monotonic() - started
+            self._batch_seconds = 0.8 * self._batch_seconds + 0.2 * elapsed
+
+    def _run_batch(self, model, batch):
+        whisper = _import_whisper()
+        short = []
+        for j in batch:
+            try:
+                audio = j.audio if not isinstance(j.audio, str) else whisper.load_audio(j.audio)
+            except Exception as e:
+                j.future.set_exception(e)
+                continue
+            if len(audio) > whisper.audio.N_SAMPLES:
+                self._run_single(model, j, audio)
+            else:
+                short.append((j, audio))
+
+        by_language = {}
+        for j, audio in short:
+            by_language.setdefault(j.language, []).append((j, audio))
+        for language, items in by_language.items():
+            if len(items) == 1:
+                self._run_single(model, items[0][0], items[0][1])
+                continue
+            try:
+                results = self._decode_batch(whisper, model, [a for _, a in items], language)
+            except Exception as e:
+                for j, _ in items:
+                    j.future.set_exception(e)
+                continue
+            for (j, _), r in zip(items, results):
+                j.future.set_result({
+                    "text": r.text,
+                    "language": r.language,
+                    "avg_logprob": r.avg_logprob,
+                    "no_speech_prob": r.no_speech_prob,
+                    "segments": [],
+                })
+
+    def _run_single(self, model, job, audio):
+        try:
+            job.future.set_result(model.transcribe(audio, language=job.language))
+        except Exception as e:
+            job.future.set_exception(e)
+
+    def _decode_batch(self, whisper, model, audios, language):
+        import torch
+        n_mels = getattr(model.dims, "n_mels", 80)
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(a), n_mels) for a in audios
+        ]).to(model.device)
+        options = whisper.DecodingOptions(language=language, fp16=model.device.type == "cuda")
+        return whisper.decode(model, mels, options)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> TranscriptionScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = TranscriptionScheduler()
+    return _scheduler
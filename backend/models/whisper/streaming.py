@@ -0,0 +1,195 @@
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from config.settings import (
+    STREAM_VAD_THRESHOLD,
+    STREAM_SILENCE_MS,
+    STREAM_PARTIAL_STEP_MS,
+    STREAM_SESSION_TTL,
+    STREAM_MAX_OPEN,
+)
+from .audio import SAMPLE_RATE, StreamDecoder, _pcm16_to_float
+from .transcribe import transcribe_audio
+
+FRAME = SAMPLE_RATE * 30 // 1000  # 30 ms VAD frames
+MAX_SEGMENT = SAMPLE_RATE * 30  # whisper's window
+KEEP_LEADING = SAMPLE_RATE * 300 // 1000  # silence kept before speech starts
+
+
+class TooManyStreamsError(Exception):
+    """Raised when STREAM_MAX_OPEN streams are already open."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("too many open streams")
+        self.retry_after = retry_after
+
+
+class StreamingTranscriber:
+    """
+    Incremental transcription of one answer while it is being recorded.
+
+    Audio is appended with feed(). A simple energy VAD cuts the buffer into
+    speech segments at pauses; each finished segment is transcribed once and
+    committed. The open segment is re-transcribed every STREAM_PARTIAL_STEP_MS
+    of new audio to produce a partial transcript, so finish() only has to
+    process the tail since the last pause.
+
+    `fmt` is "pcm_s16le" for raw 16 kHz mono PCM chunks, or "container" for
+    browser MediaRecorder chunks (webm/ogg), which are piped through one
+    long-lived ffmpeg process per stream (StreamDecoder), started on the
+    first chunk.
+    """
+
+    DECODE_WAIT = 0.05  # seconds a chunk waits for ffmpeg to emit its audio
+
+    def __init__(self, language: str = "en", fmt: str = "container"):
+        self.language = language
+        self.fmt = fmt
+        self._decoder = None
+        self._buf = np.zeros(0, dtype=np.float32)  # uncommitted audio
+        self._committed = []
+        self._partial = ""
+        self._partial_at = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _append(self, data: bytes, final: bool = False):
+        if self.fmt != "container":
+            new = _pcm16_to_float(data[: len(data) - len(data) % 2])
+        else:
+            if self._decoder is None:
+                if not data:
+                    return
+                self._decoder = StreamDecoder()
+            if data:
+                self._decoder.feed(data)
+            new = self._decoder.close() if final else self._decoder.read(wait=self.DECODE_WAIT if data else 0)
+        if len(new):
+            self._buf = np.concatenate([self._buf, new])
+
+    def _speech_frames(self) -> np.ndarray:
+        n = len(self._buf) // FRAME
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+        frames = self._buf[: n * FRAME].reshape(n, FRAME)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return rms > STREAM_VAD_THRESHOLD
+
+    def _next_cut(self, speech: np.ndarray):
+        """Return the sample index ending the first finished segment, or None."""
+        silence_needed = max(1, STREAM_SILENCE_MS // 30)
+        voiced = np.flatnonzero(speech)
+        if len(voiced) == 0:
+            return None
+        run = 0
+        for i in range(voiced[0], len(speech)):
+            run = 0 if speech[i] else run + 1
+            if run >= silence_needed:
+                return (i - run // 2) * FRAME
+        if len(self._buf) >= MAX_SEGMENT:
+            return MAX_SEGMENT
+        return None
+
+    def _commit(self, audio: np.ndarray):
+        text = transcribe_audio(audio, language=self.language)["text"]
+        if text:
+            self._committed.append(text)
+
+    def _segment(self):
+        while True:
+            speech = self._speech_frames()
+            if not speech.any():
+                # drop leading silence so the buffer stays small
+                if len(self._buf) > KEEP_LEADING:
+                    self._buf = self._buf[-KEEP_LEADING:]
+                    self._partial_at = 0
+                return
+            cut = self._next_cut(speech)
+            if cut is None:
+                return
+            self._commit(self._buf[:cut])
+            self._buf = self._buf[cut:]
+            self._partial = ""
+            self._partial_at = 0
+
+    def feed(self, data: bytes) -> dict:
+        self.last_used = time.monotonic()
+        self._append(data)
+        self._segment()
+        step = SAMPLE_RATE * STREAM_PARTIAL_STEP_MS // 1000
+        if len(self._buf) - self._partial_at >= step and self._speech_frames().any():
+            window = self._buf[-MAX_SEGMENT:]
+            self._partial = transcribe_audio(window, language=self.language, use_cache=False)["text"]
+            self._partial_at = len(self._buf)
+        return self.snapshot()
+
+    def finish(self, data: bytes = b"") -> dict:
+        self.last_used = time.monotonic()
+        self._append(data, final=True)
+        self._segment()
+        if self._speech_frames().any():
+            if self._partial and self._partial_at == len(self._buf):
+                self._committed.append(self._partial)
+            else:
+                self._commit(self._buf)
+        self._buf = np.zeros(0, dtype=np.float32)
+        self._partial = ""
+        return self.snapshot()
+
+    def close(self):
+        """Stop the stream's decoder process, if any."""
+        if self._decoder is not None:
+            self._decoder.kill()
+
+    def snapshot(self) -> dict:
+        committed = " ".join(self._committed)
+        text = " ".join(t for t in (committed, self._partial) if t)
+        return {"committed": committed, "partial": self._partial, "text": text}
+
+
+class StreamRegistry:
+    """
+    In-process map of open answer streams, expiring idle ones. At most
+    max_open are open at once; open() raises TooManyStreamsError past that.
+    """
+
+    def __init__(self, ttl: int = STREAM_SESSION_TTL, max_open: int = STREAM_MAX_OPEN):
+        self.ttl = ttl
+        self.max_open = max_open
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.ttl
+        for sid in [s for s, t in self._streams.items() if t.last_used < cutoff]:
+            self._streams.pop(sid).close()
+
+    def open(self, language: str = "en", fmt: str = "container") -> str:
+        sid = uuid.uuid4().hex
+        with self._lock:
+            self._evict()
+            if len(self._streams) >= self.max_open:
+                # the oldest idle stream is the next to expire
+                oldest = min((t.last_used for t in self._streams.values()), default=None)
+                wait = 1 if oldest is None else int(oldest + self.ttl - time.monotonic()) + 1
+                raise TooManyStreamsError(retry_after=max(1, wait))
+            self._streams[sid] = StreamingTranscriber(language=language, fmt=fmt)
+        return sid
+
+    def get(self, sid: str):
+        with self._lock:
+            self._evict()
+            return self._streams.get(sid)
+
+    def close(self, sid: str):
+        with self._lock:
+            st = self._streams.pop(sid, None)
+        if st is not None:
+            st.close()
+        return st
+
+
+streams = StreamRegistry()
@@ -1,37 +1,54 @@
-from .load_model import get_model
-import os
-from pydub import AudioSegment
-import tempfile
+from .scheduler import get_scheduler
+from .audio import decode_audio
+from .cache import transcript_cache, audio_key, file_key
+from utils.metrics import span
 
-model = get_model()
 
-def _convert_to_wav(input_path: str) -> str:
+def transcribe_audio(audio, language: str = "en", use_cache: bool = True):
     """
-    Ensure audio is WAV 16-bit PCM at 16k/24k/48k sample rates supported by whisper.
-    Returns path to temporary WAV file.
+    Transcribe a 16 kHz mono float32 array.
+    Goes through the batching scheduler; raises QueueFullError when it is saturated.
+    Identical audio is served from the transcript cache unless use_cache is False.
     """
-    sound = AudioSegment.from_file(input_path)
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-    wav_path = tmp.name
-    sound.export(wav_path, format="wav")
-    tmp.close()
-    return wav_path
+    key = audio_key(audio, language) if use_cache else None
+    if key:
+        cached = transcript_cache.get(key)
+        if cached is not None:
+            return cached
+    with span("whisper"):
+        result = get_scheduler().transcribe(audio, language=language)
+    text = result.get("text", "").strip()
+    out = {"text": text, "raw": result}
+    if key:
+        transcript_cache.put(key, out)
+    return out
 
-def transcribe_file(file_path: str, language: str = "en"):
+
+def transcribe_stream(stream, language: str = "en", tee=None):
+    """
+    Decode an upload stream straight into memory and transcribe it.
+    If `tee` (a writable file, e.g. a storage writer) is given the raw
+    upload is also written to it while decoding.
+    """
+    with span("decode"):
+        audio = decode_audio(stream, tee=tee)
+    return transcribe_audio(audio, language=language)
+
+
+def transcribe_file(file_path: str, language: str = "en", digest: str = None):
     """
     Transcribe audio file using Whisper model instance.
+    With `digest` (the file's sha256, as kept by utils/storage) a repeat of
+    the same file is answered from the transcript cache before decoding.
     """
-    wav_path = file_path
-    try:
-        # convert if not wav
-        if not file_path.lower().endswith(".wav"):
-            wav_path = _convert_to_wav(file_path)
-        result = model.transcribe(wav_path, language=language)
-        text = result.get("text", "").strip()
-        return {"text": text, "raw": result}
-    finally:
-        if wav_path != file_path and os.path.exists(wav_path):
-            try:
-                os.remove(wav_path)
-            except:
-                pass
+    key = file_key(digest, language) if digest else None
+    if key:
+        cached = transcript_cache.get(key)
+        if cached is not None:
+            return cached
+    with span("decode"):
+        audio = decode_audio(file_path)
+    out = transcribe_audio(audio, language=language)
+    if key:
+        transcript_cache.put(key, out)
+    return out
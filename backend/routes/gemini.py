@@ -1,31 +1,92 @@
-from flask import Blueprint, request, jsonify
-from models.gemini import generate_response
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from config.settings import PROMPT_MAX_TOKENS
+from models.gemini import generate_response, stream_response
+from utils.sse import sse_event
+from models.structured import generate_structured, StructuredOutputError
+from utils.sessions import sessions, FEEDBACK_SCHEMA, feedback_record, format_feedback
+from utils import prompt_budget
 
 gemini_bp = Blueprint('gemini', __name__)
 
+# text format for streamed evaluations, which can't be schema-validated as they arrive
+FEEDBACK_FORMAT = (
+    "\n\nPlease provide feedback in the following format:\n"
+    "Feedback Summary: (summarize strengths and weaknesses)\n"
+    "Professionalism: (score 1-10)\n"
+    "Preparation: (score 1-10)\n"
+    "Communication: (score 1-10)\n"
+    "Strengths: (bullet points)\n"
+    "Areas for Improvement: (bullet points)\n"
+    "Overall Impression: (short summary)\n"
+    "Predicted Score: (1-10)\n"
+    "Follow-up Technical Question: (one question relevant to the role)\n"
+)
+
 @gemini_bp.route('/generate', methods=['POST'])
 def generate():
+    """
+    Expects JSON: { "prompt": "...", "stream": false }
+    With stream=true the reply is text/event-stream: one {"token"} event per
+    chunk, then a "done" event carrying the full response.
+    Answer evaluations may also pass "session_id" (from
+    /api/interview/start_interview) and "answer"; the feedback is then scored
+    into that interview session as it is produced. Unknown ids are ignored.
+    """
     data = request.json
     prompt = data.get('prompt', '')
     if not prompt:
         return jsonify({"error": "Prompt is required"}), 400
+    # client-built prompts end with their instructions, so an oversized one loses its middle
+    bounded = prompt_budget.truncate(prompt, PROMPT_MAX_TOKENS, keep_tail=True)
+    prompt_budget.report("generate", prompt, bounded)
+    prompt = bounded
 
+    # interview answer evaluations: scored into the session when session_id is given
+    evaluating = 'Evaluate the following interview answer' in prompt
+    session_id = data.get('session_id') if evaluating else None
+    answer = data.get('answer', '')
+    on_done = (lambda text: sessions.record_turn(session_id, answer, text)) if session_id else None
     try:
+        if evaluating and not data.get('stream'):
+            return jsonify(_evaluate(prompt, session_id, answer))
         # If this is an interview answer evaluation, enforce professional feedback format
-        if 'Evaluate the following interview answer' in prompt:
-            prompt += (
-                "\n\nPlease provide feedback in the following format:\n"
-                "Feedback Summary: (summarize strengths and weaknesses)\n"
-                "Professionalism: (score 1-10)\n"
-                "Preparation: (score 1-10)\n"
-                "Communication: (score 1-10)\n"
-                "Strengths: (bullet points)\n"
-                "Areas for Improvement: (bullet points)\n"
-                "Overall Impression: (short summary)\n"
-                "Predicted Score: (1-10)\n"
-                "Follow-up Technical Question: (one question relevant to the role)\n"
-            )
+        if evaluating:
+            prompt += FEEDBACK_FORMAT
+        if data.get('stream'):
+            return _stream(prompt, on_done)
         response = generate_response(prompt)
         return jsonify({"response": response})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+def _evaluate(prompt, session_id, answer):
+    """
+    Ask for a FEEDBACK_SCHEMA evaluation and render it as the usual labeled
+    text. A reply that can't be validated is passed through as text.
+    """
+    try:
+        evaluation = generate_structured(prompt, FEEDBACK_SCHEMA, route="interview", cached=False)
+    except StructuredOutputError as e:
+        if session_id:
+            sessions.record_turn(session_id, answer, e.raw)
+        return {"response": e.raw}
+    if session_id:
+        sessions.record_turn(session_id, answer, record=feedback_record(evaluation))
+    return {"response": format_feedback(evaluation), "evaluation": evaluation}
+
+def _stream(prompt, on_done=None):
+    def events():
+        parts = []
+        try:
+            for chunk in stream_response(prompt):
+                parts.append(chunk)
+                yield sse_event({"token": chunk})
+        except Exception as e:
+            yield sse_event({"error": str(e)}, event="error")
+            return
+        response = "".join(parts)
+        if on_done:
+            on_done(response)
+        yield sse_event({"response": response}, event="done")
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
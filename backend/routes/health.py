@@ -0,0 +1,93 @@
+from flask import Blueprint, jsonify, Response
+from config.settings import WHISPER_WARMUP, PRELOAD_MODELS
+from models.whisper.load_model import get_pool
+from models.gemini import get_client
+from models.structured import structured_stats
+from models.whisper.cache import transcript_cache
+from models.whisper.scheduler import get_scheduler
+from models.response_cache import response_cache
+from utils.jobs import jobs
+from utils.pdf_parser import parse_cache_stats
+from utils.web_scraper import get_fetcher
+from utils.relevance import get_index
+from utils.storage import get_store
+from utils.metrics import registry
+
+health_bp = Blueprint("health", __name__)
+
+@health_bp.route("/healthz", methods=["GET"])
+def liveness():
+    # the process is up and serving requests
+    return jsonify({"status": "ok"})
+
+@health_bp.route("/readyz", methods=["GET"])
+def readiness():
+    """
+    Ready once the models this process is configured to warm are loaded.
+    Without WHISPER_WARMUP / PRELOAD_MODELS whisper loads on first use, so
+    it doesn't gate readiness.
+    """
+    pool = get_pool()
+    whisper_ready = pool.is_warm() or not (WHISPER_WARMUP or PRELOAD_MODELS)
+    body = {
+        "status": "ready" if whisper_ready else "warming",
+        "whisper": {**pool.stats(), "warm": pool.is_warm()},
+        "llm": get_client().stats(),
+        "structured_output": structured_stats(),
+        "jobs": jobs.stats(),
+        "relevance_index": get_index().stats(),
+        "storage": get_store().stats(),
+    }
+    return jsonify(body), 200 if whisper_ready else 503
+
+def _cache_stats() -> dict:
+    return {
+        "transcript": transcript_cache.stats(),
+        "resume_parse": parse_cache_stats(),
+        "llm_response": response_cache.stats(),
+        "research": get_fetcher().cache.stats(),
+    }
+
+@registry.collector
+def _component_metrics():
+    """Cache, queue and model state owned by other modules, read at scrape time."""
+    samples = []
+    for name, s in _cache_stats().items():
+        labels = {"cache": name}
+        samples.append(("cache_hits_total", "counter", "Cache lookups answered from the cache.", labels, s["hits"]))
+        samples.append(("cache_misses_total", "counter", "Cache lookups that missed.", labels, s["misses"]))
+        samples.append(("cache_hit_ratio", "gauge", "Share of lookups answered from the cache.", labels, s["hit_rate"]))
+        samples.append(("cache_entries", "gauge", "Entries held in memory.", labels, s["size"]))
+    llm = get_client().stats()
+    samples.append(("llm_in_flight", "gauge", "LLM calls in progress.", {}, llm["in_flight"]))
+    pool = get_pool().stats()
+    samples.append(("whisper_replicas_in_use", "gauge", "Whisper replicas checked out.", {}, pool["in_use"]))
+    samples.append(("whisper_queue_depth", "gauge", "Transcriptions waiting for a batch.", {}, get_scheduler().depth()))
+    for queue, q in jobs.stats().items():
+        labels = {"queue": queue}
+        samples.append(("jobs_queue_depth", "gauge", "Background jobs waiting.", labels, q["depth"]))
+        samples.append(("jobs_running", "gauge", "Background jobs running.", labels, q["running"]))
+        samples.append(("jobs_completed_total", "counter", "Background jobs finished.", labels, q["completed"]))
+        samples.append(("jobs_failed_total", "counter", "Background jobs that raised.", labels, q["failed"]))
+    for route, counts in structured_stats().items():
+        for outcome, n in counts.items():
+            samples.append(("structured_output_total", "counter",
+                            "Structured LLM responses by outcome (calls, parse_failures, repaired, ...).",
+                            {"route": route, "outcome": outcome}, n))
+    store = get_store().stats()
+    samples.append(("storage_bytes", "gauge", "Bytes held in the upload store.", {}, store["bytes"]))
+    samples.append(("storage_blobs", "gauge", "Blobs held in the upload store.", {}, store["blobs"]))
+    samples.append(("storage_dedup_hits_total", "counter", "Uploads that matched a blob already stored.", {},
+                    store["dedup_hits"]))
+    index = get_index().stats()
+    for key in ("documents", "resumes", "segments"):
+        samples.append(("relevance_index_" + key, "gauge", f"Relevance index {key} in this process.", {}, index[key]))
+    return samples
+
+@health_bp.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """
+    Prometheus text format. Values are per process; with several gunicorn
+    workers each scrape sees the worker that answered it.
+    """
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
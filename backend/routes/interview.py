@@ -1,24 +1,67 @@
-import os
+import logging
 from flask import Blueprint, request, jsonify, current_app
-from werkzeug.utils import secure_filename
-from config.settings import UPLOAD_AUDIO_DIR
-from models.whisper.transcribe import transcribe_file
+from config.settings import SAVE_AUDIO_UPLOADS, PROMPT_CONTEXT_TOKENS
+from models.whisper.transcribe import transcribe_stream, transcribe_file
+from models.whisper.scheduler import QueueFullError
+from models.whisper.streaming import streams, TooManyStreamsError
 from models.gemini import generate_response as generate
-import uuid
-import re
+from routes.jobs import wants_async, accepted
+from utils.jobs import jobs, task, then
+from utils.sessions import sessions, InterviewSession
+from utils.storage import get_store
+from utils import prompt_budget
 
 ALLOWED_AUDIO_EXT = {"wav", "mp3", "m4a", "ogg", "webm"}
 
 interview_bp = Blueprint("interview", __name__)
+log = logging.getLogger(__name__)
 
 def allowed(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_AUDIO_EXT
 
+def _busy(e):
+    resp = jsonify({"error": "transcription busy, retry shortly"})
+    resp.headers["Retry-After"] = str(e.retry_after)
+    return resp, 503
+
+def _follow_up(user_text):
+    # 2) LLaMA — produce a follow-up question or short feedback
+    # You can craft a richer system prompt for multi-turn behaviour
+    answer = prompt_budget.fit_text(user_text, PROMPT_CONTEXT_TOKENS)
+    prompt_budget.report("interview", user_text, answer)
+    prompt = (
+        "You are a friendly technical interviewer. The candidate said:\n\n"
+        f"\"{answer}\"\n\n"
+        "Respond with a short follow-up question that probes depth or asks for an example. "
+        "Keep it concise (<= 40 words). Also return a 1-10 confidence guess about the answer in the format: CONFIDENCE: <n>."
+    )
+    try:
+        return generate(prompt, max_tokens=128)
+    except Exception:
+        log.exception("llama generation failed")
+        return "Sorry, I couldn't generate a follow-up question right now."
+
+@task("interview_turn", queue="cpu")
+def interview_turn(digest, language="en", keep=False):
+    """Background version of upload_audio for an upload already in the store as `digest`."""
+    store = get_store()
+    try:
+        user_text = transcribe_file(store.path(digest), language=language, digest=digest).get("text", "")
+    finally:
+        store.release(digest, keep=keep)
+    return then("interview_follow_up", user_text=user_text)
+
+@task("interview_follow_up", queue="io")
+def interview_follow_up(user_text):
+    """Second step of interview_turn: the LLM call, off the cpu queue."""
+    return {"transcript": user_text, "ai": _follow_up(user_text)}
+
 @interview_bp.route("/upload_audio", methods=["POST"])
 def upload_audio():
     """
     Expects form-data with key 'audio' (file).
     Returns: { text: "<transcript>", ai_question: "<next Q>" }
+    With async=1 the upload is queued and 202 { job_id, status_url } is returned.
     """
     if "audio" not in request.files:
         return jsonify({"error": "audio file required under 'audio'"}), 400
@@ -30,101 +73,125 @@ def upload_audio():
     if not allowed(f.filename):
         return jsonify({"error": "unsupported audio format"}), 400
 
-    filename = secure_filename(f.filename)
-    unique_name = f"{uuid.uuid4().hex}_{filename}"
-    save_path = os.path.join(UPLOAD_AUDIO_DIR, unique_name)
-    f.save(save_path)
+    # raw audio is only kept in the store when SAVE_AUDIO_UPLOADS is set
+    # (or briefly, until a queued job has transcribed it)
+    store = get_store()
+    ext = "." + f.filename.rsplit(".", 1)[1].lower()
+    if wants_async():
+        digest = store.put_stream(f.stream, ext, kind="audio")
+        return accepted(jobs.submit("interview_turn", digest=digest, language="en", keep=SAVE_AUDIO_UPLOADS))
 
-    # 1) Whisper transcription
+    # 1) Whisper transcription, decoded straight from the upload stream
     try:
-        transcript_data = transcribe_file(save_path, language="en")
+        if SAVE_AUDIO_UPLOADS:
+            with store.writer(ext, kind="audio") as saved:
+                transcript_data = transcribe_stream(f.stream, language="en", tee=saved)
+            store.release(saved.digest)
+        else:
+            transcript_data = transcribe_stream(f.stream, language="en")
         user_text = transcript_data.get("text", "")
+    except QueueFullError as e:
+        return _busy(e)
     except Exception as e:
         current_app.logger.exception("transcription error")
         return jsonify({"error": "transcription failed", "detail": str(e)}), 500
 
-    # 2) LLaMA — produce a follow-up question or short feedback
-    # You can craft a richer system prompt for multi-turn behaviour
-    prompt = (
-        "You are a friendly technical interviewer. The candidate said:\n\n"
-        f"\"{user_text}\"\n\n"
-        "Respond with a short follow-up question that probes depth or asks for an example. "
-        "Keep it concise (<= 40 words). Also return a 1-10 confidence guess about the answer in the format: CONFIDENCE: <n>."
-    )
-    try:
-        ai_out = generate(prompt, max_tokens=128)
-    except Exception as e:
-        current_app.logger.exception("llama generation failed")
-        ai_out = "Sorry, I couldn't generate a follow-up question right now."
-
     return jsonify({
         "transcript": user_text,
-        "ai": ai_out
+        "ai": _follow_up(user_text)
     })
 
+@interview_bp.route("/stream", methods=["POST"])
+def stream_open():
+    """
+    Start a live transcription stream for one answer.
+    Optional JSON: { "language": "en", "format": "container" | "pcm_s16le" }
+    Returns: { stream_id }
+    """
+    data = request.get_json(silent=True) or {}
+    fmt = data.get("format", "container")
+    if fmt not in ("container", "pcm_s16le"):
+        return jsonify({"error": "format must be 'container' or 'pcm_s16le'"}), 400
+    try:
+        sid = streams.open(language=data.get("language", "en"), fmt=fmt)
+    except TooManyStreamsError as e:
+        resp = jsonify({"error": "too many open streams, retry shortly"})
+        resp.headers["Retry-After"] = str(e.retry_after)
+        return resp, 503
+    return jsonify({"stream_id": sid})
+
+@interview_bp.route("/stream/<stream_id>/chunk", methods=["POST"])
+def stream_chunk(stream_id):
+    """
+    Body: raw audio bytes recorded since the last chunk.
+    Returns: { committed, partial, text }
+    """
+    st = streams.get(stream_id)
+    if st is None:
+        return jsonify({"error": "unknown or expired stream"}), 404
+    try:
+        with st.lock:
+            return jsonify(st.feed(request.get_data()))
+    except QueueFullError as e:
+        return _busy(e)
+    except Exception as e:
+        current_app.logger.exception("stream transcription error")
+        return jsonify({"error": "transcription failed", "detail": str(e)}), 500
+
+@interview_bp.route("/stream/<stream_id>/finish", methods=["POST"])
+def stream_finish(stream_id):
+    """
+    Body: optional final audio bytes. Transcribes the remaining tail and closes the stream.
+    Returns: { transcript }
+    """
+    st = streams.get(stream_id)
+    if st is None:
+        return jsonify({"error": "unknown or expired stream"}), 404
+    try:
+        with st.lock:
+            result = st.finish(request.get_data())
+    except QueueFullError as e:
+        return _busy(e)
+    except Exception as e:
+        current_app.logger.exception("stream transcription error")
+        return jsonify({"error": "transcription failed", "detail": str(e)}), 500
+    streams.close(stream_id)
+    return jsonify({"transcript": result["text"]})
+
+@interview_bp.route("/start_interview", methods=["POST"])
+def start_interview():
+    """
+    Start a server-side interview session.
+    Returns: { session_id } to pass to /api/gemini/generate evaluations,
+    /session/<id>/turn and /end_interview.
+    """
+    return jsonify({"session_id": sessions.create().id})
+
+@interview_bp.route("/session/<session_id>/turn", methods=["POST"])
+def record_turn(session_id):
+    """Add an evaluated answer to the session: { "answer": "...", "feedback": "..." }"""
+    data = request.json or {}
+    record = sessions.record_turn(session_id, data.get("answer", ""), data.get("feedback", ""))
+    if record is None:
+        return jsonify({"error": "unknown or expired session"}), 404
+    return jsonify(record)
+
+
 @interview_bp.route("/end_interview", methods=["POST"])
 def end_interview():
-    data = request.json
-    conversation_log = data.get("conversation_log", [])
-    # Aggregate feedback and scores
-    strengths = []
-    improvements = []
-    professionalism_scores = []
-    preparation_scores = []
-    communication_scores = []
-    predicted_scores = []
-    feedback_summaries = []
-    overall_impressions = []
-    answered_count = 0
-    for entry in conversation_log:
-        feedback = entry.get("feedback", "")
-        answer = entry.get("answer", "")
-        if answer.strip():
-            answered_count += 1
-        # Parse Gemini feedback format
-        # Extract scores and bullet points
-        def extract_score(label):
-            m = re.search(rf"{label}:\s*(\d+)", feedback)
-            return int(m.group(1)) if m else None
-        def extract_section(label):
-            m = re.search(rf"{label}:\s*(.*?)(?:\n[A-Z][a-zA-Z ]+:|$)", feedback, re.DOTALL)
-            return m.group(1).strip() if m else ""
-        professionalism_scores.append(extract_score("Professionalism"))
-        preparation_scores.append(extract_score("Preparation"))
-        communication_scores.append(extract_score("Communication"))
-        predicted_scores.append(extract_score("Predicted Score"))
-        strengths.append(extract_section("Strengths"))
-        improvements.append(extract_section("Areas for Improvement"))
-        feedback_summaries.append(extract_section("Feedback Summary"))
-        overall_impressions.append(extract_section("Overall Impression"))
-    def avg(scores):
-        vals = [s for s in scores if s is not None]
-        return round(sum(vals)/len(vals), 1) if vals else "N/A"
-    summary = f"Interview Summary for {answered_count} answered question(s):\n\n"
-    summary += f"Average Professionalism: {avg(professionalism_scores)}\n"
-    summary += f"Average Preparation: {avg(preparation_scores)}\n"
-    summary += f"Average Communication: {avg(communication_scores)}\n"
-    summary += f"Average Predicted Score: {avg(predicted_scores)}\n\n"
-    summary += "Key Strengths:\n"
-    for s in strengths:
-        for line in s.split("\n"):
-            if line.strip():
-                summary += f"• {line.strip()}\n"
-    summary += "\nAreas for Improvement:\n"
-    for imp in improvements:
-        for line in imp.split("\n"):
-            if line.strip():
-                summary += f"• {line.strip()}\n"
-    summary += "\nFeedback Summaries:\n"
-    for fs in feedback_summaries:
-        if fs:
-            summary += f"- {fs}\n"
-    summary += "\nOverall Impressions:\n"
-    for oi in overall_impressions:
-        if oi:
-            summary += f"- {oi}\n"
-    if answered_count == 0:
-        summary += "\nYou did not provide any answers. Please try to answer the questions for a more meaningful evaluation."
-    elif avg(predicted_scores) != "N/A" and avg(predicted_scores) < 5:
-        summary += "\nYour overall score is low. Consider practicing more detailed and confident answers."
-    return jsonify({"summary": summary})
+    """
+    Expects JSON: { "session_id": "..." } (from /start_interview) for
+    interviews whose turns were recorded server-side, or
+    { "conversation_log": [...] } from older clients.
+    """
+    data = request.json or {}
+    session_id = data.get("session_id")
+    session = sessions.end(session_id) if session_id else None
+    if session is None or not session.turns:
+        session = InterviewSession(session_id or "")
+        for entry in data.get("conversation_log", []):
+            session.add_turn(entry.get("answer", ""), entry.get("feedback", ""))
+        if session_id and not session.turns:
+            # unknown or expired session and no log to rebuild it from
+            return jsonify({"summary": session.summary(), "session_found": False})
+    return jsonify({"summary": session.summary()})
@@ -0,0 +1,56 @@
+from flask import Blueprint, request, jsonify, url_for, Response, stream_with_context
+from utils.jobs import jobs, FINISHED
+from utils.sse import sse_event
+
+jobs_bp = Blueprint("jobs", __name__)
+
+def wants_async():
+    """True if the caller asked for submit -> job id -> poll instead of an inline result."""
+    flag = request.args.get("async") or request.form.get("async")
+    if flag is None and request.is_json:
+        flag = (request.get_json(silent=True) or {}).get("async")
+    return flag in (True, "1", "true")
+
+def accepted(job):
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": url_for("jobs.job_status", job_id=job.id),
+        "stream_url": url_for("jobs.job_stream", job_id=job.id),
+    }), 202
+
+@jobs_bp.route("/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@jobs_bp.route("/<job_id>/stream", methods=["GET"])
+def job_stream(job_id):
+    """Server-Sent Events: one "status" event per state change, the last one carries the result."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    def events():
+        while True:
+            current = jobs.wait(job_id, timeout=15)
+            if current is None:
+                return
+            yield sse_event(current.to_dict(), event="status")
+            if current.status in FINISHED:
+                return
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@jobs_bp.route("/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    if jobs.get(job_id) is None:
+        return jsonify({"error": "unknown job"}), 404
+    if not jobs.cancel(job_id):
+        return jsonify({"error": "job already started"}), 409
+    return jsonify(jobs.get(job_id).to_dict())
+
+@jobs_bp.route("/metrics", methods=["GET"])
+def queue_metrics():
+    return jsonify(jobs.stats())
@@ -1,65 +1,86 @@
-from flask import Blueprint, request, jsonify, current_app
+import json
+import logging
+from flask import Blueprint, request, jsonify
+from config.settings import PROMPT_CONTEXT_TOKENS
 from utils.web_scraper import quick_company_overview
-from models.gemini import generate_response as generate
+from utils import prompt_budget
+from utils.jobs import jobs, task
+from models.structured import generate_structured, StructuredOutputError
+from routes.jobs import wants_async, accepted
 
 research_bp = Blueprint("research", __name__)
+log = logging.getLogger(__name__)
 
-@research_bp.route("/company_role", methods=["POST"])
-def company_role():
-    """
-    Expects JSON: { "company": "...", "role": "..." }
-    Returns: summary and suggested skills and sample interview questions.
-    """
-    data = request.get_json() or {}
-    company = data.get("company", "").strip()
-    role = data.get("role", "").strip()
-    if not company or not role:
-        return jsonify({"error": "company and role are required"}), 400
+_STRINGS = {"type": "array", "items": {"type": "string"}}
+RESEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "company_summary": _STRINGS,
+        "business_domain": {"type": "string"},
+        "latest_news": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"title": {"type": "string"}, "summary": {"type": "string"}},
+                "required": ["title", "summary"],
+            },
+        },
+        "skills": _STRINGS,
+        "experience_years": {"type": "string"},
+        "salary_range": {"type": "string"},
+        "interview_questions": _STRINGS,
+    },
+    "required": ["company_summary", "business_domain", "latest_news", "skills",
+                 "experience_years", "salary_range", "interview_questions"],
+}
 
+@task("company_research", queue="io")
+def company_research(company, role):
+    """Scrape the company overview and ask Gemini for structured role research."""
     try:
         overview_text = quick_company_overview(company)
     except Exception as e:
-        current_app.logger.exception("scrape error")
+        log.exception("scrape error")
         overview_text = f"Could not fetch detailed overview: {str(e)}"
+    overview_part = prompt_budget.fit_text(overview_text, PROMPT_CONTEXT_TOKENS)
+    prompt_budget.report("research", overview_text, overview_part)
 
     prompt = (
         "You are a recruiter/technical sourcer. Given the company overview below and a job role, "
         "produce a concise company summary (2-4 bullets), a list of role-specific required skills (top 8), "
         "typical years of experience, salary range, business domain, and 5 tailored interview questions for the role. "
         "Also provide 3 recent news headlines about the company.\n\n"
-        f"Company Overview:\n{overview_text}\n\nRole: {role}\n\n"
-        "Please format as JSON with keys: company_summary, business_domain, latest_news, skills, experience_years, salary_range, interview_questions. "
+        f"Company Overview:\n{overview_part}\n\nRole: {role}\n\n"
         "latest_news should be an array of objects with title and summary."
     )
 
-    import json
     try:
-        llm_out = generate(prompt)  # Gemini API only
-        current_app.logger.info(f"Raw Gemini response: {llm_out}")
-        # Strip Markdown code block markers if present
-        cleaned = llm_out.strip()
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[len('```json'):].strip()
-        if cleaned.startswith('```'):
-            cleaned = cleaned[len('```'):].strip()
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3].strip()
-        # Try to parse only the first valid JSON object
-        import re
-        try:
-            # Find the first {...} block
-            match = re.search(r'{.*}', cleaned, re.DOTALL)
-            if match:
-                first_json = match.group(0)
-                structured = json.loads(first_json)
-            else:
-                raise ValueError('No JSON object found')
-        except Exception as parse_err:
-            current_app.logger.exception("Gemini output not valid JSON")
-            structured = {"company_summary": ["Could not parse Gemini output."], "skills": [], "experience_years": "N/A", "interview_questions": []}
+        structured = generate_structured(prompt, RESEARCH_SCHEMA, route="research")
+        llm_out = json.dumps(structured)
+    except StructuredOutputError as e:
+        log.error("Gemini output did not match the research schema: %s", e)
+        structured = {"company_summary": ["Could not parse Gemini output."], "skills": [], "experience_years": "N/A", "interview_questions": []}
+        llm_out = e.raw
     except Exception as e:
-        current_app.logger.exception("gemini error")
+        log.exception("gemini error")
         # Fallback mock data
         structured = {"company_summary": ["Could not generate summary due to API error."], "skills": [], "experience_years": "N/A", "interview_questions": []}
         llm_out = str(e)
-    return jsonify({"results": structured, "overview": overview_text, "raw": llm_out})
+    return {"results": structured, "overview": overview_text, "raw": llm_out}
+
+@research_bp.route("/company_role", methods=["POST"])
+def company_role():
+    """
+    Expects JSON: { "company": "...", "role": "..." }
+    Returns: summary and suggested skills and sample interview questions.
+    With "async": true the lookup is queued and 202 { job_id, status_url } is returned.
+    """
+    data = request.get_json() or {}
+    company = data.get("company", "").strip()
+    role = data.get("role", "").strip()
+    if not company or not role:
+        return jsonify({"error": "company and role are required"}), 400
+
+    if wants_async():
+        return accepted(jobs.submit("company_research", company=company, role=role))
+    return jsonify(company_research(company, role))
@@ -1,26 +1,232 @@
-import os
-from flask import Blueprint, request, jsonify, current_app
+import logging
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
-from config.settings import UPLOAD_RESUME_DIR, OUTPUT_RESUMES
-from utils.pdf_parser import extract_text_from_file
+from config.settings import PROMPT_RESUME_TOKENS, PROMPT_JD_TOKENS
+from utils.pdf_parser import extract_text_from_file, ResumeTooLargeError
 from utils.keyword_matcher import extract_keywords_from_jd, find_missing_keywords
-from models.gemini import generate_response as generate
-import uuid
+from utils.relevance import get_index, doc_id
+from utils import prompt_budget
+from utils.storage import get_store
+from models.gemini import stream_response
+from models.structured import generate_structured, StructuredOutputError
+from utils.sse import sse_event
+from utils.jobs import jobs, task, then
+from routes.jobs import wants_async, accepted
 
 ALLOWED_RESUME_EXT = {"pdf", "docx", "doc", "txt"}
+SUMMARY_DELIMITER = "---CHANGE SUMMARY---"
+
+OPTIMIZE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "optimized_resume": {"type": "string"},
+        "changes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string", "enum": ["added", "modified"]},
+                    "description": {"type": "string"},
+                },
+                "required": ["type", "description"],
+            },
+        },
+    },
+    "required": ["optimized_resume", "changes"],
+}
 
 resume_bp = Blueprint("resume", __name__)
+log = logging.getLogger(__name__)
 
 def allowed(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_RESUME_EXT
 
+def _parse_change_summary(change_summary):
+    # Parse change summary into bullets
+    changes_explanation = []
+    for line in change_summary.split('\n'):
+        line = line.strip('-•* ').strip()
+        if line:
+            changes_explanation.append({"type": "added" if "add" in line.lower() else "modified", "description": line})
+    return changes_explanation
+
+def _save_optimized(resume_text):
+    # Save optimized text to the store; identical results share one file, kept until retention
+    # drops it like any other blob. Nothing serves the path: clients download the text they got back.
+    store = get_store()
+    digest = store.put_bytes(resume_text.encode("utf-8"), ".txt", kind="optimized")
+    store.release(digest)
+    return store.path(digest)
+
+def _split_at_delimiter(chunks):
+    """
+    Yield ("resume", text) pieces until SUMMARY_DELIMITER shows up in the
+    stream, then a single ("summary", text) with everything after it.
+    A delimiter split across chunks is caught by holding back a short tail.
+    """
+    hold = len(SUMMARY_DELIMITER) - 1
+    pending = ""
+    summary = None
+    for chunk in chunks:
+        if summary is not None:
+            summary.append(chunk)
+            continue
+        pending += chunk
+        idx = pending.find(SUMMARY_DELIMITER)
+        if idx >= 0:
+            if idx:
+                yield "resume", pending[:idx]
+            summary = [pending[idx + len(SUMMARY_DELIMITER):]]
+            pending = ""
+        elif len(pending) > hold:
+            yield "resume", pending[:-hold]
+            pending = pending[-hold:]
+    if pending:
+        yield "resume", pending
+    yield "summary", "".join(summary or [])
+
+def build_optimize_prompt(jd, resume_text, structured=False):
+    """
+    Returns (prompt, prompt_tokens, omitted_sections). The JD and resume are
+    cleaned and fitted to PROMPT_JD_TOKENS / PROMPT_RESUME_TOKENS first,
+    keeping the resume sections that cover most of the JD's keywords;
+    omitted_sections lists the ones that were left out or shortened.
+    """
+    jd_part = prompt_budget.fit_text(jd, PROMPT_JD_TOKENS)
+    resume_part, omitted = prompt_budget.fit_resume_report(resume_text, jd, PROMPT_RESUME_TOKENS)
+    tokens = prompt_budget.report("resume", (jd, resume_text), (jd_part, resume_part))
+    # Use Gemini to rewrite/improve resume for JD
+    prompt = (
+        "You are an expert resume writer and career coach.\n\n"
+        "Job Description:\n"
+        f"{jd_part}\n\n"
+        "Candidate current resume text:\n"
+        f"{resume_part}\n\n"
+        "Task:\n"
+        "1) Produce an optimized resume text that emphasizes relevant skills for the job description, "
+        "adds ATS-friendly keywords, rewrites bullets into impactful results statements, and keeps content concise.\n"
+    )
+    if structured:
+        return prompt + (
+            "2) List the major edits and inserted keywords in `changes`, "
+            "each marked \"added\" or \"modified\"."
+        ), tokens, omitted
+    return prompt + (
+        "2) After the resume, produce a short 'Change Summary' listing major edits and inserted keywords.\n\n"
+        "Return the optimized resume, then '---CHANGE SUMMARY---' and the bullets."
+    ), tokens, omitted
+
+def _relevance(jd, resume_text, label=None, collection=None):
+    """
+    TF-IDF similarity of the pair. With a caller-chosen `collection` the pair
+    is also indexed there, for /api/screening/rank and /match on that collection.
+    """
+    index = get_index()
+    if collection:
+        collection = "user:" + collection
+        index.add_many([(doc_id("resume", resume_text, collection), resume_text, "resume", label),
+                        (doc_id("jd", jd, collection), jd, "jd")], collection=collection)
+    return index.similarity(jd, [resume_text])[0]
+
+def _stream_optimized(jd, resume_text, missing, relevance):
+    prompt, tokens, omitted = build_optimize_prompt(jd, resume_text)
+    def events():
+        resume_parts = []
+        change_summary = ""
+        try:
+            for kind, text in _split_at_delimiter(stream_response(prompt)):
+                if kind == "resume":
+                    resume_parts.append(text)
+                    yield sse_event({"token": text}, event="resume")
+                else:
+                    change_summary = text.strip()
+        except Exception as e:
+            current_app.logger.exception("gemini stream error")
+            yield sse_event({"error": str(e)}, event="error")
+            return
+        resume_text = "".join(resume_parts).strip()
+        yield sse_event({
+            "optimized_resume": resume_text,
+            "changes_explanation": _parse_change_summary(change_summary),
+            "optimized_path": _save_optimized(resume_text),
+            "missing_keywords": missing,
+            "relevance": relevance,
+            "prompt_tokens": tokens,
+            "omitted_sections": omitted,
+            "summary_preview": resume_text[:1000],
+        }, event="done")
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _optimize(jd, resume_text, missing, relevance):
+    prompt, tokens, omitted = build_optimize_prompt(jd, resume_text, structured=True)
+    try:
+        result = generate_structured(prompt, OPTIMIZE_SCHEMA, route="resume")
+        optimized, changes_explanation = result["optimized_resume"].strip(), result["changes"]
+    except StructuredOutputError as e:
+        # a plain-text reply in the old delimiter format is still usable
+        log.error("Gemini output did not match the resume schema: %s", e)
+        optimized, changes_explanation = _split_summary(e.raw)
+    except Exception as e:
+        log.exception("gemini error")
+        # Debug mode: return extracted resume text directly
+        optimized, changes_explanation = _split_summary(
+            resume_text + "\n\n---CHANGE SUMMARY---\n(No Gemini optimization: this is your raw resume text)"
+        )
+    out_path = _save_optimized(optimized)
+
+    response = {
+        "optimized_resume": optimized,
+        "changes_explanation": changes_explanation,
+        "optimized_path": out_path,
+        "missing_keywords": missing,
+        "relevance": relevance,
+        "prompt_tokens": tokens,
+        "omitted_sections": omitted,
+        "summary_preview": optimized[:1000]
+    }
+    return response
+
+def _split_summary(text):
+    # Parse a plain-text response: split at ---CHANGE SUMMARY---
+    resume_text, change_summary = text, ""
+    if SUMMARY_DELIMITER in text:
+        parts = text.split(SUMMARY_DELIMITER)
+        resume_text = parts[0].strip()
+        change_summary = parts[1].strip()
+    return resume_text, _parse_change_summary(change_summary)
+
+@task("resume_optimize", queue="cpu")
+def resume_optimize(digest, jd, filename=None, collection=None):
+    """Background version of optimize for a resume already in the store as `digest`."""
+    store = get_store()
+    try:
+        resume_text = extract_text_from_file(store.path(digest), digest=digest)
+    finally:
+        store.release(digest)
+    return then("resume_rewrite", resume_text=resume_text, jd=jd, filename=filename, collection=collection)
+
+@task("resume_rewrite", queue="io")
+def resume_rewrite(resume_text, jd, filename=None, collection=None):
+    """Second step of resume_optimize: scoring and the LLM call, in the server process on the io queue."""
+    missing = find_missing_keywords(resume_text, extract_keywords_from_jd(jd))
+    return _optimize(jd, resume_text, missing, _relevance(jd, resume_text, filename, collection))
+
 @resume_bp.route("/optimize", methods=["POST"])
 def optimize():
     """
     Expects multipart form with:
       - 'resume' file
       - 'job_description' text field
+      - optional 'stream' field ("1" for Server-Sent Events)
+      - optional 'async' field ("1" to queue it and get 202 { job_id, status_url })
+      - optional 'collection' field: also index the resume and JD under this
+        name, for /api/screening/rank and /match with the same collection
     Returns: { optimized_path: "<url or path>", summary: ... }
+    `omitted_sections` lists resume sections that did not fit the prompt
+    budget and were left out ({"section", "truncated": false}) or shortened.
+    When streaming, "resume" events carry resume text as it is generated and
+    a final "done" event carries the same fields as the JSON response.
     """
     if "resume" not in request.files:
         return jsonify({"error": "resume file required"}), 400
@@ -32,68 +238,35 @@ def optimize():
     if file.filename == "" or not allowed(file.filename):
         return jsonify({"error": "invalid or missing resume file"}), 400
 
+    # hashed while it is written, so the parse cache needs no second read
     filename = secure_filename(file.filename)
-    unique_name = f"{uuid.uuid4().hex}_{filename}"
-    save_path = os.path.join(UPLOAD_RESUME_DIR, unique_name)
-    file.save(save_path)
+    collection = request.form.get("collection", "").strip() or None
+    store = get_store()
+    digest = store.put_stream(file.stream, "." + file.filename.rsplit(".", 1)[1].lower(), kind="resume")
+
+    if wants_async():
+        return accepted(jobs.submit("resume_optimize", digest=digest, jd=jd, filename=filename,
+                                    collection=collection))
 
     # parse resume text
     try:
-        resume_text = extract_text_from_file(save_path)
-        current_app.logger.info(f"Extracted resume text ({len(resume_text)} chars):\n{resume_text[:1000]}{'...' if len(resume_text) > 1000 else ''}")
+        resume_text = extract_text_from_file(store.path(digest), digest=digest)
+        current_app.logger.debug("Extracted resume text (%d chars)", len(resume_text))
+    except ResumeTooLargeError as e:
+        return jsonify({"error": str(e)}), 413
     except Exception as e:
         current_app.logger.exception("resume parsing error")
         return jsonify({"error": "failed to parse resume", "detail": str(e)}), 500
+    finally:
+        store.release(digest)
 
     # extract keywords from JD
     jd_keywords = extract_keywords_from_jd(jd)
     missing = find_missing_keywords(resume_text, jd_keywords)
+    relevance = _relevance(jd, resume_text, filename, collection)
 
-    # Use Gemini to rewrite/improve resume for JD
-    prompt = (
-        "You are an expert resume writer and career coach.\n\n"
-        "Job Description:\n"
-        f"{jd}\n\n"
-        "Candidate current resume text:\n"
-        f"{resume_text}\n\n"
-        "Task:\n"
-        "1) Produce an optimized resume text that emphasizes relevant skills for the job description, "
-        "adds ATS-friendly keywords, rewrites bullets into impactful results statements, and keeps content concise.\n"
-        "2) After the resume, produce a short 'Change Summary' listing major edits and inserted keywords.\n\n"
-        "Return the optimized resume, then '---CHANGE SUMMARY---' and the bullets."
-    )
-
-    try:
-        optimized = generate(prompt)  # generate is already Gemini (see import)
-    except Exception as e:
-        current_app.logger.exception("gemini error")
-        # Debug mode: return extracted resume text directly
-        optimized = resume_text + "\n\n---CHANGE SUMMARY---\n(No Gemini optimization: this is your raw resume text)"
+    if request.form.get("stream") in ("1", "true"):
+        # streamed text can't be validated as it arrives, so this keeps the delimiter format
+        return _stream_optimized(jd, resume_text, missing, relevance)
 
-    # Parse Gemini response: split at ---CHANGE SUMMARY---
-    resume_text, change_summary = optimized, ""
-    if '---CHANGE SUMMARY---' in optimized:
-        parts = optimized.split('---CHANGE SUMMARY---')
-        resume_text = parts[0].strip()
-        change_summary = parts[1].strip()
-    # Parse change summary into bullets
-    changes_explanation = []
-    for line in change_summary.split('\n'):
-        line = line.strip('-•* ').strip()
-        if line:
-            changes_explanation.append({"type": "added" if "add" in line.lower() else "modified", "description": line})
-
-    # Save optimized text to outputs
-    out_name = f"optimized_{uuid.uuid4().hex}.txt"
-    out_path = os.path.join(OUTPUT_RESUMES, out_name)
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(resume_text)
-
-    response = {
-        "optimized_resume": resume_text,
-        "changes_explanation": changes_explanation,
-        "optimized_path": out_path,
-        "missing_keywords": missing,
-        "summary_preview": resume_text[:1000]
-    }
-    return jsonify(response)
+    return jsonify(_optimize(jd, resume_text, missing, relevance))
@@ -0,0 +1,202 @@
+import contextlib
+import json
+import os
+import zipfile
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from werkzeug.utils import secure_filename
+from config.settings import SCREEN_MAX_FILES, SCREEN_MAX_BYTES, RESUME_MAX_BYTES
+from models.gemini import generate_cached as generate
+from routes.resume import allowed, build_optimize_prompt
+from utils.pdf_parser import ResumeTooLargeError
+from utils.screening import screening, ScreeningJob
+from utils.relevance import get_index
+from utils.storage import get_store
+
+screening_bp = Blueprint("screening", __name__)
+
+class _CappedReader:
+    """Read through `src`, raising ResumeTooLargeError past `limit` bytes (ZIP headers can lie)."""
+
+    def __init__(self, src, limit: int, what: str):
+        self.src = src
+        self.limit = limit
+        self.what = what
+        self.read_bytes = 0
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.src.read(n)
+        self.read_bytes += len(data)
+        if self.read_bytes > self.limit:
+            raise ResumeTooLargeError(f"{self.what} is over the {self.limit} byte limit")
+        return data
+
+
+def _collect_files(store, files):
+    """
+    Put uploaded resumes (and the contents of any ZIPs) into the store,
+    appending (name, path, digest) to `files`. Each holds a store reference
+    the screening job releases when it finishes. Raises ResumeTooLargeError
+    when a file is over RESUME_MAX_BYTES or the batch over SCREEN_MAX_BYTES,
+    uncompressed, before more than that is written.
+    """
+    total = 0
+
+    def add(name, open_stream, size=None):
+        nonlocal total
+        name = secure_filename(os.path.basename(name))
+        if not name or not allowed(name) or len(files) >= SCREEN_MAX_FILES:
+            return
+        if size is not None and size > RESUME_MAX_BYTES:
+            raise ResumeTooLargeError(f"{name} is {size} bytes, limit is {RESUME_MAX_BYTES}")
+        if size is not None and total + size > SCREEN_MAX_BYTES:
+            raise ResumeTooLargeError(f"upload is over the {SCREEN_MAX_BYTES} byte batch limit")
+        with open_stream() as src:
+            if RESUME_MAX_BYTES <= SCREEN_MAX_BYTES - total:
+                capped = _CappedReader(src, RESUME_MAX_BYTES, name)
+            else:
+                capped = _CappedReader(src, SCREEN_MAX_BYTES - total, "upload")
+            digest = store.put_stream(capped, "." + name.rsplit(".", 1)[1].lower(), kind="resume")
+        total += capped.read_bytes
+        files.append((name, store.path(digest), digest))
+
+    for f in request.files.getlist("resumes") + request.files.getlist("archive"):
+        if f.filename.lower().endswith(".zip"):
+            with zipfile.ZipFile(f.stream) as zf:
+                for info in zf.infolist():
+                    if info.is_dir():
+                        continue
+                    add(info.filename, lambda info=info, zf=zf: zf.open(info), size=info.file_size)
+        elif f.filename:
+            add(f.filename, lambda f=f: contextlib.nullcontext(f.stream))
+
+@screening_bp.route("/jobs", methods=["POST"])
+def create_job():
+    """
+    Expects multipart form with:
+      - 'resumes' files (repeatable) and/or 'archive' ZIP of resumes
+      - 'job_description' text field
+      - optional 'top_k': rewrite the best K resumes with Gemini
+    Returns 202: { job_id, total }
+    """
+    jd = request.form.get("job_description", "").strip()
+    if jd == "":
+        return jsonify({"error": "job_description form field is required"}), 400
+    try:
+        top_k = max(0, int(request.form.get("top_k", 0)))
+    except ValueError:
+        return jsonify({"error": "top_k must be an integer"}), 400
+
+    store = get_store()
+    files = []
+    try:
+        _collect_files(store, files)
+    except BaseException as e:
+        # whatever went wrong (client disconnect, disk full, bad archive), no job will own these
+        for _, _, digest in files:
+            store.release(digest, keep=False)
+        if isinstance(e, ResumeTooLargeError):
+            return jsonify({"error": str(e)}), 413
+        if not isinstance(e, zipfile.BadZipFile):
+            raise
+        files = []
+    if not files:
+        return jsonify({"error": "no valid resume files in upload"}), 400
+
+    rewrite = (lambda text: generate(build_optimize_prompt(jd, text)[0])) if top_k else None
+    try:
+        job = screening.submit(ScreeningJob(jd, files, top_k=top_k, rewrite=rewrite, release=store.release))
+    except BaseException:
+        for _, _, digest in files:
+            store.release(digest, keep=False)
+        raise
+    return jsonify({"job_id": job.id, "total": len(files)}), 202
+
+@screening_bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = screening.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job.progress())
+
+@screening_bp.route("/jobs/<job_id>/results", methods=["GET"])
+def job_results(job_id):
+    """
+    Ranked results so far. With ?stream=1, per-resume results are streamed
+    as NDJSON in completion order until the job finishes.
+    `rewrites` maps a result's "index" to its rewritten resume.
+    """
+    job = screening.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    if request.args.get("stream") in ("1", "true"):
+        def lines():
+            for r in job.iter_results():
+                yield json.dumps(r) + "\n"
+            yield json.dumps({"progress": job.progress(), "rewrites": job.rewrites}) + "\n"
+        return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+    return jsonify({**job.progress(), "results": job.ranked(), "rewrites": job.rewrites})
+
+@screening_bp.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    job = screening.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    job.cancel()
+    return jsonify(job.progress())
+
+def _k():
+    try:
+        return max(1, min(int((request.get_json(silent=True) or {}).get("k", 10)), 500))
+    except (TypeError, ValueError):
+        return None
+
+def _collection():
+    """
+    The index collection a /rank or /match request may search: a screening
+    job's ("job_id") or one the caller indexed optimize uploads under
+    ("collection"). Documents outside it are never returned.
+    """
+    data = request.get_json(silent=True) or {}
+    if data.get("job_id"):
+        # same naming as ScreeningJob.collection; the index outlives finished jobs
+        return "job:" + str(data["job_id"])
+    if data.get("collection"):
+        return "user:" + str(data["collection"])
+    return None
+
+@screening_bp.route("/rank", methods=["POST"])
+def rank():
+    """
+    Expects JSON { job_description, job_id or collection, k? (default 10) }.
+    Returns the k most similar resumes in that screening job or collection:
+    { results: [ { id, label, score } ], index: {...} }
+    """
+    jd = ((request.get_json(silent=True) or {}).get("job_description") or "").strip()
+    if not jd:
+        return jsonify({"error": "job_description is required"}), 400
+    collection = _collection()
+    if collection is None:
+        return jsonify({"error": "job_id or collection is required"}), 400
+    k = _k()
+    if k is None:
+        return jsonify({"error": "k must be an integer"}), 400
+    index = get_index()
+    return jsonify({"results": index.top_k(jd, k, kind="resume", collection=collection), "index": index.stats()})
+
+@screening_bp.route("/match", methods=["POST"])
+def match():
+    """
+    Expects JSON { resume_text, job_id or collection, k? (default 10) }.
+    Returns the k most similar job descriptions in that screening job or
+    collection: { results: [ { id, label, score } ] }
+    """
+    text = ((request.get_json(silent=True) or {}).get("resume_text") or "").strip()
+    if not text:
+        return jsonify({"error": "resume_text is required"}), 400
+    collection = _collection()
+    if collection is None:
+        return jsonify({"error": "job_id or collection is required"}), 400
+    k = _k()
+    if k is None:
+        return jsonify({"error": "k must be an integer"}), 400
+    return jsonify({"results": get_index().top_k(text, k, kind="jd", collection=collection)})
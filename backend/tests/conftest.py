@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# modules import each other as top-level packages (config, utils, routes), as when run from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A throwaway blob store in place of the app's."""
+    from utils import storage
+    s = storage.BlobStore(str(tmp_path / "store"), gc_interval=0)
+    monkeypatch.setattr(storage, "_store", s)
+    return s
+
+
+@pytest.fixture
+def client(store):
+    from app import app
+    return app.test_client()
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+
+import pytest
+
+from utils import jobs as jobs_module
+from utils.jobs import JobQueue, task, then, jobs, DONE, FAILED, RUNNING
+
+_gate = threading.Event()
+
+
+@task("test_add", queue="cpu")
+def _add(a, b):
+    return a + b
+
+
+@task("test_fail", queue="io")
+def _fail():
+    raise ValueError("boom")
+
+
+@task("test_gated", queue="io")
+def _gated():
+    _gate.wait(5)
+    return "opened"
+
+
+@task("test_parse", queue="cpu")
+def _parse(text):
+    return then("test_upper", words=text.split())
+
+
+@task("test_upper", queue="io")
+def _upper(words):
+    return [w.upper() for w in words]
+
+
+def _finished(q, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    job = q.get(job_id)
+    while job.status not in jobs_module.FINISHED and time.monotonic() < deadline:
+        job = q.wait(job_id, timeout=deadline - time.monotonic())
+    return job
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def test_job_runs_and_is_persisted(db):
+    q = JobQueue(cpu_workers=1, io_workers=1, db_path=db)
+    job = q.submit("test_add", a=1, b=2)
+    assert _finished(q, job.id).result == 3
+    # another process only sees it through SQLite, written just after the in-memory update
+    other = JobQueue(db_path=db)
+    stored = other.get(job.id)
+    if stored.status != DONE:
+        stored = other.wait(job.id, timeout=1)
+    assert (stored.status, stored.result) == (DONE, 3)
+
+
+def test_failed_job_records_error():
+    q = JobQueue(cpu_workers=1, io_workers=1, db_path="")
+    job = _finished(q, q.submit("test_fail").id)
+    assert (job.status, job.error) == (FAILED, "boom")
+
+
+def test_then_continues_the_job_on_the_next_queue():
+    q = JobQueue(cpu_workers=1, io_workers=1, db_path="")
+    job = _finished(q, q.submit("test_parse", text="a b").id)
+    assert (job.status, job.task, job.queue, job.result) == (DONE, "test_upper", "io", ["A", "B"])
+    assert q.stats()["cpu"]["completed"] == 1
+    assert q.stats()["io"]["completed"] == 1
+
+
+def test_wait_on_another_process_job_polls_the_store(db, monkeypatch):
+    monkeypatch.setattr(jobs_module, "STORE_POLL_INTERVAL", 0.02)
+    loads = []
+    runner = JobQueue(cpu_workers=1, io_workers=1, db_path=db)
+    watcher = JobQueue(db_path=db)  # never started: it only sees the job through SQLite
+    original = watcher._store.load
+    monkeypatch.setattr(watcher._store, "load", lambda job_id: loads.append(job_id) or original(job_id))
+    _gate.clear()
+    job = runner.submit("test_gated")
+    while runner.get(job.id).status != RUNNING:
+        time.sleep(0.01)
+
+    t = time.monotonic()
+    assert watcher.wait(job.id, timeout=0.2).status == RUNNING
+    assert 0.2 <= time.monotonic() - t < 1
+    # it sleeps between reads instead of spinning on the database
+    assert len(loads) <= 0.2 / 0.02 + 2
+
+    threading.Timer(0.1, _gate.set).start()
+    seen = watcher.wait(job.id, timeout=5)
+    assert (seen.status, seen.result) == (DONE, "opened")
+
+
+def test_wait_for_unknown_job_returns_none(db):
+    assert JobQueue(db_path=db).wait("nope", timeout=0.1) is None
+    assert JobQueue(db_path="").wait("nope", timeout=0.1) is None
+
+
+def _events(body):
+    out = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def test_stream_endpoint_reports_each_status_until_done(client):
+    job = jobs.submit("test_parse", text="x y")
+    r = client.get(f"/api/jobs/{job.id}/stream")
+    assert r.status_code == 200
+    events = _events(r.get_data(as_text=True))
+    assert all(name == "status" for name, _ in events)
+    assert events[-1][1]["status"] == DONE
+    assert events[-1][1]["result"] == ["X", "Y"]
+
+
+def test_status_and_stream_of_unknown_job_are_404(client):
+    assert client.get("/api/jobs/nope").status_code == 404
+    assert client.get("/api/jobs/nope/stream").status_code == 404
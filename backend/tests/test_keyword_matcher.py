@@ -0,0 +1,26 @@
+from utils.keyword_matcher import KeywordMatcher, compile_jd, find_missing_keywords, score_resume_against_jds
+
+
+def test_keywords_respect_token_boundaries():
+    resume = "Frontend work in JavaScript; analytics on Google Cloud."
+    assert find_missing_keywords(resume, ["java", "go", "javascript"]) == ["java", "go"]
+    assert find_missing_keywords("Java and Go services", ["java", "go"]) == []
+
+
+def test_aliases_fold_both_ways():
+    found, missing = KeywordMatcher(["kubernetes", "k8s", "golang", "machine learning"]).match(
+        "Ran k8s clusters, wrote Go, some ML.")
+    assert (found, missing) == (["kubernetes", "k8s", "golang", "machine learning"], [])
+    assert find_missing_keywords("Deployed on Kubernetes", ["k8s"]) == []
+
+
+def test_punctuated_skills_survive_tokenizing():
+    resume = "C++, C# and Node.js. Set up CI/CD."
+    assert find_missing_keywords(resume, ["c++", "c#", "node.js", "ci-cd", "c"]) == ["c"]
+
+
+def test_compiled_jd_is_reused_and_scores_many():
+    jd = "Python engineer: python services, kubernetes deployments"
+    assert compile_jd(jd) is compile_jd(jd)
+    python_jd, java_jd = score_resume_against_jds("python on k8s", [jd, "java java spring"])
+    assert python_jd["coverage"] > java_jd["coverage"] == 0.0
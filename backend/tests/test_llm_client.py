@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from models.llm import FakeBackend, LLMClient, LLMError, LLMTimeoutError
+
+
+def _client(backend, **kw):
+    kw.setdefault("backoff", 0.01)
+    return LLMClient(backend, **kw)
+
+
+def test_transient_errors_are_retried_with_backoff():
+    backend = FakeBackend(response="ok", fail_times=2)
+    t = time.monotonic()
+    assert _client(backend, max_retries=3, backoff=0.05).generate("p") == "ok"
+    assert backend.calls == 3
+    # jittered exponential backoff: at least half of 0.05 + 0.1
+    assert time.monotonic() - t >= 0.07
+
+
+def test_gives_up_after_max_retries():
+    backend = FakeBackend(fail_times=10, fail_code=429)
+    with pytest.raises(LLMError) as exc:
+        _client(backend, max_retries=2).generate("p")
+    assert exc.value.code == 429
+    assert backend.calls == 3
+
+
+def test_client_errors_are_not_retried():
+    backend = FakeBackend(fail_times=1, fail_code=400)
+    with pytest.raises(LLMError):
+        _client(backend, max_retries=3).generate("p")
+    assert backend.calls == 1
+
+
+def test_timeout_bounds_the_whole_call_including_retries():
+    backend = FakeBackend(latency=5)
+    t = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        _client(backend, max_retries=3).generate("p", timeout=0.3)
+    assert time.monotonic() - t < 1
+    assert backend.calls == 1
+
+
+def test_no_retry_when_the_backoff_would_pass_the_deadline():
+    backend = FakeBackend(response="ok", fail_times=1)
+    t = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        _client(backend, max_retries=3, backoff=5).generate("p", timeout=1)
+    assert time.monotonic() - t < 0.5
+    assert backend.calls == 1
+
+
+def test_waiting_for_a_slot_counts_against_the_deadline():
+    client = _client(FakeBackend(response="ok", latency=0.5), max_concurrency=1)
+    busy = threading.Thread(target=client.generate, args=("first",))
+    busy.start()
+    time.sleep(0.05)
+    with pytest.raises(LLMTimeoutError):
+        client.generate("second", timeout=0.1)
+    busy.join()
+    assert client.stats()["in_flight"] == 0
+
+
+def test_stream_retries_only_before_the_first_chunk():
+    backend = FakeBackend(response="x" * 40, fail_times=1)
+    assert "".join(_client(backend, max_retries=1).stream("p")) == "x" * 40
+    assert backend.calls == 2
+
+    class Flaky(FakeBackend):
+        def stream(self, prompt, config, timeout):
+            self.calls += 1
+            yield "partial"
+            err = LLMError("dropped")
+            err.code = 503
+            raise err
+    flaky = Flaky()
+    chunks = []
+    with pytest.raises(LLMError):
+        for chunk in _client(flaky, max_retries=3).stream("p"):
+            chunks.append(chunk)
+    assert (chunks, flaky.calls) == (["partial"], 1)
@@ -0,0 +1,50 @@
+from utils import prompt_budget
+from utils.prompt_budget import clean_text, estimate_tokens, fit_resume, fit_resume_report
+
+JD = "Backend engineer: python, flask, docker, kubernetes, postgresql."
+
+
+def _resume():
+    return "\n\n".join([
+        "Jane Doe\njane@example.com",
+        "EXPERIENCE\n" + "Led gardening and knitting workshops for the community. " * 60,
+        "SKILLS\n" + "Python, Flask, Docker, Kubernetes, PostgreSQL. " * 20,
+        "HOBBIES\n" + "Hiking, baking and board games on weekends. " * 60,
+    ])
+
+
+def test_clean_text_drops_page_furniture_and_repeated_headers():
+    text = "Jane Doe - Senior Backend Engineer\nPython\nPage 1 of 2\n\n\n" \
+           "Jane Doe - Senior Backend Engineer\nPython\n2 / 2"
+    assert clean_text(text) == "Jane Doe - Senior Backend Engineer\nPython\n\nPython"
+
+
+def test_short_resume_is_only_cleaned():
+    text, omitted = fit_resume_report("Jane Doe\n\nSKILLS\nPython", JD, 1000)
+    assert text == "Jane Doe\n\nSKILLS\nPython"
+    assert omitted == []
+
+
+def test_long_resume_keeps_header_and_matching_sections():
+    budget = 500
+    text, omitted = fit_resume_report(_resume(), JD, budget)
+    assert estimate_tokens(text) <= budget
+    assert text.startswith("Jane Doe")
+    assert "SKILLS\nPython, Flask" in text
+    names = {o["section"]: o["truncated"] for o in omitted}
+    assert "SKILLS" not in names
+    assert set(names) == {"EXPERIENCE", "HOBBIES"}
+    # the first section that didn't fit whole is shortened, the rest dropped
+    kept_partly = [n for n, truncated in names.items() if truncated]
+    assert kept_partly == ["EXPERIENCE"]
+    # kept sections stay in resume order
+    assert text.index("EXPERIENCE") < text.index("SKILLS")
+
+
+def test_fit_resume_returns_the_reported_text():
+    assert fit_resume(_resume(), JD, 500) == fit_resume_report(_resume(), JD, 500)[0]
+
+
+def test_report_counts_tokens_before_and_after():
+    counts = prompt_budget.report("test", ("a" * 400, "b" * 40), ("a" * 40, "b" * 40))
+    assert counts == {"before": 110, "after": 20}
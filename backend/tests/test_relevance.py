@@ -0,0 +1,94 @@
+import glob
+import os
+
+from utils.relevance import RelevanceIndex, doc_id
+
+RESUMES = {
+    "py": "python flask django postgresql backend services rest apis",
+    "js": "javascript react typescript css frontend components browser",
+    "ml": "machine learning pytorch numpy pandas models training data",
+}
+JD = "backend engineer with python, flask and postgresql"
+
+
+def _fill(index, collection=None):
+    index.add_many([(name, text, "resume", name + ".pdf") for name, text in RESUMES.items()],
+                   collection=collection)
+
+
+def test_top_k_ranks_matching_resume_first():
+    index = RelevanceIndex(None)
+    _fill(index)
+    top = index.top_k(JD, 2)
+    assert top[0]["id"] == "py"
+    assert top[0]["label"] == "py.pdf"
+
+
+def test_re_adding_an_id_replaces_it():
+    index = RelevanceIndex(None)
+    _fill(index)
+    for i in range(40):
+        index.add("py", RESUMES["js"] if i % 2 else RESUMES["py"], "resume")
+    index.add("py", "golang terraform kubernetes operators", "resume")
+    stats = index.stats()
+    assert stats["documents"] == 3
+    # replaced rows are compacted away, not kept forever
+    assert stats["rows"] < 10
+    assert [r["id"] for r in index.top_k("golang terraform", 3)] == ["py"]
+    assert "py" not in [r["id"] for r in index.top_k(JD, 3)]
+
+
+def test_oldest_documents_are_evicted_past_max_docs():
+    index = RelevanceIndex(None, max_docs=5)
+    index.add_many([(f"r{i}", f"resume number {i} python", "resume") for i in range(8)])
+    assert index.stats()["documents"] == 5
+    assert {r["id"] for r in index.top_k("python", 10)} == {f"r{i}" for i in range(3, 8)}
+
+
+def test_results_are_scoped_to_a_collection():
+    index = RelevanceIndex(None)
+    _fill(index, collection="job:a")
+    index.add("other", RESUMES["py"], "resume", collection="job:b")
+    assert "other" not in [r["id"] for r in index.top_k(JD, 10, collection="job:a")]
+    assert [r["id"] for r in index.top_k(JD, 10, collection="job:b")] == ["other"]
+    assert index.top_k(JD, 10) == []
+
+
+def test_doc_id_depends_on_collection():
+    assert doc_id("resume", "text", "job:a") != doc_id("resume", "text", "job:b")
+    assert doc_id("resume", "text") == doc_id("resume", "text")
+
+
+def test_disk_index_survives_reopen(tmp_path):
+    index = RelevanceIndex(str(tmp_path))
+    _fill(index, collection="job:a")
+    reopened = RelevanceIndex(str(tmp_path))
+    assert reopened.top_k(JD, 3, collection="job:a") == index.top_k(JD, 3, collection="job:a")
+    assert reopened.stats()["documents"] == 3
+
+
+def test_reader_sees_writers_additions(tmp_path):
+    writer = RelevanceIndex(str(tmp_path))
+    reader = RelevanceIndex(str(tmp_path))
+    assert reader.top_k(JD, 3) == []
+    _fill(writer)
+    assert [r["id"] for r in reader.top_k(JD, 1)] == ["py"]
+
+
+def test_disk_rewrite_drops_replaced_rows(tmp_path):
+    index = RelevanceIndex(str(tmp_path))
+    reader = RelevanceIndex(str(tmp_path))
+    _fill(index)
+    for i in range(30):
+        index.add("py", RESUMES["py"] + f" revision {i}", "resume")
+    assert index.stats()["rows"] < 30
+    # only the current generation's files are left
+    assert len(glob.glob(os.path.join(str(tmp_path), "data*"))) == 1
+
+    fresh = RelevanceIndex(None)
+    fresh.add_many([(n, t, "resume", n + ".pdf") for n, t in RESUMES.items() if n != "py"])
+    fresh.add("py", RESUMES["py"] + " revision 29", "resume", "py.pdf")
+    expected = fresh.top_k(JD, 3)
+    assert index.top_k(JD, 3) == expected
+    assert reader.top_k(JD, 3) == expected
+    assert RelevanceIndex(str(tmp_path)).top_k(JD, 3) == expected
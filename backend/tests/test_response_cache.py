@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from models.response_cache import ResponseCache, prompt_key
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(maxsize=16, ttl=60, db_path=None)
+
+
+def _wait_for(cond, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cond()
+
+
+def test_concurrent_identical_prompts_generate_once(cache):
+    calls, release = [], threading.Event()
+
+    def generate():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_generate("k", generate)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: cache.shared == 7)
+    release.set()
+    for t in threads:
+        t.join()
+    assert calls == [1]
+    assert results == ["answer"] * 8
+    assert cache.get_or_generate("k", generate) == "answer"
+    assert calls == [1]
+
+
+def test_leader_failure_reaches_waiters_and_is_not_cached(cache):
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_generate("k", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: cache.shared == 2)
+    release.set()
+    for t in threads:
+        t.join()
+    assert errors == ["upstream down"] * 3
+    assert cache.get_or_generate("k", lambda: "recovered") == "recovered"
+
+
+def test_miss_that_races_a_finished_leader_does_not_regenerate(cache, monkeypatch):
+    # the leader stored its value and left between this caller's miss and the lock
+    cache.set("k", "answer")
+    monkeypatch.setattr(cache, "get", lambda key: None)
+    calls = []
+    assert cache.get_or_generate("k", lambda: calls.append(1) or "again") == "answer"
+    assert calls == []
+
+
+def test_prompt_key_ignores_whitespace_only():
+    assert prompt_key("a  b\n", "m", {"t": 0}) == prompt_key(" a b", "m", {"t": 0})
+    assert prompt_key("a b", "m", {"t": 0}) != prompt_key("a b", "m", {"t": 1})
+    assert prompt_key("a b", "m", {}) != prompt_key("a b", "other", {})
@@ -0,0 +1,80 @@
+import io
+import time
+import zipfile
+
+import pytest
+
+import routes.screening as screening_routes
+
+
+@pytest.fixture(autouse=True)
+def small_limits(monkeypatch):
+    monkeypatch.setattr(screening_routes, "RESUME_MAX_BYTES", 1000)
+    monkeypatch.setattr(screening_routes, "SCREEN_MAX_BYTES", 3000)
+
+
+def _zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    buf.seek(0)
+    return buf
+
+
+def _post(client, **files):
+    data = {"job_description": "python flask backend engineer"}
+    data.update(files)
+    return client.post("/api/screening/jobs", data=data)
+
+
+def test_zip_member_over_the_file_limit_is_413(client, store):
+    # highly compressible: the archive itself is tiny
+    r = _post(client, archive=(_zip({"ok.txt": "python", "big.txt": "a" * 5000}), "batch.zip"))
+    assert r.status_code == 413
+    assert "big.txt" in r.get_json()["error"]
+    # members stored before the oversized one are not leaked
+    assert store.stats()["blobs"] == 0
+
+
+def test_zip_over_the_batch_limit_is_413(client, store):
+    members = {f"r{i}.txt": "python " * 130 for i in range(4)}
+    r = _post(client, archive=(_zip(members), "batch.zip"))
+    assert r.status_code == 413
+    assert "batch" in r.get_json()["error"]
+    assert store.stats()["blobs"] == 0
+
+
+def test_plain_upload_over_the_file_limit_is_413(client, store):
+    r = _post(client, resumes=(io.BytesIO(b"a" * 1001), "big.txt"))
+    assert r.status_code == 413
+    assert store.stats()["blobs"] == 0
+
+
+def test_bad_zip_is_400(client, store):
+    r = _post(client, archive=(io.BytesIO(b"not a zip"), "batch.zip"))
+    assert r.status_code == 400
+
+
+def test_batch_within_limits_is_screened(client, store):
+    members = {"py.txt": "python flask backend engineer", "js.txt": "react css designer"}
+    r = _post(client, archive=(_zip(members), "batch.zip"), resumes=(io.BytesIO(b"python dev"), "one.txt"))
+    assert r.status_code == 202
+    job_id, total = r.get_json()["job_id"], r.get_json()["total"]
+    assert total == 3
+
+    deadline = time.monotonic() + 60
+    status = client.get(f"/api/screening/jobs/{job_id}").get_json()
+    while status["status"] not in ("done", "failed") and time.monotonic() < deadline:
+        time.sleep(0.1)
+        status = client.get(f"/api/screening/jobs/{job_id}").get_json()
+    assert status["status"] == "done", status
+
+    results = client.get(f"/api/screening/jobs/{job_id}/results").get_json()["results"]
+    assert results[0]["file"] == "py.txt"
+
+    # ranked again within this job's collection
+    r = client.post("/api/screening/rank", json={"job_description": "python flask", "job_id": job_id})
+    assert r.status_code == 200
+    assert r.get_json()["results"][0]["label"] == "py.txt"
+    assert client.post("/api/screening/rank", json={"job_description": "python"}).status_code == 400
@@ -0,0 +1,59 @@
+import pytest
+
+from utils import sessions as sessions_module
+from utils.sessions import SessionStore
+
+FEEDBACK = "Feedback Summary: clear\nProfessionalism: 8\nPreparation: 6\nCommunication: 7\nPredicted Score: 7"
+
+
+@pytest.fixture
+def store(monkeypatch):
+    s = SessionStore(db_path="")
+    monkeypatch.setattr(sessions_module, "sessions", s)
+    import routes.interview
+    monkeypatch.setattr(routes.interview, "sessions", s)
+    return s
+
+
+def test_session_ids_are_minted_and_unguessable(store):
+    ids = {store.create().id for _ in range(100)}
+    assert len(ids) == 100
+    assert all(len(i) == 32 for i in ids)
+
+
+def test_turns_for_unknown_ids_are_refused(store):
+    assert store.record_turn("session_1700000000000", "answer", FEEDBACK) is None
+    assert store.get("session_1700000000000") is None
+
+
+def test_sessions_are_shared_through_sqlite(tmp_path):
+    db = str(tmp_path / "sessions.sqlite3")
+    a, b = SessionStore(db_path=db), SessionStore(db_path=db)
+    sid = a.create().id
+    b.record_turn(sid, "answer", FEEDBACK)
+    assert a.get(sid).turns == 1
+    assert a.end(sid).average("professionalism") == 8
+    assert b.get(sid) is None
+
+
+def test_interview_flow_through_routes(client, store):
+    sid = client.post("/api/interview/start_interview").get_json()["session_id"]
+    r = client.post(f"/api/interview/session/{sid}/turn", json={"answer": "I used Flask", "feedback": FEEDBACK})
+    assert r.get_json()["scores"]["professionalism"] == 8
+
+    r = client.post("/api/interview/end_interview", json={"session_id": sid})
+    assert "Average Professionalism: 8.0" in r.get_json()["summary"]
+    # ended sessions are gone
+    r = client.post("/api/interview/end_interview", json={"session_id": sid})
+    assert r.get_json()["session_found"] is False
+
+
+def test_guessed_ids_cannot_write_or_read(client, store):
+    sid = store.create().id
+    store.record_turn(sid, "mine", FEEDBACK)
+    guess = "session_1700000000000"
+    assert client.post(f"/api/interview/session/{guess}/turn",
+                       json={"answer": "x", "feedback": FEEDBACK}).status_code == 404
+    r = client.post("/api/interview/end_interview", json={"session_id": guess})
+    assert r.get_json()["session_found"] is False
+    assert store.get(sid).turns == 1
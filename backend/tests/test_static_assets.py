@@ -0,0 +1,56 @@
+import pytest
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from utils import static_assets
+from utils.static_assets import IMMUTABLE, REVALIDATE, StaticAssets
+
+needs_brotli = pytest.mark.skipif(static_assets.brotli is None, reason="brotli is not installed")
+
+
+@pytest.fixture
+def assets(tmp_path):
+    (tmp_path / "app.js").write_text("console.log('hello');\n" * 100)
+    (tmp_path / "index.html").write_text('<script src="app.js"></script>')
+    return StaticAssets(str(tmp_path))
+
+
+def _get(assets, path, **headers):
+    return assets.serve(path, Request(EnvironBuilder(path="/" + path, headers=headers).get_environ()))
+
+
+@needs_brotli
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip;q=1, br;q=0.5", "gzip"),
+    ("br;q=0.8, gzip;q=0.9", "gzip"),
+    ("gzip, br", "br"),  # tie: br is smaller
+    ("br;q=0, gzip;q=0", None),
+    ("br;q=0", None),
+    ("identity", None),
+    ("*", "br"),
+])
+def test_encoding_follows_q_values(assets, accept, expected):
+    r = _get(assets, "app.js", **{"Accept-Encoding": accept})
+    assert r.headers.get("Content-Encoding") == expected
+    assert r.headers["Vary"] == "Accept-Encoding"
+
+
+def test_gzip_is_used_when_br_is_refused_or_missing(assets, monkeypatch):
+    assert _get(assets, "app.js", **{"Accept-Encoding": "br;q=0, gzip"}).headers["Content-Encoding"] == "gzip"
+    monkeypatch.setattr(static_assets, "brotli", None)
+    plain = StaticAssets(assets.root)
+    assert _get(plain, "app.js", **{"Accept-Encoding": "br, gzip;q=0.1"}).headers["Content-Encoding"] == "gzip"
+
+
+def test_index_links_fingerprinted_names_that_are_cached_for_a_year(assets):
+    asset, _ = assets.get("app.js")
+    index = _get(assets, "")
+    assert asset.hashed_name.encode() in index.get_data()
+    assert index.headers["Cache-Control"] == REVALIDATE
+    assert _get(assets, asset.hashed_name).headers["Cache-Control"] == IMMUTABLE
+
+
+def test_etag_revalidates_across_encodings(assets):
+    etag = _get(assets, "app.js", **{"Accept-Encoding": "gzip"}).headers["ETag"]
+    assert _get(assets, "app.js", **{"If-None-Match": etag}).status_code == 304
+    assert _get(assets, "app.js", **{"If-None-Match": '"other"'}).status_code == 200
@@ -0,0 +1,87 @@
+import os
+import time
+
+import pytest
+
+from utils.storage import BlobStore
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return BlobStore(str(tmp_path), max_bytes=1000, max_age=60, gc_interval=0)
+
+
+def _exists(store, digest):
+    try:
+        return os.path.exists(store.path(digest))
+    except KeyError:
+        return False
+
+
+def test_identical_content_is_stored_once(blobs):
+    a = blobs.put_bytes(b"same", ".txt")
+    b = blobs.put_bytes(b"same", ".txt")
+    assert a == b
+    assert blobs.stats()["blobs"] == 1
+    assert blobs.dedup_hits == 1
+
+
+def test_release_without_keep_deletes_on_last_reference(blobs):
+    digest = blobs.put_bytes(b"x", ".txt")
+    blobs.put_bytes(b"x", ".txt")
+    blobs.release(digest, keep=False)
+    assert _exists(blobs, digest)
+    blobs.release(digest, keep=False)
+    assert not _exists(blobs, digest)
+
+
+def test_kept_blob_survives_release_without_keep(blobs):
+    digest = blobs.put_bytes(b"x", ".txt")
+    blobs.put_bytes(b"x", ".txt")
+    blobs.release(digest)
+    blobs.release(digest, keep=False)
+    assert _exists(blobs, digest)
+
+
+def test_gc_drops_old_unreferenced_blobs_only(blobs):
+    old = blobs.put_bytes(b"old", ".txt")
+    held = blobs.put_bytes(b"held", ".txt")
+    blobs.release(old)
+    result = blobs.gc(now=time.time() + 61)
+    assert result["removed"] == 1
+    assert not _exists(blobs, old)
+    assert _exists(blobs, held)
+
+
+def test_gc_evicts_oldest_first_past_max_bytes(blobs):
+    digests = []
+    for i in range(3):
+        digests.append(blobs.put_bytes(bytes([i]) * 400, ".bin"))
+        blobs.release(digests[-1])
+        time.sleep(0.01)
+    blobs.gc()
+    assert [_exists(blobs, d) for d in digests] == [False, True, True]
+
+
+def test_gc_reclaims_leaked_references(blobs):
+    digest = blobs.put_bytes(b"leaked", ".txt")
+    blobs.gc(now=time.time() + 61)
+    assert _exists(blobs, digest)
+    blobs.gc(now=time.time() + 121)
+    assert not _exists(blobs, digest)
+
+
+def test_optimized_results_fall_under_retention(blobs):
+    digest = blobs.put_bytes(b"o" * 2000, ".txt", kind="optimized")
+    blobs.release(digest)
+    blobs.gc()
+    assert not _exists(blobs, digest)
+
+
+def test_failed_write_leaves_nothing_behind(blobs):
+    with pytest.raises(RuntimeError):
+        with blobs.writer(".txt") as w:
+            w.write(b"partial")
+            raise RuntimeError("client went away")
+    assert blobs.stats()["blobs"] == 0
+    assert os.listdir(os.path.join(blobs.root, "tmp")) == []
@@ -0,0 +1,119 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from benchmarks import fixtures
+from models.whisper import streaming
+from models.whisper.audio import SAMPLE_RATE, StreamDecoder, decode_audio
+from models.whisper.streaming import StreamingTranscriber
+
+needs_ffmpeg = pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg is not installed")
+
+
+@pytest.fixture
+def transcribed(monkeypatch):
+    """Replace whisper: each call records how many samples it was given."""
+    calls = []
+
+    def fake(audio, language="en", use_cache=True):
+        calls.append(len(audio))
+        return {"text": f"seg{len(calls)}"}
+    monkeypatch.setattr(streaming, "transcribe_audio", fake)
+    return calls
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@needs_ffmpeg
+def test_stream_decoder_matches_whole_file_decode(tmp_path):
+    data = open(fixtures.write_audio(str(tmp_path / "answer.webm"), 4), "rb").read()
+    decoder = StreamDecoder()
+    pieces = []
+    for chunk in _chunks(data, 4096):
+        decoder.feed(chunk)
+        pieces.append(decoder.read())
+    pieces.append(decoder.close())
+    streamed = np.concatenate(pieces)
+
+    whole = decode_audio(data)
+    assert abs(len(streamed) - len(whole)) < SAMPLE_RATE // 20
+    n = min(len(streamed), len(whole))
+    assert np.allclose(streamed[:n], whole[:n], atol=1e-3)
+
+
+@needs_ffmpeg
+def test_stream_decoder_hands_over_audio_before_close(tmp_path):
+    data = open(fixtures.write_audio(str(tmp_path / "answer.webm"), 6), "rb").read()
+    decoder = StreamDecoder()
+    early = 0
+    for chunk in _chunks(data, len(data) // 4 + 1)[:3]:
+        decoder.feed(chunk)
+        early += len(decoder.read(wait=0.5))
+    decoder.kill()
+    assert early > 0
+
+
+@needs_ffmpeg
+def test_container_stream_transcribes_all_audio_once(tmp_path, transcribed):
+    data = open(fixtures.write_audio(str(tmp_path / "answer.webm"), 5), "rb").read()
+    st = StreamingTranscriber(fmt="container")
+    for chunk in _chunks(data, 2048):
+        st.feed(chunk)
+    result = st.finish()
+    st.close()
+    assert result["text"]
+    assert result["partial"] == ""
+    # committed segments cover the clip; partials (use_cache=False) are extra
+    assert sum(transcribed) >= SAMPLE_RATE * 4
+
+
+def test_pcm_stream_commits_segments_at_pauses(transcribed):
+    speech = (0.2 * np.sin(np.arange(SAMPLE_RATE) * 0.05)).astype(np.float32)
+    pause = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    pcm = (np.concatenate([speech, pause, speech, pause]) * 32767).astype("<i2").tobytes()
+
+    st = StreamingTranscriber(fmt="pcm_s16le")
+    for chunk in _chunks(pcm, 3201):  # odd sizes split samples across chunks
+        st.feed(chunk)
+    committed = st.snapshot()["committed"].split()
+    assert len(committed) == 2
+    assert st.finish()["committed"].split() == committed
+
+
+def test_registry_closes_streams(monkeypatch):
+    closed = []
+    monkeypatch.setattr(StreamingTranscriber, "close", lambda self: closed.append(self))
+    registry = streaming.StreamRegistry(ttl=60)
+    sid = registry.open(fmt="pcm_s16le")
+    st = registry.get(sid)
+    assert registry.close(sid) is st
+    assert closed == [st]
+    assert registry.get(sid) is None
+
+
+def test_container_decoder_starts_on_first_chunk(transcribed):
+    st = StreamingTranscriber(fmt="container")
+    assert st._decoder is None
+    assert st.finish()["text"] == ""
+    st.close()
+    assert transcribed == []
+
+
+def test_registry_refuses_streams_past_max_open():
+    registry = streaming.StreamRegistry(ttl=60, max_open=2)
+    sids = [registry.open() for _ in range(2)]
+    with pytest.raises(streaming.TooManyStreamsError) as exc:
+        registry.open()
+    assert 1 <= exc.value.retry_after <= 61
+    registry.close(sids[0])
+    assert registry.open()
+
+
+def test_stream_route_returns_503_when_full(client, monkeypatch):
+    monkeypatch.setattr(streaming.streams, "max_open", 0)
+    r = client.post("/api/interview/stream", json={})
+    assert r.status_code == 503
+    assert int(r.headers["Retry-After"]) >= 1
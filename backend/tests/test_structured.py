@@ -0,0 +1,71 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from models import gemini, structured
+from models.llm import FakeBackend, LLMClient
+from models.response_cache import ResponseCache
+from models.structured import StructuredOutputError, generate_structured, model_schema
+
+SCHEMA = {
+    "type": "object",
+    "required": ["score", "tips"],
+    "properties": {
+        "score": {"type": "integer", "minimum": 0, "maximum": 10},
+        "tips": {"type": "array", "items": {"type": "string"}},
+    },
+}
+GOOD = json.dumps({"score": 7, "tips": ["quantify impact"]})
+BAD = '```json\n{"score": "seven"}\n```'
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Point generate_cached at a FakeBackend and a fresh cache; replies are keyed first/repair."""
+    prompts = []
+    replies = {"first": BAD, "repair": GOOD}
+
+    def reply(prompt):
+        prompts.append(prompt)
+        return replies["repair" if "does not match the required schema" in prompt else "first"]
+    backend = FakeBackend(response=reply)
+    monkeypatch.setattr(gemini, "_client", LLMClient(backend, max_retries=0))
+    monkeypatch.setattr(gemini, "response_cache", ResponseCache(maxsize=16, ttl=60, db_path=None))
+    monkeypatch.setattr(structured, "counters", structured._Counters())
+    return SimpleNamespace(backend=backend, prompts=prompts, replies=replies)
+
+
+def test_valid_reply_needs_one_call(llm):
+    llm.replies["first"] = "Sure! " + GOOD
+    assert generate_structured("Rate this resume", SCHEMA, "t") == {"score": 7, "tips": ["quantify impact"]}
+    assert llm.backend.calls == 1
+    assert structured.counters.snapshot()["t"]["parsed"] == 1
+
+
+def test_invalid_reply_is_repaired_without_resending_the_prompt(llm):
+    prompt = "Rate this resume: " + "long resume text " * 50
+    assert generate_structured(prompt, SCHEMA, "t")["score"] == 7
+    assert llm.backend.calls == 2
+    repair = llm.prompts[1]
+    assert "long resume text" not in repair
+    assert BAD in repair and "$.score: expected integer" in repair
+    counts = structured.counters.snapshot()["t"]
+    assert (counts["parse_failures"], counts["repaired"], counts["failed"]) == (1, 1, 0)
+
+
+def test_failed_repair_raises_and_evicts_both_cached_replies(llm):
+    llm.replies["repair"] = '{"score": 11, "tips": []}'
+    with pytest.raises(StructuredOutputError) as exc:
+        generate_structured("Rate this resume", SCHEMA, "t")
+    assert exc.value.raw == BAD
+    assert "above 10" in str(exc.value)
+
+    # nothing unusable is served from the cache: the retry goes back to the model
+    llm.replies["first"] = GOOD
+    assert generate_structured("Rate this resume", SCHEMA, "t")["score"] == 7
+    assert llm.backend.calls == 3
+
+
+def test_model_schema_drops_keywords_the_api_rejects():
+    assert model_schema(SCHEMA)["properties"]["score"] == {"type": "integer"}
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from models.whisper import load_model
+from models.whisper.load_model import WhisperModelPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A pool whose replicas are plain objects that take 0.5 s to load."""
+    p = WhisperModelPool("fake", size=1)
+
+    def slow_load():
+        time.sleep(0.5)
+        p._first = object()
+        return p._first
+    monkeypatch.setattr(p, "_load_replica", slow_load)
+    monkeypatch.setattr(load_model, "_pool", p)
+    return p
+
+
+def _in_child(fn) -> dict:
+    """Run fn() in a forked child and return its JSON-able result."""
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.write(w, json.dumps(fn()).encode())
+        finally:
+            os._exit(0)
+    os.close(w)
+    with os.fdopen(r) as f:
+        out = f.read()
+    os.waitpid(pid, 0)
+    return json.loads(out)
+
+
+def test_fork_during_warm_up_leaves_the_child_a_working_pool(pool):
+    pool.warm_up(background=True)
+    time.sleep(0.1)
+
+    def child():
+        before = pool.stats()
+        try:
+            with pool.model(timeout=5):
+                pass
+            ok = True
+        except TimeoutError:
+            ok = False
+        return {"before": before, "checkout": ok}
+
+    result = _in_child(child)
+    assert (result["before"]["loaded"], result["before"]["idle"]) == (0, 0)
+    assert result["checkout"]
+    pool._warm_thread.join()
+    assert pool.stats()["idle"] == 1
+
+
+def test_fork_keeps_idle_replicas_and_drops_checked_out_ones(monkeypatch):
+    pool = WhisperModelPool("fake", size=2)
+    monkeypatch.setattr(pool, "_load_replica", lambda: object())
+    monkeypatch.setattr(load_model, "_pool", pool)
+    pool.warm_up(background=False)
+    held, release = threading.Event(), threading.Event()
+
+    def borrow():
+        with pool.model():
+            held.set()
+            release.wait(5)
+    # the replica a parent thread has checked out never comes back in the child
+    t = threading.Thread(target=borrow)
+    t.start()
+    held.wait(5)
+    try:
+        stats = _in_child(pool.stats)
+    finally:
+        release.set()
+        t.join()
+    assert stats == {"model": "fake", "size": 2, "loaded": 1, "in_use": 0, "idle": 1}
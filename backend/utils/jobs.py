@@ -0,0 +1,334 @@
+import json
+import multiprocessing
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from config.settings import (
+    JOB_CPU_WORKERS,
+    JOB_IO_WORKERS,
+    JOB_CPU_EXECUTOR,
+    JOB_DB,
+    JOB_RETENTION,
+)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+STORE_POLL_INTERVAL = 0.5  # seconds between SQLite reads when waiting on another process's job
+
+# name -> (function, queue name); filled by @task at import time
+_tasks = {}
+_NEXT = "__next_task__"
+
+
+def task(name: str, queue: str = "io"):
+    """
+    Register a function as a background task. Arguments and return value
+    must be JSON-serializable so jobs can be persisted and, for process
+    queues, sent to worker processes.
+    """
+    def wrap(fn):
+        _tasks[name] = (fn, queue)
+        return fn
+    return wrap
+
+
+def then(task_name: str, **args) -> dict:
+    """
+    Return this from a task to continue the same job with another task,
+    on that task's queue: e.g. a "cpu" step handing its output to an "io"
+    step that calls the LLM, so neither queue's workers wait on the other
+    kind of work.
+    """
+    return {_NEXT: task_name, "args": args}
+
+
+class Job:
+    __slots__ = ("id", "task", "queue", "args", "status", "result", "error",
+                 "created", "started", "finished")
+
+    def __init__(self, task_name, queue_name, args, job_id=None, status=QUEUED, created=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.task = task_name
+        self.queue = queue_name
+        self.args = args
+        self.status = status
+        self.result = None
+        self.error = None
+        self.created = created or time.time()
+        self.started = None
+        self.finished = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "task": self.task,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class _Store:
+    """SQLite persistence so queued jobs survive a restart."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pid = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db().execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, task TEXT, queue TEXT, args TEXT, "
+                "status TEXT, result TEXT, error TEXT, created REAL, started REAL, finished REAL)"
+            )
+            self._db().commit()
+
+    def _db(self):
+        # sqlite connections must not cross fork(); reconnect in each process
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._pid = os.getpid()
+        return self._conn
+
+    def save(self, job: Job):
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.task, job.queue, json.dumps(job.args), job.status,
+                 json.dumps(job.result), job.error, job.created, job.started, job.finished),
+            )
+            self._db().commit()
+
+    def load(self, job_id: str):
+        with self._lock:
+            row = self._db().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def unfinished(self) -> list:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created", (QUEUED, RUNNING)
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def prune(self, before: float):
+        with self._lock:
+            self._db().execute("DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (before,))
+            self._db().commit()
+
+    def _row(self, row) -> Job:
+        job = Job(row[1], row[2], json.loads(row[3]), job_id=row[0], status=row[4], created=row[7])
+        job.result = json.loads(row[5]) if row[5] else None
+        job.error, job.started, job.finished = row[6], row[8], row[9]
+        return job
+
+
+class _WorkQueue:
+    """A named queue with its own worker threads (and optional process pool)."""
+
+    def __init__(self, name: str, workers: int, use_processes: bool = False):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.pending = queue.Queue()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self._pool = None
+        if use_processes:
+            ctx = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+
+    def call(self, fn, args: dict):
+        if self._pool is not None:
+            return self._pool.submit(fn, **args).result()
+        return fn(**args)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.pending.qsize(),
+            "running": self.running,
+            "workers": self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+class JobQueue:
+    """
+    In-process job subsystem. Tasks run on separate queues by workload:
+    "cpu" (transcription, parsing; threads or processes, see
+    JOB_CPU_EXECUTOR) and "io" (LLM calls, scraping). Each queue has its
+    own concurrency limit. With JOB_DB set, jobs are stored in SQLite and
+    unfinished ones are re-queued on start.
+    """
+
+    def __init__(self, cpu_workers: int = JOB_CPU_WORKERS, io_workers: int = JOB_IO_WORKERS,
+                 cpu_executor: str = JOB_CPU_EXECUTOR, db_path: str = JOB_DB,
+                 retention: float = JOB_RETENTION):
+        self._queues = {
+            "cpu": (cpu_workers, cpu_executor == "process"),
+            "io": (io_workers, False),
+        }
+        self.retention = retention
+        self._store = _Store(db_path) if db_path else None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._started = False
+        self.queues = {}
+
+    def start(self, recover: bool = True):
+        """
+        Start workers and (if recover) re-queue persisted jobs. Safe to call
+        more than once; with several server processes only one should recover.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for name, (workers, use_processes) in self._queues.items():
+                q = _WorkQueue(name, workers, use_processes)
+                self.queues[name] = q
+                for i in range(q.workers):
+                    threading.Thread(target=self._worker, args=(q,), name=f"jobs-{name}-{i}", daemon=True).start()
+        if recover and self._store is not None:
+            for job in self._store.unfinished():
+                if job.task in _tasks:
+                    job.status = QUEUED
+                    self._enqueue(job)
+
+    def _after_fork(self):
+        # worker threads don't survive fork; start fresh ones on next use
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._jobs = {}
+        self._started = False
+        self.queues = {}
+        if self._store is not None:
+            self._store._lock = threading.Lock()
+
+    def _enqueue(self, job: Job):
+        with self._lock:
+            self._jobs[job.id] = job
+        if self._store is not None:
+            self._store.save(job)
+        self.queues[job.queue].pending.put(job.id)
+
+    def submit(self, task_name: str, **args) -> Job:
+        if task_name not in _tasks:
+            raise KeyError(f"unknown task {task_name}")
+        self.start(recover=False)
+        job = Job(task_name, _tasks[task_name][1], args)
+        self._enqueue(job)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            job = self._store.load(job_id)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that hasn't started yet."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return False
+            job.status = CANCELLED
+            job.finished = time.time()
+            self._cond.notify_all()
+        if self._store is not None:
+            self._store.save(job)
+        return True
+
+    def wait(self, job_id: str, timeout: float = None):
+        """Block until the job leaves its current status (or timeout); returns the job."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return self._wait_stored(job_id, deadline) if self._store is not None else None
+            status = job.status
+            while job.status == status and job.status not in FINISHED:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(timeout=remaining)
+            return job
+
+    def _wait_stored(self, job_id: str, deadline: float = None):
+        # a job run by another process (or before a restart) only changes in SQLite, so poll it
+        job = self._store.load(job_id)
+        if job is None:
+            return None
+        status = job.status
+        while job.status == status and job.status not in FINISHED:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            time.sleep(STORE_POLL_INTERVAL if remaining is None else min(STORE_POLL_INTERVAL, remaining))
+            job = self._store.load(job_id) or job
+        return job
+
+    def _set(self, job: Job, **fields):
+        with self._lock:
+            for k, v in fields.items():
+                setattr(job, k, v)
+            self._cond.notify_all()
+        if self._store is not None:
+            self._store.save(job)
+
+    def _worker(self, q: _WorkQueue):
+        while True:
+            job_id = q.pending.get()
+            job = self.get(job_id)
+            if job is None or job.status != QUEUED:
+                continue
+            fn, _ = _tasks[job.task]
+            with self._lock:
+                q.running += 1
+            self._set(job, status=RUNNING, started=time.time())
+            try:
+                result = q.call(fn, job.args)
+                if isinstance(result, dict) and _NEXT in result:
+                    next_task = result[_NEXT]
+                    next_queue = _tasks[next_task][1]
+                    self._set(job, task=next_task, queue=next_queue, args=result["args"], status=QUEUED)
+                    self.queues[next_queue].pending.put(job.id)
+                else:
+                    self._set(job, status=DONE, result=result, finished=time.time())
+                ok = True
+            except Exception as e:
+                self._set(job, status=FAILED, error=str(e), finished=time.time())
+                ok = False
+            with self._lock:
+                q.running -= 1
+                if ok:
+                    q.completed += 1
+                else:
+                    q.failed += 1
+            self._prune()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            old = [j.id for j in self._jobs.values() if j.finished and j.finished < cutoff]
+            for job_id in old:
+                del self._jobs[job_id]
+        if old and self._store is not None:
+            self._store.prune(cutoff)
+
+    def stats(self) -> dict:
+        return {name: q.stats() for name, q in self.queues.items()}
+
+
+jobs = JobQueue()
+os.register_at_fork(after_in_child=jobs._after_fork)
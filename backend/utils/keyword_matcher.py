@@ -1,5 +1,134 @@
 import re
 from collections import Counter
+from functools import lru_cache
+
+STOP = frozenset([
+    "and","the","with","for","in","is","a","an","to","of","on","by","as","at",
+    "we","you","your","are","be","will","have","has","our"
+])
+
+# tokens keep +, #, . and - so c++, c#, node.js and ci-cd survive
+_TOKEN_RE = re.compile(r"[a-z0-9+#][a-z0-9+#.\-]*")
+
+# surface form -> canonical form; both sides may be multi-word phrases
+ALIASES = {
+    "k8s": "kubernetes",
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "golang": "go",
+    "postgres": "postgresql",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "gcp": "google cloud",
+    "ci/cd": "ci-cd",
+    "cicd": "ci-cd",
+    "sklearn": "scikit-learn",
+}
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens with sentence punctuation stripped from the ends."""
+    tokens = []
+    for t in _TOKEN_RE.findall(text.lower()):
+        t = t.rstrip(".-")
+        if t:
+            tokens.append(t)
+    return tokens
+
+
+def _phrase(text: str) -> tuple:
+    return tuple(tokenize(text))
+
+
+@lru_cache(maxsize=8)
+def _alias_table(items: tuple) -> tuple:
+    table = {}
+    for surface, canonical in items:
+        s, c = _phrase(surface), _phrase(canonical)
+        if s and c:
+            table[s] = c
+    longest = max((len(s) for s in table), default=1)
+    return table, longest
+
+
+class ResumeIndex:
+    """
+    A document tokenized once into the set of its n-grams (n <= max_n), with
+    aliases folded to their canonical phrase. Membership tests against it are
+    O(1) per keyword and respect token boundaries, so "java" does not match
+    "javascript" and "go" does not match "google".
+    """
+
+    def __init__(self, text: str, max_n: int = 3, aliases: dict = ALIASES):
+        table, longest = _alias_table(tuple(sorted(aliases.items())))
+        self.max_n = max_n
+        tokens = tokenize(text)
+        grams = set()
+        span = max(max_n, longest)
+        for i in range(len(tokens)):
+            for n in range(1, span + 1):
+                if i + n > len(tokens):
+                    break
+                g = tuple(tokens[i:i + n])
+                if n <= max_n:
+                    grams.add(g)
+                canonical = table.get(g)
+                if canonical is not None:
+                    grams.add(canonical)
+        self.grams = grams
+        self.n_tokens = len(tokens)
+
+    def __contains__(self, phrase: tuple) -> bool:
+        return phrase in self.grams
+
+
+class KeywordMatcher:
+    """
+    A JD's keywords compiled once (canonicalized token tuples). Matching a
+    resume is a single pass to build its ResumeIndex plus one set lookup per
+    keyword, and the same matcher can score any number of resumes.
+    """
+
+    def __init__(self, keywords: list, aliases: dict = ALIASES):
+        table, _ = _alias_table(tuple(sorted(aliases.items())))
+        self.aliases = aliases
+        self.keywords = list(keywords)
+        self._compiled = []
+        for kw in self.keywords:
+            p = _phrase(kw)
+            self._compiled.append((kw, table.get(p, p)))
+        self.max_n = max((len(p) for _, p in self._compiled), default=1)
+
+    def index(self, resume_text: str) -> ResumeIndex:
+        return ResumeIndex(resume_text, max_n=self.max_n, aliases=self.aliases)
+
+    def match(self, resume) -> tuple:
+        """Return (found, missing) keyword lists; `resume` is text or a ResumeIndex."""
+        idx = resume if isinstance(resume, ResumeIndex) else self.index(resume)
+        found, missing = [], []
+        for kw, phrase in self._compiled:
+            (found if phrase and phrase in idx else missing).append(kw)
+        return found, missing
+
+    def score(self, resume) -> dict:
+        found, missing = self.match(resume)
+        total = len(self.keywords)
+        return {
+            "coverage": round(len(found) / total, 4) if total else 0.0,
+            "found": found,
+            "missing": missing,
+        }
+
+    def score_many(self, resumes: list) -> list:
+        """Score many resumes against this JD."""
+        return [self.score(r) for r in resumes]
+
 
 def extract_keywords_from_jd(jd_text: str, top_n: int = 40):
     """
@@ -7,21 +136,31 @@ def extract_keywords_from_jd(jd_text: str, top_n: int = 40):
     return most common terms.
     For production use: spaCy / RAKE / YAKE or an LLM-based extraction.
     """
-    STOP = set([
-        "and","the","with","for","in","is","a","an","to","of","on","by","as","at",
-        "we","you","your","are","be","will","have","has","our"
-    ])
-    words = re.findall(r"[A-Za-z+#\.\-0-9]+", jd_text.lower())
-    words = [w for w in words if len(w) > 2 and w not in STOP]
+    words = [w for w in tokenize(jd_text) if len(w) > 2 and w not in STOP]
     freq = Counter(words)
     keywords = [w for w, _ in freq.most_common(top_n)]
     return keywords
 
+
+@lru_cache(maxsize=256)
+def compile_jd(jd_text: str, top_n: int = 40) -> KeywordMatcher:
+    """Extract and compile a JD's keywords, memoized per JD text."""
+    return KeywordMatcher(extract_keywords_from_jd(jd_text, top_n))
+
+
 def find_missing_keywords(resume_text: str, keywords: list):
-    found = set()
-    rt = resume_text.lower()
-    for kw in keywords:
-        if kw.lower() in rt:
-            found.add(kw)
-    missing = [k for k in keywords if k not in found]
+    _, missing = KeywordMatcher(keywords).match(resume_text)
     return missing
+
+
+def score_resumes_against_jd(resume_texts: list, jd_text: str, top_n: int = 40) -> list:
+    """Many resumes vs one JD: the JD is compiled once."""
+    return compile_jd(jd_text, top_n).score_many(resume_texts)
+
+
+def score_resume_against_jds(resume_text: str, jd_texts: list, top_n: int = 40) -> list:
+    """One resume vs many JDs: the resume is tokenized and indexed once."""
+    matchers = [compile_jd(jd, top_n) for jd in jd_texts]
+    max_n = max((m.max_n for m in matchers), default=1)
+    idx = ResumeIndex(resume_text, max_n=max_n)
+    return [m.score(idx) for m in matchers]
@@ -1,29 +1,146 @@
+import hashlib
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
 import pdfplumber
 import docx
+from PyPDF2 import PdfReader
 from typing import Optional
 
-def extract_text_from_pdf(path: str) -> str:
-    text_pages = []
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            t = page.extract_text()
-            if t:
-                text_pages.append(t)
-    return "\n".join(text_pages)
+from config.settings import (
+    RESUME_MAX_PAGES,
+    RESUME_MAX_BYTES,
+    PARSE_PARALLEL_MIN_PAGES,
+    PARSE_WORKERS,
+    PARSE_CACHE_SIZE,
+    PARSE_CACHE_DISK,
+    PARSE_CACHE_DIR,
+)
+from utils.cache import TieredCache
+from utils.metrics import span
+
+PARSER_VERSION = "2"  # bump when extraction output changes, invalidates the cache
+
+
+class ResumeTooLargeError(ValueError):
+    """Raised when a resume exceeds RESUME_MAX_BYTES or RESUME_MAX_PAGES."""
+
+
+_cache = TieredCache(PARSE_CACHE_SIZE, disk_dir=PARSE_CACHE_DIR if PARSE_CACHE_DISK else None)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a threaded Flask worker is not safe
+                ctx = multiprocessing.get_context("spawn")
+                _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=ctx)
+    return _pool
+
+
+def _extract_pages(path: str, start: int, end: int) -> list:
+    """
+    Extract pages [start, end) with PyPDF2's text extractor, falling back to
+    pdfplumber's layout analysis only for pages that come back empty
+    (e.g. unusual encodings). Runs in worker processes for large files.
+    """
+    reader = PdfReader(path)
+    texts = []
+    for i in range(start, end):
+        try:
+            texts.append(reader.pages[i].extract_text() or "")
+        except Exception:
+            texts.append("")
+    empty = [i for i, t in zip(range(start, end), texts) if not t.strip()]
+    if empty:
+        with pdfplumber.open(path) as pdf:
+            for i in empty:
+                texts[i - start] = pdf.pages[i].extract_text() or ""
+    return texts
+
+
+def extract_text_from_pdf(path: str, parallel: bool = True) -> str:
+    n_pages = len(PdfReader(path).pages)
+    if n_pages > RESUME_MAX_PAGES:
+        raise ResumeTooLargeError(f"resume has {n_pages} pages, limit is {RESUME_MAX_PAGES}")
+    if not parallel or n_pages < PARSE_PARALLEL_MIN_PAGES or PARSE_WORKERS <= 1:
+        text_pages = _extract_pages(path, 0, n_pages)
+    else:
+        step = -(-n_pages // PARSE_WORKERS)
+        ranges = [(s, min(s + step, n_pages)) for s in range(0, n_pages, step)]
+        pool = _get_pool()
+        futures = [pool.submit(_extract_pages, path, s, e) for s, e in ranges]
+        text_pages = [t for f in futures for t in f.result()]
+    return "\n".join(t for t in text_pages if t)
+
 
 def extract_text_from_docx(path: str) -> str:
     doc = docx.Document(path)
     paragraphs = [p.text for p in doc.paragraphs if p.text and not p.text.isspace()]
     return "\n".join(paragraphs)
 
-def extract_text_from_file(path: str) -> str:
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _extract_uncached(path: str, parallel: bool = True) -> str:
     lower = path.lower()
     if lower.endswith(".pdf"):
-        return extract_text_from_pdf(path)
+        return extract_text_from_pdf(path, parallel)
     elif lower.endswith(".docx") or lower.endswith(".doc"):
         return extract_text_from_docx(path)
     else:
         # plain text fallback
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
             return f.read()
+
+
+def _cache_key(path: str, digest: str) -> str:
+    return f"{digest}{os.path.splitext(path)[1].lower()}.v{PARSER_VERSION}"
+
+
+def extract_text_from_file(path: str, digest: Optional[str] = None, parallel: bool = True) -> str:
+    """
+    Extract resume text, reusing earlier results for identical file content.
+    Pass `digest` (sha256 of the file) if it is already known. parallel=False
+    parses in the calling process only, for callers that are already pool
+    workers themselves (bulk screening).
+    """
+    size = os.path.getsize(path)
+    if size > RESUME_MAX_BYTES:
+        raise ResumeTooLargeError(f"resume is {size} bytes, limit is {RESUME_MAX_BYTES}")
+    if digest is None:
+        with span("parse_hash"):
+            digest = file_digest(path)
+    key = _cache_key(path, digest)
+    text = _cache.get(key)
+    if text is None:
+        with span("parse_" + (os.path.splitext(path)[1].lower().lstrip(".") or "text")):
+            text = _extract_uncached(path, parallel)
+        _cache.put(key, text)
+    return text
+
+
+def cached_text(path: str, digest: str) -> Optional[str]:
+    """Previously extracted text for this content, or None."""
+    return _cache.get(_cache_key(path, digest))
+
+
+def cache_text(path: str, digest: str, text: str):
+    """Record text extracted elsewhere (e.g. in a worker process) in this process's cache."""
+    _cache.put(_cache_key(path, digest), text)
+
+
+def parse_cache_stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,170 @@
+import logging
+import re
+
+from config.settings import PROMPT_CHARS_PER_TOKEN
+from utils.keyword_matcher import compile_jd
+from utils.metrics import registry
+
+log = logging.getLogger(__name__)
+
+prompt_tokens = registry.counter(
+    "prompt_tokens_total", "Estimated prompt tokens sent to the LLM, before and after compaction.",
+    ("route", "stage"))
+
+HEADINGS = frozenset([
+    "summary", "professional summary", "profile", "objective", "experience", "work experience",
+    "professional experience", "employment", "employment history", "education", "skills",
+    "technical skills", "core skills", "projects", "certifications", "awards", "achievements",
+    "publications", "languages", "interests", "volunteer", "volunteering", "references",
+])
+
+_SPACES_RE = re.compile(r"[ \t\u00a0\u200b\f\v]+")
+# "Page 2", "Page 2 of 5", "- 2 -", "2 / 5", a bare number: PDF page furniture
+_PAGE_RE = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|-?\s*\d+\s*-?|\d+\s*/\s*\d+)$", re.I)
+# lines shorter than this (in words) can legitimately repeat, e.g. a job title or "Python"
+_DEDUPE_MIN_WORDS = 4
+# a section truncated to less than this isn't worth including
+_MIN_PART_TOKENS = 40
+_ELLIPSIS = "\n[...]\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (characters / PROMPT_CHARS_PER_TOKEN); no tokenizer needed."""
+    return -(-len(text or "") // PROMPT_CHARS_PER_TOKEN)
+
+
+def clean_text(text: str) -> str:
+    """
+    Normalize extracted text: collapse runs of spaces, drop page-number lines,
+    drop repeats of longer lines (running headers/footers, doubled text
+    layers) and squeeze blank lines.
+    """
+    lines, seen, blank = [], set(), False
+    for raw in (text or "").splitlines():
+        line = _SPACES_RE.sub(" ", raw).strip()
+        if not line:
+            blank = bool(lines)
+            continue
+        if _PAGE_RE.match(line):
+            continue
+        if len(line.split()) >= _DEDUPE_MIN_WORDS:
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+        if blank:
+            lines.append("")
+            blank = False
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def truncate(text: str, budget: int, keep_tail: bool = False) -> str:
+    """
+    Cut `text` to about `budget` tokens at a line (or word) boundary. With
+    keep_tail, the start and end are kept and the middle is dropped, which
+    suits prompts whose instructions come last.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    limit = max(0, budget * PROMPT_CHARS_PER_TOKEN - len(_ELLIPSIS))
+    if keep_tail:
+        head, tail = limit // 2, limit - limit // 2
+        return _cut(text, head) + _ELLIPSIS + _cut(text[::-1], tail)[::-1]
+    return _cut(text, limit)
+
+
+def _cut(text: str, limit: int) -> str:
+    cut = text[:limit]
+    for sep in ("\n", " "):
+        at = cut.rfind(sep)
+        if at > limit // 2:
+            return cut[:at].rstrip()
+    return cut
+
+
+def _is_heading(line: str) -> bool:
+    s = line.strip().rstrip(":").strip()
+    if s.lower() in HEADINGS:
+        return True
+    return 0 < len(s.split()) <= 4 and s.isupper()
+
+
+def split_sections(text: str) -> list:
+    """Split cleaned resume text at section headings (or blank lines, if it has none)."""
+    lines = text.split("\n")
+    sections, current = [], []
+    for line in lines:
+        if current and _is_heading(line):
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current).strip())
+    if len(sections) == 1:
+        sections = [s.strip() for s in text.split("\n\n")]
+    return [s for s in sections if s]
+
+
+def fit_resume(resume_text: str, jd: str, budget: int) -> str:
+    """
+    Fit a resume into `budget` tokens: sections are ranked by how many of
+    the JD's keywords they contain (keyword_matcher), the best are kept
+    whole and the first that doesn't fit is truncated. The opening section
+    (name and contact details) is always kept, and kept sections stay in
+    their original order.
+    """
+    return fit_resume_report(resume_text, jd, budget)[0]
+
+
+def fit_resume_report(resume_text: str, jd: str, budget: int):
+    """
+    fit_resume, also returning the sections it left out or shortened as a
+    list of {"section": <first line>, "truncated": bool}, in resume order.
+    """
+    text = clean_text(resume_text)
+    if estimate_tokens(text) <= budget:
+        return text, []
+    sections = split_sections(text)
+    matcher = compile_jd(jd)
+    found = [len(matcher.match(s)[0]) for s in sections]
+    order = [0] + sorted(range(1, len(sections)), key=lambda i: -found[i])
+    kept, left = {}, budget
+    for i in order:
+        cost = estimate_tokens(sections[i]) + 1
+        if cost <= left:
+            kept[i] = sections[i]
+            left -= cost
+        elif left >= _MIN_PART_TOKENS:
+            kept[i] = truncate(sections[i], left - 1)
+            left = 0
+        if left < _MIN_PART_TOKENS:
+            break
+    omitted = [{"section": _section_name(s), "truncated": i in kept}
+               for i, s in enumerate(sections) if kept.get(i) != s]
+    return "\n\n".join(kept[i] for i in sorted(kept)), omitted
+
+
+def _section_name(section: str) -> str:
+    name = section.split("\n", 1)[0].strip().rstrip(":")
+    return name if len(name) <= 60 else _cut(name, 60) + "..."
+
+
+def fit_text(text: str, budget: int, keep_tail: bool = False) -> str:
+    """clean_text, then truncate to `budget` tokens."""
+    return truncate(clean_text(text), budget, keep_tail=keep_tail)
+
+
+def report(route: str, before, after) -> dict:
+    """
+    Record the estimated tokens of a prompt's inputs before and after
+    compaction (strings or sequences of strings) under `route`.
+    """
+    if isinstance(before, str):
+        before, after = [before], [after]
+    counts = {"before": sum(map(estimate_tokens, before)), "after": sum(map(estimate_tokens, after))}
+    prompt_tokens.inc(counts["before"], route=route, stage="before")
+    prompt_tokens.inc(counts["after"], route=route, stage="after")
+    if counts["after"] < counts["before"]:
+        log.debug("%s prompt compacted from ~%d to ~%d tokens", route, counts["before"], counts["after"])
+    return counts
@@ -0,0 +1,432 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single writer only
+    fcntl = None
+
+from config.settings import RELEVANCE_FEATURES, RELEVANCE_DISK, RELEVANCE_DIR, RELEVANCE_MAX_DOCS
+from utils.keyword_matcher import ALIASES, STOP, tokenize
+
+KINDS = ("resume", "jd")
+MAX_SEGMENTS = 16
+MAX_DEAD_RATIO = 0.5  # compact (rewrite the files, on disk) once this share of rows is replaced or evicted
+_FILES = {"data": "data.f32", "indices": "indices.i32", "rows": "rows.i64", "docs": "docs.jsonl"}
+
+# single-token aliases folded to the canonical phrase's tokens ("k8s" -> "kubernetes")
+_ALIAS_TOKENS = {
+    s: tuple(tokenize(c)) for s, c in ALIASES.items() if len(tokenize(s)) == 1 and tokenize(c)
+}
+
+
+def doc_id(kind: str, text: str, collection: str = None) -> str:
+    """Content-derived id, so re-adding the same text to a collection replaces rather than duplicates."""
+    h = hashlib.sha1(text.encode("utf-8", "ignore"))
+    if collection:
+        h.update(b"\0" + collection.encode("utf-8", "ignore"))
+    return f"{kind}:{h.hexdigest()[:20]}"
+
+
+def features(text: str, n_features: int = RELEVANCE_FEATURES) -> tuple:
+    """
+    Hashed unigram + bigram term frequencies: (sorted feature ids int32,
+    sublinear tf float32). Hashing keeps the feature space fixed, so new
+    documents never require re-vectorizing the corpus.
+    """
+    tokens = []
+    for t in tokenize(text):
+        if len(t) > 1 and t not in STOP:
+            tokens.extend(_ALIAS_TOKENS.get(t, (t,)))
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    mask = n_features - 1
+    counts = Counter(zlib.crc32(t.encode()) & mask for t in terms)
+    idx = np.fromiter(counts.keys(), np.int32, len(counts))
+    tf = 1 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))
+    order = np.argsort(idx)
+    return idx[order], tf[order].astype(np.float32)
+
+
+def _stack(rows: list, n_features: int) -> tuple:
+    """[(idx, tf)] -> CSR arrays (data, indices, indptr)."""
+    indptr = np.zeros(len(rows) + 1, np.int64)
+    np.cumsum([len(idx) for idx, _ in rows], out=indptr[1:])
+    if rows:
+        indices = np.concatenate([idx for idx, _ in rows]).astype(np.int32)
+        data = np.concatenate([tf for _, tf in rows]).astype(np.float32)
+    else:
+        indices, data = np.zeros(0, np.int32), np.zeros(0, np.float32)
+    return data, indices, indptr
+
+
+class _Segment:
+    """A block of rows: raw tf matrix, its squares (for norms) and row kinds."""
+
+    __slots__ = ("matrix", "sq", "kinds", "start")
+
+    def __init__(self, data, indices, indptr, kinds, start: int, n_features: int):
+        shape = (len(indptr) - 1, n_features)
+        self.matrix = sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+        self.sq = sparse.csr_matrix((np.square(data), indices, indptr), shape=shape, copy=False)
+        self.kinds = np.asarray(kinds, np.int8)
+        self.start = start
+
+    @property
+    def n_rows(self) -> int:
+        return self.matrix.shape[0]
+
+
+class RelevanceIndex:
+    """
+    TF-IDF similarity over resumes and JDs, scored with sparse matrix
+    products: the corpus is a stack of CSR segments of raw term
+    frequencies, IDF comes from document frequencies kept up to date on
+    every add, and cosine similarity against a query is one mat-vec per
+    segment (plus a cached one for document norms).
+
+    Documents belong to a collection (e.g. one screening job) and top_k
+    only returns documents of the collection it is asked about; IDF is
+    computed over the whole corpus.
+
+    Adding documents appends a segment; nothing is re-vectorized. Re-adding
+    an id replaces its earlier row, and past `max_docs` the oldest documents
+    are evicted. Replaced and evicted rows are dropped when segments are
+    compacted. With `path`, rows are appended to flat files there and
+    memory-mapped back, so an index survives restarts and several processes
+    can share one directory; the files are rewritten without dead rows once
+    MAX_DEAD_RATIO of them are dead.
+    """
+
+    def __init__(self, path: str = None, n_features: int = RELEVANCE_FEATURES, max_docs: int = RELEVANCE_MAX_DOCS):
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.path = path
+        self.n_features = n_features
+        self.max_docs = max_docs
+        self._lock = threading.RLock()
+        self._reset()
+        if path:
+            os.makedirs(path, exist_ok=True)
+            with self._lock:
+                self._sync()
+
+    def _reset(self, gen: int = 0):
+        self.ids = []  # row -> doc id
+        self.labels = {}  # doc id -> display name (file name, job title), if one was given
+        self._rows = {}  # doc id -> latest row
+        self._alive = np.zeros(0, bool)
+        self._colls = np.zeros(0, np.int32)  # row -> collection code
+        self._coll_names = []  # code -> collection name ("" for none)
+        self._coll_codes = {}
+        self._segments = []
+        self.df = np.zeros(self.n_features, np.int64)
+        self._norms = None
+        self._gen = gen  # generation of the files the rows were read from
+        self._offsets = {"data": 0, "indices": 0, "rows": 0, "docs": 0}
+
+    # ---- building ----
+
+    def _file(self, name: str, gen: int = None) -> str:
+        gen = self._gen if gen is None else gen
+        if gen:
+            # data.f32 -> data.3.f32 for the files written by the third rewrite
+            root, ext = os.path.splitext(_FILES[name])
+            return os.path.join(self.path, f"{root}.{gen}{ext}")
+        return os.path.join(self.path, _FILES[name])
+
+    def _read_gen(self) -> int:
+        try:
+            with open(os.path.join(self.path, "generation")) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    @contextlib.contextmanager
+    def _file_lock(self, exclusive: bool):
+        # readers share the lock so a writer never rewrites files under them
+        with open(os.path.join(self.path, ".lock"), "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def _sync(self):
+        with self._file_lock(exclusive=False):
+            self._refresh()
+
+    def _dead_ratio(self) -> float:
+        return 1 - self._alive.sum() / len(self._alive) if len(self._alive) else 0.0
+
+    def _kill(self, row: int):
+        self._alive[row] = False
+        self.df[self._row_indices(row)] -= 1
+
+    def _row_indices(self, row: int):
+        for seg in reversed(self._segments):
+            if row >= seg.start:
+                m = seg.matrix
+                r = row - seg.start
+                return m.indices[m.indptr[r]:m.indptr[r + 1]]
+
+    def _coll_code(self, name: str) -> int:
+        name = name or ""
+        code = self._coll_codes.get(name)
+        if code is None:
+            code = self._coll_codes[name] = len(self._coll_names)
+            self._coll_names.append(name)
+        return code
+
+    def _ingest(self, data, indices, indptr, kinds, colls, ids, labels):
+        start = len(self.ids)
+        seg = _Segment(data, indices, indptr, kinds, start, self.n_features)
+        self._segments.append(seg)
+        self._alive = np.concatenate([self._alive, np.ones(seg.n_rows, bool)])
+        self._colls = np.concatenate([self._colls, np.fromiter((self._coll_code(c) for c in colls), np.int32,
+                                                               len(colls))])
+        self.ids.extend(ids)
+        self.df += np.bincount(indices, minlength=self.n_features)
+        for offset, did in enumerate(ids):
+            old = self._rows.get(did)
+            if old is not None and self._alive[old]:
+                self._kill(old)
+            self._rows[did] = start + offset
+            if labels[offset]:
+                self.labels[did] = labels[offset]
+        # evict the oldest documents past max_docs; rows are in insertion order, so this is
+        # the same choice in every process reading the same files
+        excess = int(self._alive.sum()) - self.max_docs
+        if excess > 0:
+            for row in np.flatnonzero(self._alive)[:excess]:
+                self._kill(row)
+        self._norms = None
+        if self.path:
+            if len(self._segments) > MAX_SEGMENTS:
+                self._merge_tail()
+        elif len(self._segments) > MAX_SEGMENTS or self._dead_ratio() > MAX_DEAD_RATIO:
+            self._compact()
+
+    def _live_rows(self) -> tuple:
+        """(rows, merged CSR matrix of those rows, their kinds) for the live rows, in row order."""
+        live = np.flatnonzero(self._alive)
+        merged = sparse.vstack([s.matrix for s in self._segments], format="csr")[live]
+        return live, merged, self._kinds()[live]
+
+    def _compact(self):
+        # one segment holding only the live rows, renumbered in their original order
+        live, merged, kinds = self._live_rows()
+        self.ids = [self.ids[r] for r in live]
+        self._rows = {did: row for row, did in enumerate(self.ids)}
+        self.labels = {did: self.labels[did] for did in self.ids if did in self.labels}
+        self._alive = np.ones(len(live), bool)
+        used, colls = np.unique(self._colls[live], return_inverse=True)
+        self._colls = colls.astype(np.int32)
+        self._coll_names = [self._coll_names[c] for c in used]
+        self._coll_codes = {name: code for code, name in enumerate(self._coll_names)}
+        self._segments = [_Segment(merged.data, merged.indices.astype(np.int32), merged.indptr,
+                                   kinds, 0, self.n_features)]
+        self._norms = None
+
+    def _merge_tail(self):
+        # on disk, row numbers follow the files until the next rewrite: merge everything
+        # after the first (memory-mapped) segment, keeping dead rows in place
+        base, tail = self._segments[0], self._segments[1:]
+        merged = sparse.vstack([s.matrix for s in tail], format="csr")
+        kinds = np.concatenate([s.kinds for s in tail])
+        self._segments = [base, _Segment(merged.data, merged.indices.astype(np.int32), merged.indptr,
+                                         kinds, tail[0].start, self.n_features)]
+
+    def _refresh(self):
+        """
+        Map rows that were appended to the files (by us or another process)
+        since the last look; after a rewrite, start over from the new files.
+        Called with the file lock held.
+        """
+        gen = self._read_gen()
+        if gen != self._gen:
+            self._reset(gen)
+        try:
+            with open(self._file("docs"), "rb") as f:
+                f.seek(self._offsets["docs"])
+                chunk = f.read()
+        except FileNotFoundError:
+            return
+        end = chunk.rfind(b"\n") + 1  # ignore a partly written last line
+        if not end:
+            return
+        docs = [json.loads(line) for line in chunk[:end].splitlines()]
+        n = len(docs)
+        nnz = np.memmap(self._file("rows"), np.int64, "r", offset=self._offsets["rows"], shape=(n,))
+        indptr = np.zeros(n + 1, np.int64)
+        np.cumsum(nnz, out=indptr[1:])
+        total = int(indptr[-1])
+        if total:
+            data = np.memmap(self._file("data"), np.float32, "r", offset=self._offsets["data"], shape=(total,))
+            indices = np.memmap(self._file("indices"), np.int32, "r", offset=self._offsets["indices"], shape=(total,))
+        else:
+            data, indices = np.zeros(0, np.float32), np.zeros(0, np.int32)
+        self._ingest(data, indices, indptr, [KINDS.index(d["kind"]) for d in docs],
+                     [d.get("collection") for d in docs], [d["id"] for d in docs], [d.get("label") for d in docs])
+        self._offsets["docs"] += end
+        self._offsets["rows"] += n * 8
+        self._offsets["data"] += total * 4
+        self._offsets["indices"] += total * 4
+
+    @staticmethod
+    def _doc_line(did: str, kind: int, collection: str, label: str) -> str:
+        doc = {"id": did, "kind": KINDS[kind], "label": label}
+        if collection:
+            doc["collection"] = collection
+        return json.dumps(doc) + "\n"
+
+    def _append_files(self, data, indices, indptr, kinds, colls, ids, labels):
+        with self._file_lock(exclusive=True):
+            self._refresh()
+            for name, arr in (("data", data), ("indices", indices), ("rows", np.diff(indptr))):
+                with open(self._file(name), "ab") as f:
+                    # drop bytes a crashed writer left past the last committed row
+                    f.truncate(self._offsets[name])
+                    f.write(np.ascontiguousarray(arr).tobytes())
+            # the docs line is written last and marks the rows as committed
+            with open(self._file("docs"), "ab") as f:
+                f.truncate(self._offsets["docs"])
+                f.write("".join(map(self._doc_line, ids, kinds, colls, labels)).encode())
+            self._refresh()
+            if self._dead_ratio() > MAX_DEAD_RATIO:
+                self._rewrite_files()
+
+    def _rewrite_files(self):
+        """
+        Write the live rows to a new generation of files and switch to it.
+        Called with the exclusive file lock held, so no process is reading.
+        """
+        live, merged, kinds = self._live_rows()
+        gen = self._gen + 1
+        for name, arr in (("data", merged.data.astype(np.float32)), ("indices", merged.indices.astype(np.int32)),
+                          ("rows", np.diff(merged.indptr).astype(np.int64))):
+            with open(self._file(name, gen), "wb") as f:
+                f.write(np.ascontiguousarray(arr).tobytes())
+        with open(self._file("docs", gen), "wb") as f:
+            f.write("".join(self._doc_line(self.ids[r], k, self._coll_names[self._colls[r]],
+                                           self.labels.get(self.ids[r])) for r, k in zip(live, kinds)).encode())
+        tmp = os.path.join(self.path, "generation.tmp")
+        with open(tmp, "w") as f:
+            f.write(str(gen))
+        os.replace(tmp, os.path.join(self.path, "generation"))
+        # mapped files stay readable after unlinking, so segments still in use are unaffected
+        keep = {os.path.basename(self._file(name, gen)) for name in _FILES}
+        for fn in os.listdir(self.path):
+            if fn.split(".", 1)[0] in ("data", "indices", "rows", "docs") and fn not in keep:
+                os.remove(os.path.join(self.path, fn))
+        self._refresh()
+
+    def add_many(self, docs: list, collection: str = None):
+        """Add [(doc_id, text, kind)] or [(doc_id, text, kind, label)] with kind in KINDS to `collection`."""
+        if not docs:
+            return
+        rows = [features(d[1], self.n_features) for d in docs]
+        kinds = [KINDS.index(d[2]) for d in docs]
+        colls = [collection] * len(docs)
+        ids = [d[0] for d in docs]
+        labels = [d[3] if len(d) > 3 else None for d in docs]
+        data, indices, indptr = _stack(rows, self.n_features)
+        with self._lock:
+            if self.path:
+                self._append_files(data, indices, indptr, kinds, colls, ids, labels)
+            else:
+                self._ingest(data, indices, indptr, kinds, colls, ids, labels)
+
+    def add(self, doc_id: str, text: str, kind: str, label: str = None, collection: str = None):
+        self.add_many([(doc_id, text, kind, label)], collection=collection)
+
+    # ---- scoring ----
+
+    def _idf(self) -> np.ndarray:
+        n = int(self._alive.sum())
+        return (np.log((1 + n) / (1 + self.df)) + 1).astype(np.float32)
+
+    def _kinds(self) -> np.ndarray:
+        return np.concatenate([s.kinds for s in self._segments] or [np.zeros(0, np.int8)])
+
+    def _query(self, text: str, idf: np.ndarray) -> tuple:
+        """Dense tf-idf vector for `text` and its L2 norm."""
+        idx, tf = features(text, self.n_features)
+        q = np.zeros(self.n_features, np.float32)
+        q[idx] = tf * idf[idx]
+        return q, float(np.linalg.norm(q[idx]))
+
+    def _scores(self, text: str, kind: str = None, collection: str = None) -> np.ndarray:
+        """Cosine similarity of `text` to every row (dead, other-kind or other-collection rows get -1)."""
+        idf = self._idf()
+        if self._norms is None:
+            idf2 = np.square(idf)
+            self._norms = np.sqrt(np.concatenate([s.sq @ idf2 for s in self._segments] or [np.zeros(0)]))
+        q, qnorm = self._query(text, idf)
+        q *= idf  # rows hold raw tf, so the idf weight for both sides goes on the query
+        dots = np.concatenate([s.matrix @ q for s in self._segments] or [np.zeros(0)])
+        denom = self._norms * qnorm
+        scores = np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+        keep = self._alive
+        if kind is not None:
+            keep = keep & (self._kinds() == KINDS.index(kind))
+        keep = keep & (self._colls == self._coll_codes.get(collection or "", -1))
+        scores[~keep] = -1
+        return scores
+
+    def top_k(self, text: str, k: int = 10, kind: str = "resume", collection: str = None) -> list:
+        """The k documents of `kind` in `collection` most similar to `text`: [{id, label, score}]."""
+        with self._lock:
+            if self.path:
+                self._sync()
+            if not self.ids:
+                return []
+            scores = self._scores(text, kind, collection)
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+            return [{"id": self.ids[r], "label": self.labels.get(self.ids[r]), "score": round(float(scores[r]), 4)}
+                    for r in top if scores[r] > 0]
+
+    def similarity(self, query: str, texts: list) -> list:
+        """Cosine similarity of `query` to each of `texts` (not indexed) under the corpus IDF."""
+        with self._lock:
+            if self.path:
+                self._sync()
+            idf = self._idf()
+        q, qnorm = self._query(query, idf)
+        data, indices, indptr = _stack([features(t, self.n_features) for t in texts], self.n_features)
+        m = sparse.csr_matrix((data * idf[indices], indices, indptr), shape=(len(texts), self.n_features))
+        norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+        dots = m @ q
+        denom = norms * qnorm
+        return [round(float(s), 4) for s in np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": int(self._alive.sum()),
+                "resumes": int((self._alive & (self._kinds() == KINDS.index("resume"))).sum()),
+                "rows": len(self.ids),
+                "segments": len(self._segments),
+                "nnz": int(sum(s.matrix.nnz for s in self._segments)),
+                "persistent": bool(self.path),
+            }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> RelevanceIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = RelevanceIndex(RELEVANCE_DIR if RELEVANCE_DISK else None)
+    return _index
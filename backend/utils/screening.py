@@ -0,0 +1,212 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config.settings import SCREEN_WORKERS, SCREEN_MAX_JOBS
+from utils.keyword_matcher import compile_jd
+from utils.relevance import get_index, doc_id
+from utils.pdf_parser import extract_text_from_file, cached_text, cache_text
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = "queued", "running", "done", "cancelled", "failed"
+FINISHED = (DONE, CANCELLED, FAILED)
+
+
+class ScreeningJob:
+    """
+    One batch of resumes ranked against a JD. `results` grows as files are
+    scored; readers wait on `cond` for new entries.
+    """
+
+    def __init__(self, jd: str, files: list, top_k: int = 0, rewrite=None, release=None, job_id: str = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.jd = jd
+        self.files = files  # [(display name, path, sha256 digest or None)]
+        self.release = release  # callable(digest, keep=False), called for each file when the job finishes
+        self.top_k = top_k
+        self.rewrite = rewrite  # callable(resume_text) -> str, for the top_k resumes
+        self.status = QUEUED
+        self.error = None
+        self.results = []
+        self.rewrites = {}  # result index -> rewritten text; file names can repeat within a batch
+        self.created = time.time()
+        self.finished = None
+        self.cond = threading.Condition()
+        self._cancel = threading.Event()
+
+    @property
+    def collection(self) -> str:
+        """Relevance index collection holding this job's JD and resumes."""
+        return "job:" + self.id
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        with self.cond:
+            self.cond.notify_all()
+
+    def _add(self, result: dict):
+        with self.cond:
+            self.results.append(result)
+            self.cond.notify_all()
+
+    def _finish(self, status: str, error: str = None):
+        with self.cond:
+            self.status = status
+            self.error = error
+            self.finished = time.time()
+            self.cond.notify_all()
+
+    def ranked(self) -> list:
+        # keyword coverage first; TF-IDF relevance breaks ties between equally covered resumes
+        return sorted(self.results, key=lambda r: (-1, 0) if r.get("coverage") is None
+                      else (r["coverage"], r.get("relevance", 0)), reverse=True)
+
+    def progress(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": len(self.files),
+            "processed": len(self.results),
+            "error": self.error,
+        }
+
+    def iter_results(self, timeout: float = 30.0):
+        """Yield results as they are produced until the job finishes."""
+        i = 0
+        while True:
+            with self.cond:
+                while i >= len(self.results) and self.status not in FINISHED:
+                    if not self.cond.wait(timeout=timeout):
+                        break
+                new = self.results[i:]
+                finished = self.status in FINISHED
+            for r in new:
+                yield r
+            i += len(new)
+            if finished and i >= len(self.results):
+                return
+
+
+def _score_file(matcher, index: int, name: str, text: str, relevance: float) -> dict:
+    score = matcher.score(text)
+    return {
+        "index": index,
+        "file": name,
+        "coverage": score["coverage"],
+        "relevance": relevance,
+        "matched": len(score["found"]),
+        "missing": score["missing"],
+    }
+
+
+class ScreeningManager:
+    """
+    Runs screening jobs on background threads. Parsing fans out over a
+    process pool; keyword scoring is local and needs no LLM. Only the top_k
+    resumes are optionally passed to the rewrite callable at the end.
+    """
+
+    def __init__(self, workers: int = SCREEN_WORKERS, max_jobs: int = SCREEN_MAX_JOBS):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                ctx = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+            return self._pool
+
+    def _evict(self):
+        finished = sorted(
+            (j for j in self._jobs.values() if j.status in FINISHED), key=lambda j: j.created
+        )
+        while len(self._jobs) > self.max_jobs and finished:
+            self._jobs.pop(finished.pop(0).id, None)
+
+    def submit(self, job: ScreeningJob) -> ScreeningJob:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        threading.Thread(target=self._run, args=(job,), name=f"screen-{job.id[:8]}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: ScreeningJob):
+        job.status = RUNNING
+        try:
+            matcher = compile_jd(job.jd)
+            index = get_index()
+            index.add(doc_id("jd", job.jd, job.collection), job.jd, "jd", collection=job.collection)
+            texts = {}
+            todo = []
+            for i, (name, path, digest) in enumerate(job.files):
+                # resumes this process has parsed before don't need a worker
+                text = cached_text(path, digest) if digest else None
+                if text is None:
+                    todo.append(i)
+                    continue
+                texts[i] = text
+                job._add(_score_file(matcher, i, name, text, index.similarity(job.jd, [text])[0]))
+            # the workers parse serially: they are the pool, a nested PARSE_WORKERS pool each would oversubscribe
+            futures = {}
+            if todo:
+                pool = self._get_pool()
+                futures = {
+                    pool.submit(extract_text_from_file, job.files[i][1], job.files[i][2], parallel=False): i
+                    for i in todo
+                }
+            for fut in as_completed(futures):
+                if job.cancelled:
+                    for f in futures:
+                        f.cancel()
+                    job._finish(CANCELLED)
+                    return
+                i = futures[fut]
+                name, path, digest = job.files[i]
+                try:
+                    text = fut.result()
+                except Exception as e:
+                    job._add({"index": i, "file": name, "coverage": None, "error": str(e)})
+                    continue
+                if digest:
+                    cache_text(path, digest, text)
+                texts[i] = text
+                job._add(_score_file(matcher, i, name, text, index.similarity(job.jd, [text])[0]))
+            # one append for the whole batch, so /api/screening/rank on this job sees these resumes
+            index.add_many([(doc_id("resume", texts[i], job.collection), texts[i], "resume", job.files[i][0])
+                            for i in texts], collection=job.collection)
+
+            if job.top_k and job.rewrite:
+                for r in job.ranked()[: job.top_k]:
+                    if job.cancelled:
+                        job._finish(CANCELLED)
+                        return
+                    if r["index"] not in texts:
+                        continue
+                    try:
+                        job.rewrites[r["index"]] = job.rewrite(texts[r["index"]])
+                    except Exception as e:
+                        job.rewrites[r["index"]] = f"rewrite failed: {e}"
+            job._finish(DONE)
+        except Exception as e:
+            job._finish(FAILED, str(e))
+        finally:
+            if job.release:
+                for _, _, digest in job.files:
+                    if digest:
+                        job.release(digest, keep=False)
+
+
+screening = ScreeningManager()
@@ -0,0 +1,275 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config.settings import SESSION_MAX, SESSION_TTL, SESSION_DB
+
+SCORE_LABELS = {
+    "professionalism": "Professionalism",
+    "preparation": "Preparation",
+    "communication": "Communication",
+    "predicted": "Predicted Score",
+}
+SECTION_LABELS = {
+    "strengths": "Strengths",
+    "improvements": "Areas for Improvement",
+    "summary": "Feedback Summary",
+    "impression": "Overall Impression",
+}
+_SCORE_RE = {k: re.compile(rf"{label}:\s*(\d+)") for k, label in SCORE_LABELS.items()}
+_SECTION_RE = {
+    k: re.compile(rf"{label}:\s*(.*?)(?:\n[A-Z][a-zA-Z ]+:|$)", re.DOTALL)
+    for k, label in SECTION_LABELS.items()
+}
+
+
+def parse_feedback(feedback: str) -> dict:
+    """
+    Parse one Gemini feedback text ("Professionalism: 7", "Strengths: ...")
+    into a compact record. Done once, when the feedback is produced.
+    """
+    record = {"scores": {}}
+    for key, rx in _SCORE_RE.items():
+        m = rx.search(feedback)
+        record["scores"][key] = int(m.group(1)) if m else None
+    for key, rx in _SECTION_RE.items():
+        m = rx.search(feedback)
+        text = m.group(1).strip() if m else ""
+        if key in ("strengths", "improvements"):
+            record[key] = [line.strip() for line in text.split("\n") if line.strip()]
+        else:
+            record[key] = text
+    return record
+
+
+_SCORE = {"type": "integer", "minimum": 1, "maximum": 10}
+_LINES = {"type": "array", "items": {"type": "string"}}
+# structured answer evaluation requested from the model (routes/gemini.py)
+FEEDBACK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "feedback_summary": {"type": "string"},
+        "professionalism": _SCORE,
+        "preparation": _SCORE,
+        "communication": _SCORE,
+        "strengths": _LINES,
+        "areas_for_improvement": _LINES,
+        "overall_impression": {"type": "string"},
+        "predicted_score": _SCORE,
+        "follow_up_question": {"type": "string"},
+    },
+    "required": ["feedback_summary", "professionalism", "preparation", "communication", "strengths",
+                 "areas_for_improvement", "overall_impression", "predicted_score", "follow_up_question"],
+}
+
+
+def feedback_record(evaluation: dict) -> dict:
+    """The parse_feedback record for a validated FEEDBACK_SCHEMA evaluation."""
+    return {
+        "scores": {
+            "professionalism": evaluation["professionalism"],
+            "preparation": evaluation["preparation"],
+            "communication": evaluation["communication"],
+            "predicted": evaluation["predicted_score"],
+        },
+        "strengths": [s.strip() for s in evaluation["strengths"] if s.strip()],
+        "improvements": [s.strip() for s in evaluation["areas_for_improvement"] if s.strip()],
+        "summary": evaluation["feedback_summary"].strip(),
+        "impression": evaluation["overall_impression"].strip(),
+    }
+
+
+def format_feedback(evaluation: dict) -> str:
+    """Render an evaluation in the labeled text format shown to candidates."""
+    lines = [f"Feedback Summary: {evaluation['feedback_summary']}"]
+    for key in ("professionalism", "preparation", "communication"):
+        lines.append(f"{SCORE_LABELS[key]}: {evaluation[key]}")
+    lines.append("Strengths:")
+    lines.extend(f"- {s}" for s in evaluation["strengths"])
+    lines.append("Areas for Improvement:")
+    lines.extend(f"- {s}" for s in evaluation["areas_for_improvement"])
+    lines.append(f"Overall Impression: {evaluation['overall_impression']}")
+    lines.append(f"Predicted Score: {evaluation['predicted_score']}")
+    lines.append(f"Follow-up Technical Question: {evaluation['follow_up_question']}")
+    return "\n".join(lines)
+
+
+class InterviewSession:
+    """
+    Running aggregates for one interview. Each turn's record is folded in
+    as it arrives, so summarizing doesn't re-parse earlier feedback.
+    """
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.created = time.time()
+        self.last_used = self.created
+        self.turns = 0
+        self.answered = 0
+        self.score_sums = {k: 0 for k in SCORE_LABELS}
+        self.score_counts = {k: 0 for k in SCORE_LABELS}
+        self.strengths = []
+        self.improvements = []
+        self.summaries = []
+        self.impressions = []
+
+    def add_turn(self, answer: str, feedback: str) -> dict:
+        return self.add_record(answer, parse_feedback(feedback or ""))
+
+    def add_record(self, answer: str, record: dict) -> dict:
+        self.turns += 1
+        if (answer or "").strip():
+            self.answered += 1
+        for key, score in record["scores"].items():
+            if score is not None:
+                self.score_sums[key] += score
+                self.score_counts[key] += 1
+        self.strengths.extend(record["strengths"])
+        self.improvements.extend(record["improvements"])
+        if record["summary"]:
+            self.summaries.append(record["summary"])
+        if record["impression"]:
+            self.impressions.append(record["impression"])
+        self.last_used = time.time()
+        return record
+
+    def average(self, key: str):
+        n = self.score_counts[key]
+        return round(self.score_sums[key] / n, 1) if n else "N/A"
+
+    def summary(self) -> str:
+        summary = f"Interview Summary for {self.answered} answered question(s):\n\n"
+        summary += f"Average Professionalism: {self.average('professionalism')}\n"
+        summary += f"Average Preparation: {self.average('preparation')}\n"
+        summary += f"Average Communication: {self.average('communication')}\n"
+        summary += f"Average Predicted Score: {self.average('predicted')}\n\n"
+        summary += "Key Strengths:\n"
+        summary += "".join(f"• {line}\n" for line in self.strengths)
+        summary += "\nAreas for Improvement:\n"
+        summary += "".join(f"• {line}\n" for line in self.improvements)
+        summary += "\nFeedback Summaries:\n"
+        summary += "".join(f"- {fs}\n" for fs in self.summaries)
+        summary += "\nOverall Impressions:\n"
+        summary += "".join(f"- {oi}\n" for oi in self.impressions)
+        predicted = self.average("predicted")
+        if self.answered == 0:
+            summary += "\nYou did not provide any answers. Please try to answer the questions for a more meaningful evaluation."
+        elif predicted != "N/A" and predicted < 5:
+            summary += "\nYour overall score is low. Consider practicing more detailed and confident answers."
+        return summary
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        s = cls(data["id"])
+        s.__dict__.update(data)
+        return s
+
+
+class SessionStore:
+    """
+    Bounded in-memory session store with TTL eviction (least recently used
+    first). With SESSION_DB set, sessions are written through to SQLite so
+    they survive restarts and are shared by every server process.
+
+    Session ids are minted here (create()), never taken from the client, so
+    one candidate can't read or write another's session by guessing its id.
+    """
+
+    def __init__(self, max_sessions: int = SESSION_MAX, ttl: float = SESSION_TTL, db_path: str = SESSION_DB):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.path = db_path or None
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = None
+        if self.path:
+            with self._lock:
+                self._db().execute(
+                    "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT, last_used REAL)"
+                )
+                self._db().commit()
+
+    def _db(self):
+        # sqlite connections must not cross fork(); reconnect in each process
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl
+        while self._sessions:
+            sid, s = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and s.last_used >= cutoff:
+                break
+            del self._sessions[sid]
+        if self.path:
+            self._db().execute("DELETE FROM sessions WHERE last_used < ?", (cutoff,))
+
+    def _save(self, s: InterviewSession):
+        # caller holds self._lock
+        if self.path:
+            self._db().execute(
+                "INSERT OR REPLACE INTO sessions (id, data, last_used) VALUES (?, ?, ?)",
+                (s.id, json.dumps(s.to_dict()), s.last_used),
+            )
+            self._db().commit()
+
+    def create(self) -> InterviewSession:
+        """Start a session under a new unguessable id."""
+        s = InterviewSession(uuid.uuid4().hex)
+        with self._lock:
+            self._sessions[s.id] = s
+            self._evict()
+            self._save(s)
+        return s
+
+    def get(self, session_id: str):
+        """The session, or None if it is unknown (not created here) or expired."""
+        with self._lock:
+            s = self._sessions.get(session_id)
+            if self.path:
+                # the database is authoritative: another process may have added turns
+                row = self._db().execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+                s = InterviewSession.from_dict(json.loads(row[0])) if row else None
+            if s is not None and s.last_used < time.time() - self.ttl:
+                s = None
+            if s is not None:
+                self._sessions[session_id] = s
+                self._sessions.move_to_end(session_id)
+                self._evict()
+            return s
+
+    def record_turn(self, session_id: str, answer: str, feedback: str = "", record: dict = None) -> dict:
+        """
+        Fold one evaluated answer into the session; pass `record` if it is
+        already parsed. Returns None if the session is unknown or expired.
+        """
+        s = self.get(session_id)
+        if s is None:
+            return None
+        with self._lock:
+            record = s.add_record(answer, record) if record else s.add_turn(answer, feedback)
+            self._save(s)
+        return record
+
+    def end(self, session_id: str):
+        """Remove and return the session, or None if it is unknown or expired."""
+        s = self.get(session_id)
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self.path:
+                self._db().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self._db().commit()
+        return s
+
+
+sessions = SessionStore()
@@ -0,0 +1,7 @@
+import json
+
+
+def sse_event(data, event: str = None) -> str:
+    """Format one Server-Sent Event; `data` is JSON-encoded."""
+    msg = f"event: {event}\n" if event else ""
+    return msg + f"data: {json.dumps(data)}\n\n"
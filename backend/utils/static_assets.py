@@ -0,0 +1,173 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"  # cache, but check the ETag before each reuse
+COMPRESS_MIN_BYTES = 512
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+_SUFFIX = {"gzip": "-gz", "br": "-br"}
+
+
+def _fingerprint(name: str, digest: str) -> str:
+    """app.js -> app.<digest>.js"""
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+def _ref_pattern(name: str):
+    # src="app.js", href='./style.css' as written in the HTML
+    return re.compile(r"""((?:src|href)\s*=\s*["'](?:\./)?)""" + re.escape(name) + r"""(["'?#])""")
+
+
+class Asset:
+    __slots__ = ("name", "hashed_name", "mimetype", "digest", "bodies")
+
+    def __init__(self, name: str, data: bytes, mimetype: str):
+        self.name = name
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        self.hashed_name = _fingerprint(name, self.digest)
+        self.bodies = {"identity": data}
+        if len(data) >= COMPRESS_MIN_BYTES and mimetype.startswith(_COMPRESSIBLE):
+            # mtime=0 keeps the gzip bytes (and so the ETag) identical across restarts
+            gz = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gz) < len(data):
+                self.bodies["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(data, quality=11)
+                if len(br) < len(data):
+                    self.bodies["br"] = br
+
+    def etag(self, encoding: str) -> str:
+        # strong validator per representation: each encoding is a different byte sequence
+        return f'"{self.digest}{_SUFFIX.get(encoding, "")}"'
+
+
+class StaticAssets:
+    """
+    The frontend directory, read once into memory: every file is
+    fingerprinted (sha256 prefix in its name), gzip/brotli-compressed ahead
+    of time, and HTML references to the other files are rewritten to the
+    fingerprinted names. Requests are then answered from the table: no
+    filesystem access, no compression, strong ETags with 304s, Accept-Encoding
+    negotiation, and year-long immutable caching for fingerprinted names
+    (plain names, like index.html, are revalidated instead).
+
+    With reload=True (development) the directory is rescanned when a file
+    changes.
+    """
+
+    def __init__(self, root: str, index: str = "index.html", reload: bool = False):
+        self.root = os.path.abspath(root)
+        self.index = index
+        self.reload = reload
+        self._assets = {}  # name or hashed name -> Asset
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def _scan(self) -> dict:
+        mtimes = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for fn in filenames:
+                path = os.path.join(dirpath, fn)
+                mtimes[os.path.relpath(path, self.root).replace(os.sep, "/")] = os.path.getmtime(path)
+        return mtimes
+
+    def load(self):
+        mtimes = self._scan()
+        assets = {}
+        html = []
+        for name in mtimes:
+            with open(os.path.join(self.root, name), "rb") as f:
+                data = f.read()
+            mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if mimetype == "text/html":
+                html.append((name, data))
+                continue
+            assets[name] = Asset(name, data, mimetype)
+        for name, data in html:
+            text = data.decode("utf-8")
+            base = os.path.dirname(name)
+            for asset in list(assets.values()):
+                rel = os.path.relpath(asset.name, base or ".").replace(os.sep, "/")
+                text = _ref_pattern(rel).sub(lambda m, a=asset, r=rel: m.group(1) + _fingerprint(r, a.digest)
+                                             + m.group(2), text)
+            assets[name] = Asset(name, text.encode("utf-8"), "text/html")
+        table = {}
+        for asset in assets.values():
+            table[asset.name] = asset
+            table[asset.hashed_name] = asset
+        with self._lock:
+            self._assets = table
+            self._mtimes = mtimes
+
+    def _maybe_reload(self):
+        if self._scan() != self._mtimes:
+            self.load()
+
+    def get(self, path: str):
+        """(asset, fingerprinted) for a request path, or (None, False)."""
+        if self.reload:
+            self._maybe_reload()
+        asset = self._assets.get(path)
+        if asset is None:
+            return None, False
+        return asset, path == asset.hashed_name and path != asset.name
+
+    def serve(self, path: str, request):
+        """
+        Response for `path` (index.html for "" and for extensionless paths
+        that aren't files, so client-side routes work), or None if there is
+        no such asset.
+        """
+        asset, fingerprinted = self.get(path or self.index)
+        if asset is None and "." not in path.rsplit("/", 1)[-1]:
+            asset, fingerprinted = self.get(self.index)
+        if asset is None:
+            return None
+
+        # the client's most preferred encoding we have; br wins a tie
+        encoding, best = "identity", 0
+        accepted = request.accept_encodings
+        for candidate in ("br", "gzip"):
+            if candidate in asset.bodies and accepted[candidate] > best:
+                encoding, best = candidate, accepted[candidate]
+        etag = asset.etag(encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE if fingerprinted else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("If-None-Match", "")
+        if if_none_match:
+            # weak comparison (RFC 9110 13.1.2); any encoding of the same content still matches
+            tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+            if "*" in tags or tags & {asset.etag(e) for e in asset.bodies}:
+                return Response(status=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(asset.bodies[encoding], mimetype=asset.mimetype, headers=headers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            assets = {id(a): a for a in self._assets.values()}.values()
+        return {
+            "files": len(assets),
+            "bytes": sum(len(a.bodies["identity"]) for a in assets),
+            "gzip_bytes": sum(len(a.bodies.get("gzip", a.bodies["identity"])) for a in assets),
+            "brotli": brotli is not None,
+        }
@@ -0,0 +1,270 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from config.settings import STORE_DIR, STORE_MAX_BYTES, STORE_MAX_AGE, STORE_GC_INTERVAL
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+_TMP_MAX_AGE = 3600  # temp files older than this were left by a crashed writer
+
+
+class _BlobWriter:
+    """
+    File-like sink that hashes while it writes. Used as a context manager:
+    on a clean exit the blob is committed to the store (with one reference
+    held by the caller) and `digest` is set; on an exception it is discarded.
+    """
+
+    def __init__(self, store, ext: str, kind: str):
+        self.store = store
+        self.ext = ext
+        self.kind = kind
+        self.size = 0
+        self.digest = None
+        self._hash = hashlib.sha256()
+        self._tmp = os.path.join(store.root, "tmp", uuid.uuid4().hex)
+        self._f = open(self._tmp, "wb")
+
+    def write(self, data: bytes) -> int:
+        self._hash.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._f.close()
+        if exc_type is not None:
+            os.remove(self._tmp)
+            return False
+        self.digest = self._hash.hexdigest()
+        self.store._commit(self.digest, self._tmp, self.ext, self.kind, self.size)
+        return False
+
+
+class BlobStore:
+    """
+    Content-addressed file store: each blob lives once at
+    root/<2 hex>/<sha256><ext>, however many times it is uploaded, and a
+    SQLite index tracks its size, reference count and last use.
+
+    put_stream/writer/put_bytes return the digest with one reference held;
+    call release() when done with it. Unreferenced blobs are kept until
+    they are older than max_age or the store grows past max_bytes, then
+    removed (oldest first) by gc(), which a background thread runs every
+    gc_interval seconds. References older than twice max_age are treated
+    as leaked by a crashed process.
+    """
+
+    def __init__(self, root: str = STORE_DIR, max_bytes: int = STORE_MAX_BYTES,
+                 max_age: float = STORE_MAX_AGE, gc_interval: float = STORE_GC_INTERVAL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.gc_interval = gc_interval
+        self.db_path = os.path.join(root, "index.sqlite3")
+        self.dedup_hits = 0
+        self._pid = None
+        self._gc_pid = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "tmp"), exist_ok=True)
+        with self._lock:
+            self._db().execute(
+                "CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, ext TEXT, kind TEXT, size INTEGER, "
+                "refs INTEGER, kept INTEGER, created REAL, last_used REAL)"
+            )
+            self._db().execute("CREATE INDEX IF NOT EXISTS blobs_last_used ON blobs (last_used)")
+            self._db().commit()
+
+    def _db(self):
+        # sqlite connections must not cross fork(); reconnect in each process
+        if self._pid != os.getpid():
+            # isolation_level=None: transactions are explicit (BEGIN IMMEDIATE) so
+            # commits and GC serialize against other processes on the same index
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30,
+                                         isolation_level=None)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _file(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    # ---- writing ----
+
+    def writer(self, ext: str = "", kind: str = "upload") -> _BlobWriter:
+        """A file-like sink for data that arrives in pieces (e.g. a decode tee)."""
+        self._ensure_gc()
+        return _BlobWriter(self, ext, kind)
+
+    def put_stream(self, stream, ext: str = "", kind: str = "upload") -> str:
+        """Copy a readable stream into the store, hashing as it goes; returns the digest."""
+        with self.writer(ext, kind) as w:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                w.write(chunk)
+        return w.digest
+
+    def put_bytes(self, data: bytes, ext: str = "", kind: str = "upload") -> str:
+        with self.writer(ext, kind) as w:
+            w.write(data)
+        return w.digest
+
+    def _commit(self, digest: str, tmp: str, ext: str, kind: str, size: int):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT ext FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                if row is not None and os.path.exists(self._file(digest, row[0])):
+                    os.remove(tmp)
+                    db.execute("UPDATE blobs SET refs = refs + 1, last_used = ? WHERE digest = ?", (now, digest))
+                    self.dedup_hits += 1
+                else:
+                    path = self._file(digest, ext)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(tmp, path)
+                    db.execute("INSERT INTO blobs VALUES (?, ?, ?, ?, 1, 0, ?, ?) ON CONFLICT (digest) "
+                               "DO UPDATE SET ext = excluded.ext, refs = refs + 1, last_used = excluded.last_used",
+                               (digest, ext, kind, size, now, now))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+
+    # ---- references ----
+
+    def path(self, digest: str) -> str:
+        """Filesystem path of a stored blob; KeyError if it isn't in the store."""
+        with self._lock:
+            row = self._db().execute("SELECT ext FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        return self._file(digest, row[0])
+
+    def acquire(self, digest: str) -> bool:
+        """Take another reference to a blob; False if it is gone."""
+        with self._lock:
+            cur = self._db().execute("UPDATE blobs SET refs = refs + 1, last_used = ? WHERE digest = ?",
+                                     (time.time(), digest))
+        return cur.rowcount == 1
+
+    def release(self, digest: str, keep: bool = True):
+        """
+        Drop a reference. keep=True leaves the blob to retention; with
+        keep=False it is deleted right away if that was the last reference
+        and no other holder released it with keep=True.
+        """
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("UPDATE blobs SET refs = MAX(refs - 1, 0), kept = MAX(kept, ?), last_used = ? "
+                           "WHERE digest = ?", (int(keep), time.time(), digest))
+                if not keep:
+                    self._delete(db, digest, unkept=True)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _delete(self, db, digest: str, unkept: bool = False) -> int:
+        """Delete an unreferenced blob inside the caller's transaction; returns the bytes freed."""
+        sql = "SELECT ext, size FROM blobs WHERE digest = ? AND refs = 0" + (" AND kept = 0" if unkept else "")
+        row = db.execute(sql, (digest,)).fetchone()
+        if row is None:
+            return 0
+        db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        try:
+            os.remove(self._file(digest, row[0]))
+        except FileNotFoundError:
+            pass
+        return row[1]
+
+    # ---- retention ----
+
+    def gc(self, now: float = None) -> dict:
+        """Apply age and size retention to unreferenced blobs; returns what was removed."""
+        now = now or time.time()
+        removed, freed = 0, 0
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # references this old were leaked by a process that died holding them
+                db.execute("UPDATE blobs SET refs = 0 WHERE refs > 0 AND last_used < ?", (now - 2 * self.max_age,))
+                for (digest,) in db.execute("SELECT digest FROM blobs WHERE refs = 0 AND last_used < ?",
+                                            (now - self.max_age,)).fetchall():
+                    freed += self._delete(db, digest)
+                    removed += 1
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+                if total > self.max_bytes:
+                    for digest, size in db.execute(
+                            "SELECT digest, size FROM blobs WHERE refs = 0 ORDER BY last_used").fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        self._delete(db, digest)
+                        total -= size
+                        freed += size
+                        removed += 1
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        tmp_dir = os.path.join(self.root, "tmp")
+        for name in os.listdir(tmp_dir):
+            path = os.path.join(tmp_dir, name)
+            try:
+                if os.path.getmtime(path) < now - _TMP_MAX_AGE:
+                    os.remove(path)
+            except OSError:
+                pass
+        if removed:
+            log.info("storage gc removed %d blobs (%d bytes)", removed, freed)
+        return {"removed": removed, "bytes": freed}
+
+    def _ensure_gc(self):
+        # like the sqlite connection, the GC thread doesn't survive fork(); start one per process
+        if self.gc_interval <= 0 or self._gc_pid == os.getpid():
+            return
+        with self._lock:
+            if self._gc_pid == os.getpid():
+                return
+            self._gc_pid = os.getpid()
+        threading.Thread(target=self._gc_loop, name="storage-gc", daemon=True).start()
+
+    def _gc_loop(self):
+        while True:
+            time.sleep(self.gc_interval)
+            try:
+                self.gc()
+            except Exception:
+                log.exception("storage gc failed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            blobs, size, referenced = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(refs > 0), 0) FROM blobs").fetchone()
+        return {"blobs": blobs, "bytes": size, "referenced": referenced, "dedup_hits": self.dedup_hits,
+                "max_bytes": self.max_bytes}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> BlobStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BlobStore()
+    return _store
@@ -1,39 +1,171 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from config.settings import SERPAPI_KEY
+from config.settings import (
+    SERPAPI_KEY,
+    SERPAPI_URL,
+    DUCKDUCKGO_URL,
+    RESEARCH_DEADLINE,
+    RESEARCH_CACHE_TTL,
+    RESEARCH_MAX_PAGE_BYTES,
+)
+from utils.cache import LRUCache
+from utils.metrics import span
 
-def quick_company_overview(company_name: str) -> str:
+HEAD_END = b"</head>"
+
+
+def _remaining(deadline: float) -> float:
+    return max(0.1, deadline - time.monotonic())
+
+
+class ResearchFetcher:
     """
-    Try SerpAPI if available, otherwise fallback to searching company homepage and meta description.
-    Keep short and simple.
+    Company overview lookup. SerpAPI (when a key is set) and DuckDuckGo are
+    queried concurrently over a pooled keep-alive session, the first useful
+    answer wins, and the whole lookup is bounded by `deadline` seconds.
+    Results are cached per company for `cache_ttl` seconds.
+
+    Endpoints are constructor arguments so the fetcher can be pointed at a
+    local stub server.
     """
-    if SERPAPI_KEY:
+
+    def __init__(self, serpapi_key: str = SERPAPI_KEY, serpapi_url: str = SERPAPI_URL,
+                 ddg_url: str = DUCKDUCKGO_URL, deadline: float = RESEARCH_DEADLINE,
+                 cache_ttl: float = RESEARCH_CACHE_TTL, max_page_bytes: int = RESEARCH_MAX_PAGE_BYTES):
+        self.serpapi_key = serpapi_key
+        self.serpapi_url = serpapi_url
+        self.ddg_url = ddg_url
+        self.deadline = deadline
+        self.max_page_bytes = max_page_bytes
+        self.cache = LRUCache(maxsize=1024, ttl=cache_ttl)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = "Mozilla/5.0 (compatible; research-agent)"
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="research")
+
+    def _read_capped(self, url: str, deadline: float, params: dict = None, stop_at: bytes = None) -> str:
+        """
+        Stream a page and stop after `max_page_bytes`, or as soon as `stop_at`
+        has been seen, so large pages never get fully downloaded. requests'
+        timeout only bounds each socket operation, so the elapsed time is
+        checked between chunks and a page still arriving at `deadline`
+        (monotonic) is abandoned with requests.Timeout.
+        """
+        if time.monotonic() >= deadline:
+            raise requests.Timeout(f"research deadline passed before fetching {url}")
+        buf = bytearray()
+        with self.session.get(url, params=params, timeout=_remaining(deadline), stream=True) as r:
+            r.raise_for_status()
+            if hasattr(r.raw, "read1"):
+                # urllib3 2: return what has arrived instead of blocking for a full chunk
+                chunks = iter(lambda: r.raw.read1(8192, decode_content=True), b"")
+            else:
+                chunks = r.iter_content(chunk_size=8192)
+            for chunk in chunks:
+                if time.monotonic() >= deadline:
+                    raise requests.Timeout(f"{url} still downloading at the research deadline")
+                buf.extend(chunk)
+                if len(buf) >= self.max_page_bytes:
+                    break
+                if stop_at and stop_at in buf[-len(chunk) - len(stop_at):].lower():
+                    break
+            encoding = r.encoding or "utf-8"
+        return bytes(buf[: self.max_page_bytes]).decode(encoding, errors="ignore")
+
+    def _serpapi(self, company_name: str, deadline: float):
+        with span("research_serpapi"):
+            return self._serpapi_lookup(company_name, deadline)
+
+    def _serpapi_lookup(self, company_name: str, deadline: float):
         params = {
             "q": company_name,
-            "api_key": SERPAPI_KEY,
+            "api_key": self.serpapi_key,
             "engine": "google",
         }
-        resp = requests.get("https://serpapi.com/search", params=params, timeout=20).json()
+        resp = json.loads(self._read_capped(self.serpapi_url, deadline, params=params))
         # try to pick a snippet
-        snippet = None
         if "organic_results" in resp and len(resp["organic_results"]) > 0:
-            snippet = resp["organic_results"][0].get("snippet")
-        if snippet:
-            return snippet
-    # fallback: try basic google-like search via DuckDuckGo (no api key)
-    try:
-        r = requests.get(f"https://duckduckgo.com/html/?q={company_name}", timeout=10)
-        soup = BeautifulSoup(r.text, "html.parser")
+            return resp["organic_results"][0].get("snippet")
+        return None
+
+    def _duckduckgo(self, company_name: str, deadline: float):
+        with span("research_duckduckgo"):
+            return self._duckduckgo_lookup(company_name, deadline)
+
+    def _duckduckgo_lookup(self, company_name: str, deadline: float):
+        html = self._read_capped(self.ddg_url, deadline, params={"q": company_name})
+        soup = BeautifulSoup(html, "html.parser")
         # try description meta from likely site (first link)
         link = soup.find("a", {"class": "result__a"})
-        if link and link.get("href"):
-            href = link.get("href")
-            # fetch site meta description
-            rr = requests.get(href, timeout=10)
-            s2 = BeautifulSoup(rr.text, "html.parser")
-            meta = s2.find("meta", attrs={"name": "description"})
-            if meta and meta.get("content"):
-                return meta.get("content")
-    except Exception:
-        pass
-    return f"No quick overview found for {company_name}."
+        if not (link and link.get("href")):
+            return None
+        # only the <head> of the homepage is needed for its meta description
+        head = self._read_capped(link.get("href"), deadline, stop_at=HEAD_END)
+        s2 = BeautifulSoup(head, "html.parser")
+        meta = s2.find("meta", attrs={"name": "description"})
+        if meta and meta.get("content"):
+            return meta.get("content")
+        return None
+
+    def overview(self, company_name: str) -> str:
+        key = company_name.strip().lower()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with span("research_overview"):
+            return self._overview(company_name, key)
+
+    def _overview(self, company_name: str, key: str) -> str:
+        deadline = time.monotonic() + self.deadline
+        pending = set()
+        if self.serpapi_key:
+            pending.add(self._executor.submit(self._serpapi, company_name, deadline))
+        pending.add(self._executor.submit(self._duckduckgo, company_name, deadline))
+
+        result = None
+        while pending and result is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    result = result or fut.result()
+                except Exception:
+                    pass
+        for fut in pending:
+            fut.cancel()
+
+        if result:
+            self.cache.set(key, result)
+            return result
+        return f"No quick overview found for {company_name}."
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> ResearchFetcher:
+    global _fetcher
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                _fetcher = ResearchFetcher()
+    return _fetcher
+
+
+def quick_company_overview(company_name: str) -> str:
+    """
+    Try SerpAPI if available, and in parallel search for the company homepage's meta description.
+    Keep short and simple.
+    """
+    return get_fetcher().overview(company_name)
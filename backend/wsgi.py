@@ -0,0 +1,15 @@
+"""
+WSGI entry point for production servers, e.g.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With PRELOAD_MODELS=1 the Whisper replicas are loaded here, in the server's
+master process before it forks, so every worker shares the weights
+copy-on-write instead of loading its own copy.
+"""
+from config.settings import PRELOAD_MODELS
+from app import app
+
+if PRELOAD_MODELS:
+    from models.whisper.load_model import get_pool
+    get_pool().warm_up(background=False)
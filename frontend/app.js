@@ -20,6 +20,7 @@ const appState = {
         isRecording: false,
         mediaRecorder: null,
         audioBlob: null,
+        liveStream: null, // { id, chain, transcript } while streaming an answer
         conversationLog: [],
         hasMicrophoneAccess: false,
         questionCount: 0,
@@ -52,6 +53,7 @@ const elements = {
     recordBtn: document.getElementById('record-btn'),
     recordText: document.getElementById('record-text'),
     recordingStatus: document.getElementById('recording-status'),
+    liveTranscript: document.getElementById('live-transcript'),
     textInputSection: document.getElementById('text-input-section'),
     textAnswer: document.getElementById('text-answer'),
     submitAnswerBtn: document.getElementById('submit-answer-btn'),
@@ -71,6 +73,7 @@ const elements = {
     optimizeResumeSpinner: document.getElementById('optimize-resume-spinner'),
     resumeResults: document.getElementById('resume-results'),
     optimizedResumePreview: document.getElementById('optimized-resume-preview'),
+    resumeOmitted: document.getElementById('resume-omitted'),
     resumeChanges: document.getElementById('resume-changes'),
     downloadResumeBtn: document.getElementById('download-resume-btn'),
     
@@ -276,11 +279,13 @@ async function requestMicrophoneAccess() {
 
         appState.interview.mediaRecorder.addEventListener('dataavailable', event => {
             audioChunks.push(event.data);
+            sendLiveChunk(event.data);
         });
 
         appState.interview.mediaRecorder.addEventListener('stop', () => {
             appState.interview.audioBlob = new Blob(audioChunks, { type: 'audio/wav' });
             audioChunks.length = 0;
+            finishLiveStream();
             if (elements.submitAnswerBtn) {
                 elements.submitAnswerBtn.disabled = false;
             }
@@ -314,7 +319,65 @@ function startRecording() {
         elements.submitAnswerBtn.disabled = true;
     }
 
-    appState.interview.mediaRecorder.start();
+    if (elements.liveTranscript) {
+        elements.liveTranscript.textContent = '';
+        hideElement(elements.liveTranscript);
+    }
+    openLiveStream();
+    // emit a chunk every second so the backend can transcribe while the candidate speaks
+    appState.interview.mediaRecorder.start(1000);
+}
+
+// Live transcription: chunks are posted in order while recording, so after
+// stopping only the tail of the answer still needs transcribing.
+function openLiveStream() {
+    const live = { id: null, chain: null, transcript: null };
+    live.chain = fetch('/api/interview/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ format: 'container' })
+    })
+        .then(r => r.ok ? r.json() : null)
+        .then(data => { live.id = data ? data.stream_id : null; })
+        .catch(() => { live.id = null; });
+    appState.interview.liveStream = live;
+}
+
+function sendLiveChunk(blob) {
+    const live = appState.interview.liveStream;
+    if (!live || !blob || blob.size === 0) return;
+    live.chain = live.chain.then(() => {
+        if (!live.id) return;
+        return fetch(`/api/interview/stream/${live.id}/chunk`, { method: 'POST', body: blob })
+            .then(r => r.ok ? r.json() : null)
+            .then(data => {
+                if (data && data.text) showLiveTranscript(data.text);
+            })
+            .catch(() => { live.id = null; });
+    });
+}
+
+function finishLiveStream() {
+    const live = appState.interview.liveStream;
+    if (!live) return;
+    live.transcript = live.chain
+        .then(() => {
+            if (!live.id) return null;
+            return fetch(`/api/interview/stream/${live.id}/finish`, { method: 'POST' })
+                .then(r => r.ok ? r.json() : null)
+                .then(data => (data ? data.transcript : null));
+        })
+        .then(transcript => {
+            if (transcript) showLiveTranscript(transcript);
+            return transcript;
+        })
+        .catch(() => null);
+}
+
+function showLiveTranscript(text) {
+    if (!elements.liveTranscript) return;
+    elements.liveTranscript.textContent = text;
+    showElement(elements.liveTranscript);
 }
 
 function stopRecording() {
@@ -363,6 +426,8 @@ async function makeApiCall(url, options) {
 async function startInterview(role, industry, difficulty) {
     // Call Gemini backend to get the first question
     try {
+        // the backend mints the session id; answers are scored into it as they are evaluated
+        const session = await makeApiCall(API_ENDPOINTS.interview.start, { method: 'POST' });
         const prompt = `You are an expert interviewer. Generate a technical interview question for a candidate applying for the role of ${role} in the ${industry} industry at ${difficulty} level.`;
         const response = await makeApiCall('/api/gemini/generate', {
             method: 'POST',
@@ -370,7 +435,7 @@ async function startInterview(role, industry, difficulty) {
             body: JSON.stringify({ prompt })
         });
         return {
-            session_id: 'session_' + Date.now(), // You may want to generate/track session on backend
+            session_id: session.session_id,
             question: response.response
         };
     } catch (error) {
@@ -383,6 +448,13 @@ async function submitAnswer(sessionId, audioBlob = null, textAnswer = null) {
     // Send answer to Gemini backend for evaluation and next question
     try {
         let answerText = textAnswer;
+        const live = appState.interview.liveStream;
+        if (audioBlob && live && live.transcript) {
+            // falls back to the full upload below if streaming failed
+            answerText = await live.transcript;
+            appState.interview.liveStream = null;
+            if (answerText !== null) audioBlob = null;
+        }
         if (audioBlob) {
             // Send audio to backend for transcription
             const formData = new FormData();
@@ -399,10 +471,11 @@ async function submitAnswer(sessionId, audioBlob = null, textAnswer = null) {
         }
         // Build prompt for Gemini evaluation
         const prompt = `Evaluate the following interview answer for a ${appState.interview.role} (${appState.interview.difficulty}):\n${answerText}\nProvide feedback and a follow-up technical question.`;
+        // session_id/answer let the backend score this turn as it is generated
         const response = await makeApiCall('/api/gemini/generate', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ prompt })
+            body: JSON.stringify({ prompt, session_id: sessionId, answer: answerText })
         });
         // Parse Gemini response: assume feedback + question separated by a delimiter
         let feedback = response.response;
@@ -431,17 +504,22 @@ async function submitAnswer(sessionId, audioBlob = null, textAnswer = null) {
 
 async function endInterview(sessionId) {
     try {
-        // Send conversation log to backend for summary
-        const payload = {
-            session_id: sessionId,
-            conversation_log: appState.interview.conversationLog
-        };
+        // Turns are scored server-side; the log is only sent if the session was lost
+        const payload = { session_id: sessionId };
         console.log('Sending endInterview payload:', payload);
-        const data = await makeApiCall(API_ENDPOINTS.interview.end, {
+        let data = await makeApiCall(API_ENDPOINTS.interview.end, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(payload)
         });
+        if (data.session_found === false && appState.interview.conversationLog.length) {
+            payload.conversation_log = appState.interview.conversationLog;
+            data = await makeApiCall(API_ENDPOINTS.interview.end, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(payload)
+            });
+        }
         console.log('Received endInterview response:', data);
         // If backend returns fallback summary, show error
         if (data.summary && data.summary.includes('Great job on completing the mock interview!')) {
@@ -466,7 +544,7 @@ async function optimizeResume(file, jobDescription) {
             body: formData
         });
         // Display optimized resume and change summary
-        displayResumeResults(data.optimized_resume, data.changes_explanation);
+        displayResumeResults(data.optimized_resume, data.changes_explanation, data.omitted_sections);
         return data;
     } catch (error) {
         showError('Failed to optimize resume: ' + error.message);
@@ -539,10 +617,23 @@ function displayInterviewSummary(summary) {
     showElement(elements.interviewSummaryModal);
 }
 
-function displayResumeResults(optimizedResume, changes) {
+function displayResumeResults(optimizedResume, changes, omitted) {
     if (elements.optimizedResumePreview) {
         elements.optimizedResumePreview.textContent = optimizedResume;
     }
+
+    // sections that did not fit the prompt were not sent to Gemini
+    if (elements.resumeOmitted) {
+        if (omitted && omitted.length) {
+            const names = omitted.map(s => s.truncated ? `${s.section} (shortened)` : s.section);
+            elements.resumeOmitted.textContent =
+                'Your resume was too long to send in full. Not optimized: ' + names.join(', ');
+            showElement(elements.resumeOmitted);
+        } else {
+            elements.resumeOmitted.textContent = '';
+            hideElement(elements.resumeOmitted);
+        }
+    }
     
     if (elements.resumeChanges && changes) {
         elements.resumeChanges.innerHTML = '';
@@ -839,7 +930,7 @@ async function handleOptimizeResume(event) {
         }
     appState.resume.optimizedContent = data.optimized_resume;
     appState.resume.optimizedTxtPath = data.optimized_path || null;
-    displayResumeResults(data.optimized_resume, data.changes_explanation);
+    displayResumeResults(data.optimized_resume, data.changes_explanation, data.omitted_sections);
     } catch (error) {
         showError(`Failed to optimize resume: ${error.message}`);
     } finally {